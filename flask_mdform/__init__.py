@@ -11,8 +11,10 @@
 import pkg_resources
 from mdform import FormExtension, Markdown
 
+from .blueprint import create_blueprint
+from .choices import register_choice_provider
 from .deco import on_get_form, on_get_page, on_submit_form, render_mdform, render_mdpage
-from .formatters import flask_wtf, flask_wtf_bs4
+from .formatters import flask_wtf, flask_wtf_bs4, flask_wtf_bs4_static
 from .forms import filled_form_to_content, from_mdfile, from_mdstr, generate_form_kwargs
 
 try:  # pragma: no cover
@@ -33,8 +35,11 @@ __all__ = [
     "from_mdstr",
     "flask_wtf",
     "flask_wtf_bs4",
+    "flask_wtf_bs4_static",
     "filled_form_to_content",
     "generate_form_kwargs",
+    "register_choice_provider",
+    "create_blueprint",
     "FormExtension",
     "Markdown",
 ]
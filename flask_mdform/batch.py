@@ -0,0 +1,401 @@
+"""
+    flask_mdform.batch
+    ~~~~~~~~~~~~~~~~~~
+
+    Validate many records (plain dicts as returned by `to_plain_dict`)
+    column by column, without form instances or a request context.
+
+    Values that clearly pass (e.g. within the length or range) are checked
+    with simple predicates, optionally vectorized with NumPy for numeric
+    columns. The remaining ones go through the validators of the form field,
+    giving the same error messages as WTForms.
+
+    File fields are stored by reference and are not validated,
+    neither are fields inside collapsed parts (see `collapse`).
+
+    :copyright: 2021 by flask-mdform Authors, see AUTHORS for more details.
+    :license: BSD, see LICENSE for more details.
+"""
+
+from __future__ import annotations
+
+import decimal
+import math
+import re
+from datetime import date, time
+
+from mdform import fields as mdform_fields
+from wtforms import validators as v
+from wtforms.i18n import DummyTranslations
+
+from . import fields
+from .forms import cached_on_class
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+# Parsed value of cells that could not be parsed.
+_INVALID = object()
+
+
+def _parse_int(value):
+    return int(value)
+
+
+def _parse_date(value):
+    return value if isinstance(value, date) else date.fromisoformat(value)
+
+
+def _parse_time(value):
+    return value if isinstance(value, time) else time.fromisoformat(value)
+
+
+def _parse_choice(value):
+    return str(value)
+
+
+def _parse_choices(value):
+    if isinstance(value, str):
+        value = (value,)
+    return [str(item) for item in value]
+
+
+#: How values are parsed by mdform field class,
+#: and the WTForms message if they cannot be parsed.
+_PARSERS = {
+    mdform_fields.IntegerField: (_parse_int, "Not a valid integer value."),
+    mdform_fields.FloatField: (float, "Not a valid float value."),
+    mdform_fields.DecimalField: (decimal.Decimal, "Not a valid decimal value."),
+    mdform_fields.DateField: (_parse_date, "Not a valid date value."),
+    mdform_fields.TimeField: (_parse_time, "Not a valid time value."),
+    mdform_fields.SelectField: (_parse_choice, None),
+    mdform_fields.RadioField: (_parse_choice, None),
+    mdform_fields.CheckboxField: (_parse_choices, None),
+}
+
+_NUMERIC_FIELDS = (mdform_fields.IntegerField, mdform_fields.FloatField)
+
+
+# A conservative subset of the addresses accepted by `email_validator`:
+# ascii dot-atoms with letters, digits and _%+- and a domain with
+# an alphabetic top level domain.
+_EMAIL_RE = re.compile(
+    r"[A-Za-z0-9_%+-]+(?:\.[A-Za-z0-9_%+-]+)*"
+    r"@(?:[A-Za-z0-9](?:[A-Za-z0-9-]{0,61}[A-Za-z0-9])?\.)+[A-Za-z]{2,63}"
+)
+
+# Domains never accepted by `email_validator`.
+_SPECIAL_USE_DOMAINS = ("arpa", "invalid", "local", "localhost", "onion", "test")
+
+
+def _is_plain_email(data):
+    if not isinstance(data, str) or len(data) > 254 or not _EMAIL_RE.fullmatch(data):
+        return False
+    local, domain = data.rsplit("@", 1)
+    domain = domain.lower()
+    return (
+        len(local) <= 64
+        and "--" not in domain
+        and domain.rsplit(".", 1)[-1] not in _SPECIAL_USE_DOMAINS
+    )
+
+
+def _predicate(validator):
+    """A fast check that passes only for values accepted by the validator,
+    or None if not available.
+    """
+    if type(validator) is v.DataRequired:
+        return lambda data: data and (not isinstance(data, str) or data.strip())
+
+    elif type(validator) is v.Length:
+        mn, mx = validator.min, validator.max
+
+        def _length(data):
+            length = data and len(data) or 0
+            return length >= mn and (mx == -1 or length <= mx)
+
+        return _length
+
+    elif type(validator) is v.NumberRange:
+        mn, mx = validator.min, validator.max
+
+        def _range(data):
+            return (
+                data is not None
+                and not math.isnan(data)
+                and (mn is None or data >= mn)
+                and (mx is None or data <= mx)
+            )
+
+        return _range
+
+    elif type(validator) is v.Email and not validator.check_deliverability:
+        return _is_plain_email
+
+    elif type(validator) is v.Optional:
+        # it never adds an error.
+        return lambda data: True
+
+    return None
+
+
+class _Cell:
+    """The minimum of a WTForms field required by the validators."""
+
+    __slots__ = ("data", "errors", "raw_data", "_translations")
+
+    def __init__(self, data, translations):
+        self.data = data
+        self.errors = []
+        # No form data, as when a form is created from a plain dict.
+        self.raw_data = None
+        self._translations = translations
+
+    def gettext(self, string):
+        return self._translations.gettext(string)
+
+    def ngettext(self, singular, plural, n):
+        return self._translations.ngettext(singular, plural, n)
+
+
+class BatchColumn:
+    """Validates the values of a field.
+
+    Parameters
+    ----------
+    name : str
+        variable name of the field.
+    field : mdform.fields.Field
+        field definition.
+    unbound : wtforms.fields.UnboundField
+        field of the form class.
+    """
+
+    def __init__(self, name, field, unbound):
+        sf = field.specific_field
+        self.name = name
+        self.parse, self.parse_message = _PARSERS.get(type(sf), (None, None))
+        self.numeric = isinstance(sf, _NUMERIC_FIELDS)
+        self.multiple = isinstance(sf, mdform_fields.CheckboxField)
+        self.choices = unbound.kwargs.get("choices")
+        self.validators = tuple(unbound.kwargs.get("validators", ()))
+        self.predicates = tuple(_predicate(validator) for validator in self.validators)
+        self.ranges = tuple(
+            validator
+            for validator in self.validators
+            if type(validator) is v.NumberRange
+        )
+
+    def _choice_values(self):
+        choices = self.choices
+        if choices is None:
+            return None
+        if callable(choices):
+            choices = choices()
+        if not isinstance(choices, fields.Choices):
+            choices = fields.Choices(choices)
+        return choices.values(str)
+
+    def _pre_validate(self, cell, values, translations):
+        """Same checks as the choice fields (`fields._ChoicesMixin`)."""
+        if self.multiple:
+            if not cell.data:
+                return
+            unacceptable = [data for data in set(cell.data) if data not in values]
+            if unacceptable:
+                cell.errors.append(
+                    translations.ngettext(
+                        "'%(value)s' is not a valid choice for this field.",
+                        "'%(value)s' are not valid choices for this field.",
+                        len(unacceptable),
+                    )
+                    % dict(value="', '".join(unacceptable))
+                )
+        elif cell.data not in values:
+            cell.errors.append(translations.gettext("Not a valid choice."))
+
+    def _run_chain(self, cell):
+        """Same as `wtforms.Field._run_validation_chain`."""
+        for validator in self.validators:
+            try:
+                validator(None, cell)
+            except v.StopValidation as e:
+                if e.args and e.args[0]:
+                    cell.errors.append(e.args[0])
+                return
+            except v.ValidationError as e:
+                cell.errors.append(e.args[0])
+
+    def _parse(self, values, translations):
+        """Parse the values of the column.
+
+        Returns
+        -------
+        list, dict
+            parsed values and errors by row.
+        """
+        if self.parse is None:
+            return values, {}
+
+        parse = self.parse
+        parsed = []
+        errors = {}
+        for row, value in enumerate(values):
+            if value is None:
+                parsed.append(None)
+                continue
+            try:
+                parsed.append(parse(value))
+            except (ValueError, TypeError, decimal.InvalidOperation):
+                parsed.append(_INVALID)
+                errors[row] = [translations.gettext(self.parse_message)]
+        return parsed, errors
+
+    def _fast_ok(self, parsed, use_numpy):
+        """Rows in which all validators surely pass."""
+        if any(predicate is None for predicate in self.predicates):
+            return [False] * len(parsed)
+
+        ok = [value is not _INVALID for value in parsed]
+
+        vectorized = ()
+        if use_numpy and self.numeric and self.ranges:
+            vectorized = self.ranges
+            arr = np.array(
+                [
+                    math.nan if value is None or value is _INVALID else value
+                    for value in parsed
+                ],
+                dtype=float,
+            )
+            mask = ~np.isnan(arr)
+            for validator in self.ranges:
+                if validator.min is not None:
+                    mask &= arr >= validator.min
+                if validator.max is not None:
+                    mask &= arr <= validator.max
+            ok = [a and b for a, b in zip(ok, mask.tolist())]
+
+        for validator, predicate in zip(self.validators, self.predicates):
+            if validator in vectorized:
+                continue
+            ok = [
+                row_ok and bool(predicate(value)) for row_ok, value in zip(ok, parsed)
+            ]
+
+        return ok
+
+    def validate(self, values, translations, use_numpy=False):
+        """Validate the values of the column.
+
+        Returns
+        -------
+        dict
+            maps row numbers to the list of errors.
+        """
+        parsed, errors = self._parse(values, translations)
+
+        choice_values = self._choice_values() if self.choices is not None else None
+
+        if choice_values is None:
+            ok = self._fast_ok(parsed, use_numpy)
+        elif self.multiple:
+            ok = [
+                value is not _INVALID
+                and (not value or all(item in choice_values for item in value))
+                for value in parsed
+            ]
+            ok = [a and b for a, b in zip(ok, self._fast_ok(parsed, use_numpy))]
+        else:
+            ok = [value in choice_values for value in parsed]
+            ok = [a and b for a, b in zip(ok, self._fast_ok(parsed, use_numpy))]
+
+        for row, (row_ok, value) in enumerate(zip(ok, parsed)):
+            if row_ok or value is _INVALID:
+                continue
+
+            cell = _Cell(value, translations)
+            if choice_values is not None:
+                self._pre_validate(cell, choice_values, translations)
+            self._run_chain(cell)
+            if cell.errors:
+                errors[row] = cell.errors
+
+        return errors
+
+
+class BatchValidator:
+    """Validates many records of a form class, column by column.
+
+    Parameters
+    ----------
+    form_cls : FlaskForm class
+    """
+
+    def __init__(self, form_cls):
+        self.collapse_map = form_cls._collapse_map
+        self.columns = [
+            BatchColumn(name, field, getattr(form_cls, name))
+            for name, field in form_cls._mdform_def.items()
+            if not isinstance(field.specific_field, mdform_fields.FileField)
+        ]
+
+    def validate(self, records, translations=None, use_numpy=False):
+        """Validate records.
+
+        Parameters
+        ----------
+        records : Iterable[dict]
+            plain dicts (as returned by `to_plain_dict`).
+        translations : object or None
+            object with gettext and ngettext methods used to translate
+            the messages. If None, messages are in english.
+        use_numpy : bool
+            If true, numeric ranges are checked with NumPy.
+
+        Returns
+        -------
+        dict
+            maps the number of each invalid row to a dict
+            with the list of errors by field name.
+        """
+        if use_numpy and np is None:
+            raise ValueError("NumPy is required to use_numpy")
+
+        translations = translations or DummyTranslations()
+
+        records = records if isinstance(records, (list, tuple)) else list(records)
+
+        out = {}
+        for column in self.columns:
+            name = column.name
+            values = [record.get(name) for record in records]
+            for row, errors in column.validate(values, translations, use_numpy).items():
+                out.setdefault(row, {})[name] = errors
+
+        if self.collapse_map:
+            # As in a form, fields inside collapsed parts are not validated.
+            for row in list(out):
+                for name in self.collapse_map.inactive_fields_for_data(records[row]):
+                    out[row].pop(name, None)
+                if not out[row]:
+                    del out[row]
+
+        return {row: out[row] for row in sorted(out)}
+
+
+def get_batch_validator(form_cls):
+    """Return the batch validator of a form class, created once per class."""
+    return cached_on_class(
+        form_cls, "_batch_validator", lambda: BatchValidator(form_cls)
+    )
+
+
+def validate_records(form_cls, records, translations=None, use_numpy=False):
+    """Validate many records of a form class, column by column.
+
+    See `BatchValidator.validate`.
+    """
+    return get_batch_validator(form_cls).validate(records, translations, use_numpy)
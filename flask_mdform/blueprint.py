@@ -0,0 +1,152 @@
+"""
+    flask_mdform.blueprint
+    ~~~~~~~~~~~~~~~~~~~~~~
+
+    Optional flask blueprint with endpoints that
+    work on the compiled markdown forms.
+
+        app.register_blueprint(create_blueprint(), url_prefix="/mdform")
+
+    If registered with a name other than "mdform",
+    set app.config["MDFORM_BLUEPRINT"] accordingly.
+
+    :copyright: 2021 by flask-mdform Authors, see AUTHORS for more details.
+    :license: BSD, see LICENSE for more details.
+"""
+
+from __future__ import annotations
+
+from flask import Blueprint, Response, abort, jsonify, request
+from jinja2 import TemplateNotFound
+
+from .deco import in_app_from_mdfile
+from .fields import Choices
+from .schema import json_schema_bytes
+
+#: Maximum number of items per page returned by the typeahead endpoint.
+MAX_PER_PAGE = 100
+
+
+def _get_form_cls(mdfile):
+    try:
+        _, _, Form = in_app_from_mdfile(mdfile)
+    except TemplateNotFound:
+        abort(404)
+    return Form
+
+
+def typeahead(mdfile, field):
+    """Search the choices of a typeahead select field.
+
+    Query parameters: `q` (the prefix to search),
+    `page` (starting at 1) and `per_page`.
+
+    Returns a JSON object with the matched `results`
+    (list of {"value": ..., "label": ...}), the `page` and
+    `more` indicating if there are more results.
+    """
+    Form = _get_form_cls(mdfile)
+
+    if field not in Form._typeahead:
+        abort(404)
+
+    choices = getattr(Form, field).kwargs["choices"]
+    if callable(choices):
+        choices = choices()
+    if not isinstance(choices, Choices):
+        choices = Choices(choices)
+
+    page = max(request.args.get("page", 1, type=int), 1)
+    per_page = min(max(request.args.get("per_page", 20, type=int), 1), MAX_PER_PAGE)
+
+    matches, more = choices.search(
+        request.args.get("q", ""), offset=(page - 1) * per_page, limit=per_page
+    )
+
+    return jsonify(
+        results=[dict(value=value, label=label) for value, label in matches],
+        page=page,
+        more=more,
+    )
+
+
+def validate(mdfile):
+    """Validate one or more fields of a form without rendering it.
+
+    The data is posted as in the form (or as JSON) and the fields to
+    validate are given in the `fields` query parameter (comma separated),
+    all fields are validated if missing.
+
+    Returns a JSON object with `valid` and the `errors` of the
+    fields that did not validate.
+    """
+    Form = _get_form_cls(mdfile)
+
+    names = [
+        name.strip()
+        for value in request.args.getlist("fields")
+        for name in value.split(",")
+        if name.strip()
+    ]
+    if not names:
+        names = [name for name in Form._mdform_def]
+    elif any(name not in Form._mdform_def for name in names):
+        abort(400)
+
+    # No CSRF token is required as nothing is stored,
+    # and none is generated to avoid touching the session.
+    form = Form(meta={"csrf": False})
+
+    # As when the form is submitted, fields inside collapsed parts
+    # are not validated.
+    inactive = form.inactive_fields()
+
+    errors = {}
+    for name in names:
+        if name in inactive:
+            continue
+        field = form[name]
+        inline = getattr(Form, f"validate_{name}", None)
+        if not field.validate(form, (inline,) if inline else ()):
+            errors[name] = field.errors
+
+    return jsonify(valid=not errors, errors=errors)
+
+
+def schema(mdfile):
+    """JSON Schema of the plain dict of a form,
+    with an ETag to allow conditional requests.
+    """
+    Form = _get_form_cls(mdfile)
+
+    content, etag = json_schema_bytes(Form)
+
+    response = Response(content, mimetype="application/schema+json")
+    response.set_etag(etag)
+    return response.make_conditional(request)
+
+
+def create_blueprint(name="mdform", import_name=__name__, **kwargs):
+    """Create a blueprint with the flask-mdform endpoints.
+
+    - typeahead: `/typeahead/<field>/<path:mdfile>`
+    - validate: `/validate/<path:mdfile>` (POST)
+    - schema: `/schema/<path:mdfile>`
+
+    Parameters
+    ----------
+    name : str
+        name of the blueprint.
+    import_name : str
+    **kwargs
+        passed to `flask.Blueprint`.
+
+    Returns
+    -------
+    flask.Blueprint
+    """
+    bp = Blueprint(name, import_name, **kwargs)
+    bp.add_url_rule("/typeahead/<field>/<path:mdfile>", view_func=typeahead)
+    bp.add_url_rule("/validate/<path:mdfile>", view_func=validate, methods=["POST"])
+    bp.add_url_rule("/schema/<path:mdfile>", view_func=schema)
+    return bp
@@ -0,0 +1,324 @@
+"""
+    flask_mdform.bundle
+    ~~~~~~~~~~~~~~~~~~~
+
+    Precompiled bundles of forms and pages (`MDFORM_BUNDLE`).
+
+    The build step writes a python package with a module per compiled
+    markdown file (form class definition, metadata and template) and
+    a module per template compiled by jinja. Loading the bundle is an
+    import (of cached .pyc files): markdown files are not converted and
+    templates are not compiled when workers start.
+
+        # build (e.g. in the deployment pipeline)
+        build_bundle(app, "build/", mdfiles=["survey"], pages=["about"])
+
+        # runtime
+        app.config["MDFORM_BUNDLE"] = load_bundle("build/")
+
+    Form classes have stable module paths (e.g. `mdform_bundle.form_0.Form`),
+    so they can be pickled.
+
+    The compiled templates are bound to the jinja environment of a
+    single app at a time.
+
+    :copyright: 2021 by flask-mdform Authors, see AUTHORS for more details.
+    :license: BSD, see LICENSE for more details.
+"""
+
+from __future__ import annotations
+
+import compileall
+import hashlib
+import importlib
+import pathlib
+import py_compile
+import sys
+import tempfile
+import zipfile
+
+from .deco import in_app_from_mdfile
+from .forms import _compact_definition, generate_form_cls, generate_read_only_form_cls
+
+#: Version of the bundle layout.
+FORMAT = 1
+
+_HEADER = '"""Generated by flask_mdform.bundle, do not edit."""\n\n'
+
+
+def make_form_cls(
+    name,
+    module,
+    definition,
+    *,
+    read_only=False,
+    choice_providers=None,
+    typeahead=(),
+    collapse_map=None,
+    mdfile=None,
+):
+    """Generate the form class of a bundle module,
+    stored in the module as `Form` to be pickled.
+    """
+    generate = generate_read_only_form_cls if read_only else generate_form_cls
+    cls = generate(
+        name,
+        _compact_definition(definition),
+        choice_providers=choice_providers,
+        typeahead=typeahead,
+        collapse_map=collapse_map,
+    )
+    cls._mdfile = mdfile
+    type.__setattr__(cls, "__module__", module)
+    type.__setattr__(cls, "__qualname__", "Form")
+    return cls
+
+
+def template_key(tmpl_str):
+    """Key of a template in a bundle."""
+    return hashlib.sha1(tmpl_str.encode("utf-8")).hexdigest()
+
+
+def _collapse_map_source(collapse_map):
+    conditions = ", ".join(
+        f"{control!r}: Condition({c.control!r}, {c.value!r}, {c.shown_if_equal!r})"
+        for control, c in collapse_map.conditions.items()
+    )
+    return f"CollapseMap({{{conditions}}}, {collapse_map.dependencies!r})"
+
+
+def _definition_source(definition):
+    source = (
+        "{\n"
+        + "".join(f"    {name!r}: {field!r},\n" for name, field in definition.items())
+        + "}"
+    )
+
+    names = sorted(
+        {type(field).__name__ for field in definition.values()}
+        | {type(field.specific_field).__name__ for field in definition.values()}
+    )
+    imports = f"from mdform.fields import {', '.join(names)}\n" if names else ""
+
+    # The definition must be the same when imported.
+    namespace = {}
+    exec(imports, namespace)
+    if eval(source, namespace) != definition:
+        raise ValueError("Cannot write the form definition as python source")
+
+    return imports, source
+
+
+def form_module_source(mdfile, read_only, meta, tmpl, Form, template_module):
+    """Python source of the module of a compiled markdown file."""
+    imports, definition = _definition_source(Form._mdform_def)
+    return (
+        _HEADER
+        + "from flask_mdform.bundle import make_form_cls\n"
+        + "from flask_mdform.collapse import CollapseMap, Condition\n"
+        + imports
+        + "\n"
+        + f"MDFILE = {mdfile!r}\n"
+        + f"META = {meta!r}\n"
+        + f"TEMPLATE = {tmpl!r}\n"
+        + f"TEMPLATE_MODULE = {template_module!r}\n"
+        + "\n"
+        + "Form = make_form_cls(\n"
+        + f"    {Form.__name__!r},\n"
+        + "    __name__,\n"
+        + "    "
+        + definition.replace("\n", "\n    ")
+        + ",\n"
+        + f"    read_only={read_only!r},\n"
+        + f"    choice_providers={Form._choice_providers!r},\n"
+        + f"    typeahead={tuple(sorted(Form._typeahead))!r},\n"
+        + f"    collapse_map={_collapse_map_source(Form._collapse_map)},\n"
+        + "    mdfile=MDFILE,\n"
+        + ")\n"
+    )
+
+
+def _write_package(app, root, package, entries):
+    """Write the bundle package in root.
+
+    Returns
+    -------
+    List[pathlib.Path]
+        written files.
+    """
+    pkg_dir = pathlib.Path(root, package)
+    pkg_dir.mkdir(parents=True, exist_ok=True)
+
+    written = []
+    index = {}
+    templates = {}
+    with app.app_context():
+        env = app.jinja_env
+        for n, (mdfile, read_only, config_suffix) in enumerate(entries):
+            meta, tmpl, Form = in_app_from_mdfile(
+                mdfile, read_only=read_only, config_suffix=config_suffix
+            )
+
+            key = template_key(tmpl)
+            if key not in templates:
+                templates[key] = f"tmpl_{key}"
+                path = pkg_dir / f"tmpl_{key}.py"
+                path.write_text(
+                    env.compile(tmpl, raw=True, defer_init=True), encoding="utf-8"
+                )
+                written.append(path)
+
+            source = form_module_source(
+                mdfile, read_only, meta, tmpl, Form, templates[key]
+            )
+
+            module = f"form_{n}"
+            path = pkg_dir / f"{module}.py"
+            path.write_text(source, encoding="utf-8")
+            written.append(path)
+            index[(mdfile, read_only, config_suffix)] = module
+
+    path = pkg_dir / "__init__.py"
+    path.write_text(
+        _HEADER + f"FORMAT = {FORMAT!r}\n\nINDEX = {index!r}\n", encoding="utf-8"
+    )
+    written.append(path)
+    return written
+
+
+def build_bundle(
+    app,
+    destination,
+    mdfiles=(),
+    pages=(),
+    *,
+    package="mdform_bundle",
+    read_only=(False, True),
+    zip=False,
+):
+    """Build a bundle of precompiled forms and pages.
+
+    Forms and templates are compiled with the configuration of the app.
+
+    Parameters
+    ----------
+    app : flask.Flask
+    destination : str or os.PathLike
+        folder in which the package (or zip archive) is written.
+    mdfiles : Iterable[str]
+        markdown files (without .md extension) of the forms.
+    pages : Iterable[str]
+        markdown files (without .md extension) of the pages.
+    package : str
+        name of the generated package.
+    read_only : Iterable[bool]
+        variants of the forms to include.
+    zip : bool
+        If true, write `<package>.zip` with the sources and
+        compiled modules instead of a folder.
+
+    Returns
+    -------
+    pathlib.Path
+        the package folder or the zip archive.
+    """
+    entries = [(mdfile, variant, "") for mdfile in mdfiles for variant in read_only] + [
+        (page, False, "_PAGE") for page in pages
+    ]
+
+    destination = pathlib.Path(destination)
+
+    if not zip:
+        _write_package(app, destination, package, entries)
+        compileall.compile_dir(str(destination / package), quiet=1)
+        return destination / package
+
+    destination.mkdir(parents=True, exist_ok=True)
+    out = destination / f"{package}.zip"
+    with tempfile.TemporaryDirectory() as tmp:
+        written = _write_package(app, tmp, package, entries)
+        with zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as zf:
+            for path in written:
+                arcname = path.relative_to(tmp).as_posix()
+                zf.write(path, arcname)
+                # zipimport uses legacy .pyc files next to the sources.
+                cfile = path.with_suffix(".pyc")
+                py_compile.compile(
+                    str(path),
+                    cfile=str(cfile),
+                    dfile=arcname,
+                    doraise=True,
+                    invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH,
+                )
+                zf.write(cfile, arcname[:-3] + ".pyc")
+    return out
+
+
+class Bundle:
+    """An imported bundle.
+
+    Parameters
+    ----------
+    package : module
+        the bundle package.
+    """
+
+    def __init__(self, package):
+        if getattr(package, "FORMAT", None) != FORMAT:
+            raise ValueError(f"{package.__name__} is not a bundle of this version")
+        self.package = package
+        self.index = package.INDEX
+        self._templates = {}
+
+    def _module(self, name):
+        return importlib.import_module(f"{self.package.__name__}.{name}")
+
+    def get_form(self, mdfile, read_only=False, config_suffix=""):
+        """Return the metadata, template and form class of a markdown file,
+        or None if not in the bundle.
+        """
+        name = self.index.get((mdfile, read_only, config_suffix))
+        if name is None:
+            return None
+        module = self._module(name)
+        return module.META, module.TEMPLATE, module.Form
+
+    def get_template(self, environment, tmpl_str):
+        """Return the compiled template, or None if not in the bundle."""
+        key = template_key(tmpl_str)
+        template = self._templates.get(key)
+        if template is not None and template.environment is environment:
+            return template
+
+        try:
+            module = self._module(f"tmpl_{key}")
+        except ImportError:
+            return None
+
+        template = environment.template_class.from_module_dict(
+            environment, module.__dict__, environment.make_globals(None)
+        )
+        self._templates[key] = template
+        return template
+
+
+def load_bundle(location=None, package="mdform_bundle"):
+    """Import a bundle.
+
+    Parameters
+    ----------
+    location : str or os.PathLike or None
+        folder containing the package, or zip archive, which is added
+        to `sys.path`. If None, the package must be importable.
+    package : str
+        name of the package.
+
+    Returns
+    -------
+    Bundle
+    """
+    if location is not None:
+        location = str(location)
+        if location not in sys.path:
+            sys.path.insert(0, location)
+    return Bundle(importlib.import_module(package))
@@ -0,0 +1,179 @@
+"""
+    flask_mdform.cache
+    ~~~~~~~~~~~~~~~~~~
+
+    Cache of rendered output (pages and read-only forms),
+    stored together with its compressed versions.
+
+    Cached output is served compressed, without rendering nor
+    compressing it again, to clients sending a matching `Accept-Encoding`.
+
+    :copyright: 2021 by flask-mdform Authors, see AUTHORS for more details.
+    :license: BSD, see LICENSE for more details.
+"""
+
+from __future__ import annotations
+
+import collections
+import gzip
+import hashlib
+import json
+import threading
+
+from flask import Response, request
+
+
+def gzip_compress(content):
+    """Default gzip compressor (reproducible, as mtime is 0)."""
+    return gzip.compress(content, compresslevel=6, mtime=0)
+
+
+#: Default compressors, by content coding in order of preference.
+DEFAULT_COMPRESSORS = {"gzip": gzip_compress}
+
+
+def data_key(data):
+    """A digest of json compatible data to be used as part of a cache key."""
+    content = json.dumps(data, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha1(content.encode("utf-8")).digest()
+
+
+class CachedOutput:
+    """Rendered output and its compressed versions.
+
+    Parameters
+    ----------
+    content : bytes
+        rendered output.
+    encoded : Dict[str, bytes]
+        compressed output by content coding.
+    mimetype : str
+    """
+
+    __slots__ = ("content", "encoded", "etag", "mimetype")
+
+    def __init__(self, content, encoded, mimetype="text/html"):
+        self.content = content
+        self.encoded = encoded
+        self.etag = hashlib.sha1(content).hexdigest()
+        self.mimetype = mimetype
+
+    @classmethod
+    def from_str(cls, content, compressors, mimetype="text/html"):
+        content = content.encode("utf-8")
+        encoded = {
+            coding: compress(content) for coding, compress in compressors.items()
+        }
+        return cls(content, encoded, mimetype)
+
+    def to_response(self):
+        """Build a response for the current request,
+        compressed if the client accepts any of the available content codings.
+        """
+        coding = None
+        if self.encoded:
+            coding = request.accept_encodings.best_match(self.encoded)
+
+        if coding is None:
+            response = Response(self.content, mimetype=self.mimetype)
+            response.set_etag(self.etag)
+        else:
+            response = Response(self.encoded[coding], mimetype=self.mimetype)
+            response.content_encoding = coding
+            response.set_etag(f"{self.etag}-{coding}")
+
+        if self.encoded:
+            response.vary.add("Accept-Encoding")
+
+        return response.make_conditional(request)
+
+
+class OutputCache:
+    """A thread-safe LRU cache of rendered output.
+
+    Parameters
+    ----------
+    maxsize : int
+        maximum number of cached outputs.
+    compressors : Dict[str, callable (bytes) -> bytes] or None
+        functions used to compress the output by content coding
+        (e.g. {"br": brotli.compress, "gzip": gzip_compress}),
+        in order of preference. If None, use `DEFAULT_COMPRESSORS`.
+    """
+
+    def __init__(self, maxsize=128, compressors=None):
+        self.maxsize = maxsize
+        self.compressors = (
+            DEFAULT_COMPRESSORS if compressors is None else dict(compressors)
+        )
+        self._lock = threading.Lock()
+        self._entries = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """Return the cached output for a key or None."""
+        with self._lock:
+            try:
+                self._entries.move_to_end(key)
+            except KeyError:
+                return None
+            return self._entries[key]
+
+    def set(self, key, content, mimetype="text/html"):
+        """Compress and store rendered output (str).
+
+        Returns
+        -------
+        CachedOutput
+        """
+        entry = CachedOutput.from_str(content, self.compressors, mimetype)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class LRUCache:
+    """A thread-safe mapping keeping the most recently used entries.
+
+    Parameters
+    ----------
+    maxsize : int
+        maximum number of entries.
+    """
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._entries = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, default=None):
+        """Return the value for a key or default."""
+        with self._lock:
+            try:
+                self._entries.move_to_end(key)
+            except KeyError:
+                return default
+            return self._entries[key]
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
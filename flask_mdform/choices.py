@@ -0,0 +1,199 @@
+"""
+    flask_mdform.choices
+    ~~~~~~~~~~~~~~~~~~~~
+
+    Named providers of choices for select, radio and checkbox fields.
+
+    Fields reference a provider in the metadata of the markdown file:
+
+        choices: country = countries
+                 product = catalogue
+
+    and the provider is registered in the app:
+
+        @register_choice_provider("countries", ttl=3600)
+        def countries():
+            return [(c.code, c.name) for c in Country.query.all()]
+
+    :copyright: 2021 by flask-mdform Authors, see AUTHORS for more details.
+    :license: BSD, see LICENSE for more details.
+"""
+
+from __future__ import annotations
+
+import functools
+import logging
+import threading
+import time
+
+from flask import current_app, has_app_context
+
+from .fields import Choices
+
+logger = logging.getLogger(__name__)
+
+#: Metadata key used to reference choice providers.
+META_KEY = "choices"
+
+_PROVIDERS = {}
+
+
+class ChoiceProvider:
+    """Calls a function that returns choices, caching the result.
+
+    Parameters
+    ----------
+    func : callable () -> iterable
+        function returning the choices.
+    ttl : float or None
+        time (in seconds) the choices are cached.
+        If None (default), they never expire.
+    stale_while_revalidate : bool
+        If true, expired choices are returned while they are refreshed
+        in a background thread. Only the first call blocks.
+    """
+
+    def __init__(self, func, ttl=None, stale_while_revalidate=False):
+        self.func = func
+        self.ttl = ttl
+        self.stale_while_revalidate = stale_while_revalidate
+        self._lock = threading.Lock()
+        self._choices = None
+        self._expires = 0.0
+        self._refreshing = False
+
+    def __call__(self):
+        choices = self._choices
+        if choices is not None and not self._is_expired():
+            return choices
+
+        if choices is not None and self.stale_while_revalidate:
+            self._refresh_in_background()
+            return choices
+
+        with self._lock:
+            if self._choices is not None and not self._is_expired():
+                return self._choices
+            return self._load()
+
+    def _is_expired(self):
+        return self.ttl is not None and time.monotonic() >= self._expires
+
+    def _load(self):
+        choices = Choices(self.func())
+        if self.ttl is not None:
+            self._expires = time.monotonic() + self.ttl
+        self._choices = choices
+        return choices
+
+    def _refresh_in_background(self):
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        app = current_app._get_current_object() if has_app_context() else None
+        threading.Thread(target=self._refresh, args=(app,), daemon=True).start()
+
+    def _refresh(self, app):
+        try:
+            if app is None:
+                self._load()
+            else:
+                with app.app_context():
+                    self._load()
+        except Exception:
+            logger.exception("Could not refresh choices from %r", self.func)
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def invalidate(self):
+        """Discard the cached choices."""
+        with self._lock:
+            self._choices = None
+            self._expires = 0.0
+
+
+def register_choice_provider(
+    name, func=None, *, ttl=None, stale_while_revalidate=False
+):
+    """Register a function as a named choice provider.
+
+    It can be used as a decorator.
+
+    Parameters
+    ----------
+    name : str
+        name of the provider, as referenced in the markdown file.
+    func : callable () -> iterable
+        function returning the choices.
+    ttl : float or None
+        time (in seconds) the choices are cached.
+    stale_while_revalidate : bool
+        If true, expired choices are returned while they are refreshed
+        in a background thread.
+
+    Returns
+    -------
+    callable
+    """
+    if func is None:
+        return functools.partial(
+            register_choice_provider,
+            name,
+            ttl=ttl,
+            stale_while_revalidate=stale_while_revalidate,
+        )
+
+    _PROVIDERS[name] = ChoiceProvider(func, ttl, stale_while_revalidate)
+    return func
+
+
+def unregister_choice_provider(name):
+    """Remove a named choice provider."""
+    del _PROVIDERS[name]
+
+
+def get_choice_provider(name):
+    """Return a registered choice provider by name."""
+    try:
+        return _PROVIDERS[name]
+    except KeyError:
+        raise ValueError(f"No choice provider named '{name}'") from None
+
+
+def get_choices(name):
+    """Return the choices of a named choice provider."""
+    return get_choice_provider(name)()
+
+
+def lazy_choices(name):
+    """Return a callable that gets the choices of a named provider
+    when called, i.e. when the field is bound.
+    """
+    return functools.partial(get_choices, name)
+
+
+def providers_from_meta(meta):
+    """Parse the choice providers referenced in the markdown metadata.
+
+    Parameters
+    ----------
+    meta : dict
+        metadata as parsed by the markdown meta extension.
+
+    Returns
+    -------
+    dict
+        maps variable names to provider names.
+    """
+    out = {}
+    for line in meta.get(META_KEY, ()):
+        if not line.strip():
+            continue
+        variable_name, sep, provider = line.partition("=")
+        if not sep or not provider.strip():
+            raise ValueError(f"Cannot parse choice provider '{line}'")
+        out[variable_name.strip()] = provider.strip()
+    return out
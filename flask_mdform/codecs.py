@@ -0,0 +1,90 @@
+"""
+    flask_mdform.codecs
+    ~~~~~~~~~~~~~~~~~~~
+
+    Codecs to encode the plain values of a form to bytes and back
+    (see `DictFormMixin.to_bytes` and `DictFormMixin.from_bytes`).
+
+    - json: uses orjson if installed, otherwise the standard library.
+    - msgpack: available if msgpack is installed.
+
+    :copyright: 2021 by flask-mdform Authors, see AUTHORS for more details.
+    :license: BSD, see LICENSE for more details.
+"""
+
+from __future__ import annotations
+
+import json
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover
+    msgpack = None
+
+_CODECS = {}
+
+
+class Codec:
+    """Encodes json compatible values to bytes and back.
+
+    Parameters
+    ----------
+    name : str
+    mimetype : str
+    dumps : callable (object) -> bytes
+    loads : callable (bytes) -> object
+    """
+
+    __slots__ = ("name", "mimetype", "dumps", "loads")
+
+    def __init__(self, name, mimetype, dumps, loads):
+        self.name = name
+        self.mimetype = mimetype
+        self.dumps = dumps
+        self.loads = loads
+
+    def __repr__(self):
+        return f"<Codec {self.name} ({self.mimetype})>"
+
+
+def register_codec(codec):
+    """Register a codec by name, replacing any codec with the same name."""
+    _CODECS[codec.name] = codec
+
+
+def get_codec(name="json"):
+    """Return a registered codec by name."""
+    try:
+        return _CODECS[name]
+    except KeyError:
+        raise ValueError(
+            f"No codec named '{name}', available codecs are {tuple(_CODECS)}"
+        ) from None
+
+
+def _json_dumps(obj):
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+#: Standard library JSON codec.
+STDLIB_JSON = Codec("json", "application/json", _json_dumps, json.loads)
+
+if orjson is None:
+    register_codec(STDLIB_JSON)
+else:
+    register_codec(Codec("json", "application/json", orjson.dumps, orjson.loads))
+
+if msgpack is not None:
+    register_codec(
+        Codec(
+            "msgpack",
+            "application/msgpack",
+            lambda obj: msgpack.packb(obj, use_bin_type=True),
+            lambda content: msgpack.unpackb(content, raw=False),
+        )
+    )
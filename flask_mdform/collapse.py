@@ -0,0 +1,337 @@
+"""
+    flask_mdform.collapse
+    ~~~~~~~~~~~~~~~~~~~~~
+
+    Server-side handling of collapsable parts:
+
+        show_more = {Yes[o], No}
+
+        [collapse:show_more]
+        details = ___
+        [endcollapse]
+
+    The fields inside a part collapsed for the value of its control field
+    are inactive: they are not validated and can be omitted in read-only
+    forms (`MDFORM_OMIT_INACTIVE`).
+
+    The lines are classified with the form preprocessor of mdform. If its
+    output is not as expected, collapsable parts are ignored with a warning.
+
+    :copyright: 2021 by flask-mdform Authors, see AUTHORS for more details.
+    :license: BSD, see LICENSE for more details.
+"""
+
+from __future__ import annotations
+
+import warnings
+
+from markdown import Markdown
+from mdform import fields as mdform_fields
+from mdform.extension import default_label_sanitizer
+
+try:
+    from mdform.extension import (
+        COLLAPSE_CLOSE_HTML,
+        COLLAPSE_OPEN_HTML,
+        FormPreprocessor,
+    )
+except ImportError:  # pragma: no cover
+    FormPreprocessor = None
+
+
+class Condition:
+    """When a collapsable part is shown.
+
+    Parameters
+    ----------
+    control : str
+        variable name of the select field controlling the part.
+    value : str
+        value of the control field given in the definition.
+    shown_if_equal : bool
+        If true (`[o]`), the part is shown when the control has the value.
+        Otherwise (`[c]`), the part is shown when it has any other value.
+    """
+
+    __slots__ = ("control", "value", "shown_if_equal")
+
+    def __init__(self, control, value, shown_if_equal):
+        self.control = control
+        self.value = value
+        self.shown_if_equal = shown_if_equal
+
+    def __repr__(self):
+        op = "==" if self.shown_if_equal else "!="
+        return f"<Condition {self.control} {op} {self.value!r}>"
+
+    @classmethod
+    def from_field(cls, control, field):
+        """Condition of a field definition, or None if it does not collapse."""
+        collapse_on = getattr(field.specific_field, "collapse_on", None)
+        if not collapse_on:
+            return None
+        if collapse_on.startswith("~"):
+            return cls(control, collapse_on[1:], True)
+        return cls(control, collapse_on, False)
+
+    def is_met(self, data):
+        return (data == self.value) == self.shown_if_equal
+
+
+class CollapseMap:
+    """Collapsable parts of a form and the fields they contain.
+
+    Parameters
+    ----------
+    conditions : Dict[str, Condition]
+        condition of each collapsable part, by control field.
+    dependencies : Dict[str, Tuple[str, ...]]
+        control fields of the parts containing each field (outer first).
+    """
+
+    __slots__ = ("conditions", "dependencies")
+
+    def __init__(self, conditions=None, dependencies=None):
+        self.conditions = conditions or {}
+        self.dependencies = dependencies or {}
+
+    def __bool__(self):
+        return bool(self.dependencies)
+
+    def shown(self, form, control):
+        """True if the part controlled by a field is shown for the form data.
+
+        Control fields that are not in the form are looked up in its
+        `collapse_data` (e.g. the data of the previous steps).
+        """
+        if control in form:
+            condition = self.conditions.get(control)
+            return condition is None or condition.is_met(form[control].data)
+        return self.shown_for_data(getattr(form, "collapse_data", None), control)
+
+    def shown_for_data(self, data, control):
+        """True if the part controlled by a field is shown for a plain dict."""
+        condition = self.conditions.get(control)
+        if condition is None or not data or control not in data:
+            return True
+        return condition.is_met(data[control])
+
+    def _inactive(self, shown):
+        cache = {}
+        out = set()
+        for name, controls in self.dependencies.items():
+            for control in controls:
+                if control not in cache:
+                    cache[control] = shown(control)
+                if not cache[control]:
+                    out.add(name)
+                    break
+        return out
+
+    def inactive_fields(self, form):
+        """Names of the fields inside collapsed parts for the form data."""
+        return self._inactive(lambda control: self.shown(form, control))
+
+    def inactive_fields_for_data(self, data):
+        """Names of the fields inside collapsed parts for a plain dict."""
+        return self._inactive(lambda control: self.shown_for_data(data, control))
+
+    def restrict(self, names):
+        """Collapse map for a subset of the fields.
+
+        Control fields outside the subset are kept, as their value
+        can be given in the `collapse_data` of the form.
+        """
+        names = set(names)
+        return CollapseMap(
+            self.conditions,
+            {
+                name: controls
+                for name, controls in self.dependencies.items()
+                if name in names
+            },
+        )
+
+
+#: Output of the field formatter when classifying lines.
+_FIELD_MARKER = "\x00mdform-field"
+
+
+class _UnexpectedOutput(Exception):
+    pass
+
+
+def _classify(mdstr, sanitizer):
+    found = []
+
+    def formatter(name, field):
+        found.append((name, field))
+        return _FIELD_MARKER
+
+    if FormPreprocessor is None:
+        raise _UnexpectedOutput()
+    try:
+        preprocessor = FormPreprocessor(Markdown(), sanitizer, formatter)
+    except TypeError as ex:
+        raise _UnexpectedOutput(ex)
+    open_prefix, open_suffix = COLLAPSE_OPEN_HTML.split("%s")
+
+    def kind_of(out):
+        if out == _FIELD_MARKER:
+            return "field"
+        if out == COLLAPSE_CLOSE_HTML:
+            return "endcollapse"
+        if out.startswith(open_prefix) and out.endswith(open_suffix):
+            return "collapse"
+        raise _UnexpectedOutput(out)
+
+    lines = mdstr.split("\n")
+
+    # mdform drops section lines, keeps other content as is
+    # and converts fields and collapse markers.
+    converted = []
+    for line in lines:
+        out = preprocessor.run([line])
+        if not out:
+            converted.append(None)
+        elif out == [line]:
+            converted.append(False)
+        elif len(out) == 1:
+            converted.append(kind_of(out[0]))
+        else:
+            raise _UnexpectedOutput(out)
+
+    # The names (with the section and the number of unnamed parts)
+    # are taken from the output of all lines.
+    found.clear()
+    outs = iter(preprocessor.run(lines))
+    fields = iter(found)
+    for line, kind in zip(lines, converted):
+        if kind is None:
+            yield line, None, None, None
+            continue
+        out = next(outs)
+        if kind is False:
+            yield line, None, None, None
+        elif kind_of(out) != kind:
+            raise _UnexpectedOutput(out)
+        elif kind == "field":
+            name, field = next(fields)
+            yield line, kind, name, field
+        elif kind == "collapse":
+            yield line, kind, out[len(open_prefix) : -len(open_suffix)], None
+        else:
+            yield line, kind, None, None
+
+    if next(outs, None) is not None:
+        raise _UnexpectedOutput()
+
+
+def classify_lines(mdstr, sanitizer=default_label_sanitizer):
+    """Classify the lines of markdown form content with the form
+    preprocessor of mdform.
+
+    Parameters
+    ----------
+    mdstr : str
+        markdown content
+    sanitizer : callable
+        label sanitizer used by the FormExtension.
+
+    Returns
+    -------
+    list of (str, str or None, str or None, Field or None) or None
+        line, kind ("collapse", "endcollapse", "field" or None),
+        variable name of the field or control field, field definition.
+        None (with a warning) if the output of mdform is not as expected,
+        e.g. for an unknown version.
+    """
+    try:
+        return list(_classify(mdstr, sanitizer))
+    except _UnexpectedOutput:
+        warnings.warn(
+            "The output of mdform is not as expected, "
+            "collapsable parts are ignored.",
+            RuntimeWarning,
+            stacklevel=2,
+        )
+        return None
+
+
+def parse_collapse(mdstr, sanitizer=default_label_sanitizer):
+    """Build the collapse map of markdown form content.
+
+    Parameters
+    ----------
+    mdstr : str
+        markdown content
+    sanitizer : callable
+        label sanitizer used by the FormExtension.
+
+    Returns
+    -------
+    CollapseMap
+    """
+    lines = classify_lines(mdstr, sanitizer)
+    if lines is None:
+        return CollapseMap()
+
+    conditions = {}
+    dependencies = {}
+    stack = []
+    for _, kind, name, field in lines:
+        if kind == "collapse":
+            stack.append(name)
+        elif kind == "endcollapse":
+            if stack:
+                stack.pop()
+        elif kind == "field":
+            if isinstance(field.specific_field, mdform_fields.SelectField):
+                condition = Condition.from_field(name, field)
+                if condition is not None:
+                    conditions[name] = condition
+            if stack:
+                dependencies[name] = tuple(stack)
+
+    # parts controlled by unknown fields are always shown.
+    dependencies = {
+        name: tuple(control for control in controls if control in conditions)
+        for name, controls in dependencies.items()
+    }
+
+    return CollapseMap(
+        conditions,
+        {name: controls for name, controls in dependencies.items() if controls},
+    )
+
+
+def omit_collapsed(mdstr, collapse_map, sanitizer=default_label_sanitizer):
+    """Wrap the content of collapsable parts in a jinja condition,
+    so that it is omitted if the part is collapsed for the form data.
+
+    Returns
+    -------
+    str
+        markdown content
+    """
+    lines = classify_lines(mdstr, sanitizer)
+    if lines is None:
+        return mdstr
+
+    out = []
+    stack = []
+    for line, kind, name, _ in lines:
+        if kind == "collapse":
+            out.append(line)
+            if name in collapse_map.conditions:
+                out.append('{% if form.section_shown("' + name + '") %}')
+                stack.append(True)
+            else:
+                stack.append(False)
+        elif kind == "endcollapse":
+            if stack and stack.pop():
+                out.append("{% endif %}")
+            out.append(line)
+        else:
+            out.append(line)
+    return "\n".join(out)
@@ -0,0 +1,385 @@
+"""
+    flask_mdform.compose
+    ~~~~~~~~~~~~~~~~~~~~
+
+    Composite forms: several markdown forms shown, validated and
+    serialized together, each under its own prefix.
+
+        @app.route("/checkout", methods=["GET", "POST"])
+        def checkout():
+            return render_composite(
+                ("address", "billing", "preferences"), on_submit=save_checkout
+            )
+
+    The form container has a `FormField` per part (e.g. the `name` field
+    of `address` is submitted as `address-name`), and the template
+    renders the template of each part with `form` bound to the part form.
+
+    :copyright: 2021 by flask-mdform Authors, see AUTHORS for more details.
+    :license: BSD, see LICENSE for more details.
+"""
+
+from __future__ import annotations
+
+from flask_wtf import FlaskForm
+from wtforms import FormField, SubmitField
+
+from .deco import (
+    BLOCK,
+    CLASS_NAME,
+    EXTENDS,
+    EXTENSIONS,
+    FORMATTER,
+    JSON_API,
+    TMPL_CONTEXT,
+    _flash_form_errors,
+    _json_dump,
+    _render_mdform_json,
+    _render_submitted,
+    _submit_form_kwargs,
+    in_app_cached,
+    in_app_get_config,
+    in_app_get_template,
+    in_app_wants_json,
+)
+from .forms import ReadOnlyForm, from_mdstr, generate_form_kwargs, wrap_template
+from .schema import form_schema
+
+
+class _PartMeta:
+    # The CSRF token belongs to the container.
+    csrf = False
+
+
+class CompositeFormMixin:
+    """A form mixin for composite forms, serializing the data
+    to and from a dict with the plain dict of each part.
+    """
+
+    #: form class of each part, by name.
+    _parts = {}
+
+    def iter_parts(self):
+        """Yield the name and form of each part."""
+        for name in self._parts:
+            yield name, self[name].form
+
+    def to_plain_dict(self, upload_func=None):
+        return {
+            name: part.to_plain_dict(upload_func) for name, part in self.iter_parts()
+        }
+
+    @classmethod
+    def from_plain_dict(cls, data, on_missing_field="raise"):
+        return cls(**_parts_kwargs(cls, data, on_missing_field=on_missing_field))
+
+    @classmethod
+    def from_form(cls, form):
+        """Create a read-only composite form with the data of a bound
+        composite form (e.g. the editable variant after validation).
+
+        The data is copied as is, without serializing it.
+        """
+        kwargs = {}
+        for name, part_cls in cls._parts.items():
+            if name in form:
+                part = form[name].form
+                kwargs[name] = {
+                    attr: part[attr].data
+                    for attr in part_cls._read_only_attrs or ()
+                    if attr in part
+                }
+        return cls(formdata=None, **kwargs)
+
+
+def _parts_kwargs(form_cls, data, on_missing_field="raise", skip=()):
+    """Keyword arguments of a composite form from the plain dict of each part."""
+    kwargs = {}
+    for name, part_cls in form_cls._parts.items():
+        if name not in data:
+            continue
+        if not isinstance(data[name], dict):
+            raise ValueError(f"The content of {name} is not a mapping")
+        kwargs[name] = generate_form_kwargs(
+            part_cls, data[name], on_missing_field=on_missing_field, skip=skip
+        )
+    return kwargs
+
+
+def _composite_schema(form_cls):
+    return {name: form_schema(part_cls) for name, part_cls in form_cls._parts.items()}
+
+
+def _composite_json_kwargs(form_cls, payload):
+    return _parts_kwargs(form_cls, payload, on_missing_field="ignore")
+
+
+def _composite_json_dump(form):
+    return {name: _json_dump(part) for name, part in form.iter_parts()}
+
+
+def _part_cls(form_cls):
+    """A subclass of a part form without CSRF token nor submit button."""
+    return type(form_cls.__name__, (form_cls,), {"Meta": _PartMeta, "submit": None})
+
+
+def compose_mdstr(
+    parts,
+    class_name,
+    read_only=False,
+    block=None,
+    extends=None,
+    formatter=None,
+    extensions=(),
+):
+    """Generates the metadata, template and form container
+    of several markdown forms.
+
+    Parameters
+    ----------
+    parts : Iterable[(str, str)]
+        name (used as prefix) and markdown content of each part.
+    class_name : str
+        class of the form container. Parts are named `<class_name>_<name>`.
+    read_only : bool
+        If true, the folder will be rendered as read-only.
+    block :  str
+        Name of the block where the form is inserted.
+    extends : str
+        Name of the template that is extended.
+    formatter : callable
+        That format variable name and dict to string.
+    extensions : list
+        Python Markdown extensions to load.
+
+    Returns
+    -------
+    dict, str, FlaskForm
+        metadata of each part by name, template and form container.
+    """
+    metas = {}
+    htmls = []
+    part_classes = {}
+    attrs = {}
+    for name, mdstr in parts:
+        if name in metas:
+            raise ValueError(f"Duplicate part name: {name}")
+
+        meta, html, form_cls = from_mdstr(
+            mdstr,
+            f"{class_name}_{name}",
+            read_only=read_only,
+            formatter=formatter,
+            extensions=extensions,
+        )
+        metas[name] = meta
+        part_classes[name] = _part_cls(form_cls)
+        attrs[name] = FormField(part_classes[name])
+        htmls.append(
+            '{% with form = form["'
+            + name
+            + '"].form, meta = meta["'
+            + name
+            + '"] %}'
+            + html
+            + "{% endwith %}"
+        )
+
+    attrs["_parts"] = part_classes
+    if read_only:
+        bases = (CompositeFormMixin, ReadOnlyForm)
+    else:
+        bases = (CompositeFormMixin, FlaskForm)
+        attrs["submit"] = SubmitField("Submit")
+
+    cls = type(class_name, bases, attrs)
+
+    return metas, wrap_template("\n".join(htmls), block, extends), cls
+
+
+def in_app_compose(
+    mdfiles,
+    *,
+    read_only=False,
+    class_name=None,
+    block=None,
+    extends=None,
+    formatter=None,
+    extensions=None,
+):
+    """A cached version of `compose_mdstr` that must be used within an flask app.
+
+    Parameters
+    ----------
+    mdfiles : Tuple[str, ...]
+        Filenames of the markdown files (without .md extension),
+        loaded with the app loader. The name of each part is
+        the filename without folders.
+    """
+
+    def build(sources):
+        nonlocal class_name, formatter, extensions, block, extends
+
+        class_name = class_name or in_app_get_config(CLASS_NAME)
+        formatter = formatter or in_app_get_config(FORMATTER)
+        extensions = extensions or in_app_get_config(EXTENSIONS)
+
+        block = block or in_app_get_config(BLOCK)
+        extends = extends or in_app_get_config(EXTENDS)
+
+        if callable(class_name):
+            class_name = class_name("_".join(mdfiles))
+
+        return compose_mdstr(
+            [
+                (mdfile.rsplit("/", 1)[-1], source)
+                for mdfile, source in zip(mdfiles, sources)
+            ],
+            class_name=class_name,
+            read_only=read_only,
+            block=block,
+            extends=extends,
+            formatter=formatter,
+            extensions=extensions,
+        )
+
+    key = (
+        "compose",
+        mdfiles,
+        read_only,
+        class_name,
+        block,
+        extends,
+        formatter,
+        extensions,
+    )
+    return in_app_cached(key, mdfiles, build)
+
+
+def _flash_composite_errors(form):
+    """Flashes the errors of each part."""
+    for _, part in form.iter_parts():
+        _flash_form_errors(part)
+
+
+def render_composite(
+    mdfiles,
+    *,
+    read_only=False,
+    block=None,
+    extends=None,
+    formatter=None,
+    data=None,
+    on_submit=None,
+    flash_form_errors=True,
+    tmpl_context=None,
+    json_api=None,
+    preview=False,
+):
+    """Renders several mdforms as one form with flask (with or without data)
+
+    Requires to be called inside an app.
+
+    Parameters
+    ----------
+    mdfiles : Iterable[str]
+        Filenames of the markdown files (without .md extension)
+        The files are loaded from the flask template folder.
+    read_only : bool
+        If true, the folder will be rendered as read-only.
+    block :  str or None
+        Name of the block where the form is inserted.
+        If None, use app.config["MDFORM_BLOCK"] which is "innerform" by default.
+    extends : str or None
+        Name of the template that is extended.
+        If None, use app.config["MDFORM_EXTENDS"] which is "form.html" by default.
+    formatter : callable
+        That format variable name and dict to string.
+    data : dict or None
+        A dictionary mapping the name of each part to its data
+        (as returned by `CompositeFormMixin.to_plain_dict`).
+        If None, the data will be shown as empty.
+    on_submit : callable or None
+        Functional that will be called upon form submission.
+        If it raises NotImplementedError, the submitted data is
+        rendered read-only.
+    flash_form_errors : bool or callable
+        Call flash errors for a given form. (default: True)
+        Alternatively, a callable that takes a `flask_wtf.FlaskForm` form object
+        and calls `flask.flash` can be used to customize the error message.
+    tmpl_context : dict or None
+        the variables that should be available in the context of the template.
+    json_api : bool or None
+        If true, requests with a JSON body or preferring a JSON response
+        are answered with JSON instead of a rendered template, as in
+        `render_mdform`. The data, schema and payload have an entry
+        per part. If None, use app.config["MDFORM_JSON_API"].
+    preview : bool
+        If true, a successfully submitted form is rendered read-only
+        with the submitted data instead of calling `on_submit`.
+
+    Returns
+    -------
+    Return a rendered form.
+    """
+    tmpl_context = tmpl_context or {}
+
+    for key in ("form", "meta"):
+        if key in tmpl_context:
+            raise ValueError(
+                f"'{key}' cannot be a key in the `tmpl_context` dict as it is reserved by flask-mdform"
+            )
+
+    mdfiles = tuple(mdfiles)
+
+    meta, tmpl_str, Form = in_app_compose(
+        mdfiles,
+        read_only=read_only,
+        block=block,
+        extends=extends,
+        formatter=formatter,
+    )
+
+    if json_api is None:
+        json_api = in_app_get_config(JSON_API)
+
+    if json_api and in_app_wants_json():
+        return _render_mdform_json(
+            Form,
+            data,
+            on_submit,
+            schema=_composite_schema,
+            form_kwargs=_composite_json_kwargs,
+            dump=_composite_json_dump,
+        )
+
+    form_kwargs = _submit_form_kwargs(read_only, on_submit)
+    if data is not None:
+        form_kwargs.update(_parts_kwargs(Form, data))
+    form = Form(**form_kwargs)
+
+    cfg_tmpl_context = in_app_get_config(TMPL_CONTEXT)
+    if cfg_tmpl_context:
+        tmpl_context = {**cfg_tmpl_context, **tmpl_context}
+
+    if on_submit is not None and form.validate_on_submit():
+        return _render_submitted(
+            form,
+            on_submit,
+            preview,
+            lambda: in_app_compose(
+                mdfiles,
+                read_only=True,
+                block=block,
+                extends=extends,
+                formatter=formatter,
+            ),
+            tmpl_context,
+        )
+
+    if callable(flash_form_errors):
+        flash_form_errors(form)
+    elif flash_form_errors:
+        _flash_composite_errors(form)
+
+    return in_app_get_template(tmpl_str).render(form=form, meta=meta, **tmpl_context)
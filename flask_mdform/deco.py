@@ -12,10 +12,25 @@ from __future__ import annotations
 
 import functools
 
-from flask import current_app, flash, request
-
-from . import formatters
-from .forms import from_mdstr
+from flask import current_app, flash, jsonify, request
+from flask.globals import request_ctx
+from flask_wtf.csrf import validate_csrf
+from flask_wtf.form import SUBMIT_METHODS
+from jinja2 import TemplateNotFound
+from wtforms.validators import ValidationError
+
+from . import codecs, formatters
+from .cache import LRUCache, OutputCache, data_key
+from .forms import (
+    _as_is,
+    dump_form_values,
+    from_mdstr,
+    generate_form_kwargs,
+    relabel_form_cls,
+)
+from .layers import apply_layer
+from .loaders import JinjaLoader
+from .schema import form_schema
 
 CONFIG_PREFIX = "MDFORM_"
 
@@ -25,6 +40,23 @@ EXTENDS = CONFIG_PREFIX + "EXTENDS"
 FORMATTER = CONFIG_PREFIX + "FORMATTER"
 TMPL_CONTEXT = CONFIG_PREFIX + "TMPL_CONTEXT"
 EXTENSIONS = CONFIG_PREFIX + "EXTENSIONS"
+BLUEPRINT = CONFIG_PREFIX + "BLUEPRINT"
+JSON_API = CONFIG_PREFIX + "JSON_API"
+OUTPUT_CACHE_SIZE = CONFIG_PREFIX + "OUTPUT_CACHE_SIZE"
+COMPRESSORS = CONFIG_PREFIX + "COMPRESSORS"
+OMIT_INACTIVE = CONFIG_PREFIX + "OMIT_INACTIVE"
+LOADER = CONFIG_PREFIX + "LOADER"
+BUNDLE = CONFIG_PREFIX + "BUNDLE"
+TEMPLATE_CACHE_SIZE = CONFIG_PREFIX + "TEMPLATE_CACHE_SIZE"
+LOCALE_SELECTOR = CONFIG_PREFIX + "LOCALE_SELECTOR"
+LOCALE_CACHE_SIZE = CONFIG_PREFIX + "LOCALE_CACHE_SIZE"
+TRANSLATE_LABEL = CONFIG_PREFIX + "TRANSLATE_LABEL"
+TENANT_SELECTOR = CONFIG_PREFIX + "TENANT_SELECTOR"
+TENANT_LAYER = CONFIG_PREFIX + "TENANT_LAYER"
+TENANT_CACHE_SIZE = CONFIG_PREFIX + "TENANT_CACHE_SIZE"
+LOOKUP_CACHE_SIZE = CONFIG_PREFIX + "LOOKUP_CACHE_SIZE"
+
+STEPS_MAX_AGE = CONFIG_PREFIX + "STEPS_MAX_AGE"
 
 BLOCK_PAGE = CONFIG_PREFIX + "BLOCK_PAGE"
 EXTENDS_PAGE = CONFIG_PREFIX + "EXTENDS_PAGE"
@@ -36,6 +68,22 @@ DEFAULTS = {
     FORMATTER: formatters.flask_wtf,
     TMPL_CONTEXT: dict(),
     EXTENSIONS: [],
+    BLUEPRINT: "mdform",
+    JSON_API: False,
+    OUTPUT_CACHE_SIZE: 128,
+    COMPRESSORS: None,
+    OMIT_INACTIVE: False,
+    LOADER: None,
+    BUNDLE: None,
+    TEMPLATE_CACHE_SIZE: 1024,
+    LOCALE_SELECTOR: None,
+    LOCALE_CACHE_SIZE: 64,
+    TRANSLATE_LABEL: None,
+    TENANT_SELECTOR: None,
+    TENANT_LAYER: "tenants/{tenant}/{mdfile}",
+    TENANT_CACHE_SIZE: 64,
+    LOOKUP_CACHE_SIZE: 1024,
+    STEPS_MAX_AGE: 3600,
     EXTENDS_PAGE: "simple.html",
     BLOCK_PAGE: "inner_simple",
 }
@@ -59,7 +107,353 @@ def in_app_get_mdfile():
     return request.view_args.get("mdfile", request.endpoint.replace(".", "/"))
 
 
-@functools.lru_cache(maxsize=None)
+def in_app_wants_json():
+    """True if the request has a JSON body or the client prefers JSON."""
+    if request.is_json:
+        return True
+    best = request.accept_mimetypes.best_match(("text/html", "application/json"))
+    return best == "application/json"
+
+
+def _json_form_kwargs(Form, payload):
+    return generate_form_kwargs(
+        Form, payload, on_missing_field="ignore", skip=("submit",)
+    )
+
+
+def _json_dump(form):
+    # JSON payloads cannot upload files, these are given by reference.
+    return dump_form_values(form, _as_is)
+
+
+def _render_mdform_json(
+    Form,
+    data,
+    on_submit,
+    *,
+    schema=form_schema,
+    form_kwargs=_json_form_kwargs,
+    dump=_json_dump,
+):
+    """JSON version of render_mdform.
+
+    - GET (or no on_submit): returns the data and the form schema.
+    - submit: parses the JSON body through the form class field plan,
+      validates and calls on_submit. Errors are returned as JSON.
+
+    If CSRF is enabled (app.config["WTF_CSRF_ENABLED"]), the token of
+    the session must be given as `csrf_token` in the body or in the
+    `X-CSRFToken` header. It is checked without generating a token,
+    so the session is not written.
+
+    schema, form_kwargs and dump allow other kinds of forms
+    (e.g. composite forms) to share this flow.
+    """
+    if on_submit is None or request.method not in SUBMIT_METHODS:
+        return jsonify(data=data or {}, schema=schema(Form))
+
+    codec = codecs.get_codec("json")
+
+    try:
+        payload = codec.loads(request.get_data()) if request.is_json else None
+    except ValueError:
+        payload = None
+    if not isinstance(payload, dict):
+        return jsonify(errors={"form": ["Invalid JSON payload."]}), 400
+
+    csrf_token = payload.pop("csrf_token", None) or request.headers.get("X-CSRFToken")
+
+    try:
+        kwargs = form_kwargs(Form, payload)
+    except (ValueError, TypeError) as ex:
+        return jsonify(errors={"form": [str(ex)]}), 400
+
+    if current_app.config.get("WTF_CSRF_ENABLED", True):
+        try:
+            validate_csrf(csrf_token)
+        except ValidationError as ex:
+            return jsonify(errors={"csrf_token": [str(ex)]}), 400
+
+    form = Form(formdata=None, meta={"csrf": False}, **kwargs)
+
+    if not form.validate():
+        return jsonify(errors=form.errors), 400
+
+    try:
+        return on_submit(form, **request.view_args)
+    except NotImplementedError:
+        return current_app.response_class(
+            codec.dumps({"data": dump(form)}), mimetype=codec.mimetype
+        )
+
+
+def _submit_form_kwargs(read_only, on_submit):
+    """Keyword arguments of a form that may take a submission."""
+    if read_only and on_submit is not None:
+        # Read-only forms are rendered without a CSRF token,
+        # but their submissions are protected as any other.
+        return {"meta": {"csrf": current_app.config.get("WTF_CSRF_ENABLED", True)}}
+    return {}
+
+
+def _render_submitted(form, on_submit, preview, compile_read_only, tmpl_context):
+    """Call on_submit with a validated form.
+
+    In preview, or if on_submit raises NotImplementedError,
+    the data is rendered with the read-only variant instead
+    (given by compile_read_only as meta, template and form class).
+    """
+    if not preview:
+        try:
+            return on_submit(form, **request.view_args)
+        except NotImplementedError:
+            pass
+
+    # The validated data is shown in the read-only variant.
+    meta, tmpl_str, Form = compile_read_only()
+    return in_app_get_template(tmpl_str).render(
+        form=Form.from_form(form), meta=meta, **tmpl_context
+    )
+
+
+def in_app_get_loader():
+    """The markdown source loader of the current app.
+
+    Given by app.config["MDFORM_LOADER"]. If None, markdown files are loaded
+    from the flask template folder (see `loaders.JinjaLoader`).
+    """
+    loader = in_app_get_config(LOADER)
+    if loader is None:
+        loader = current_app.extensions.get("mdform_loader")
+        if loader is None:
+            loader = current_app.extensions.setdefault("mdform_loader", JinjaLoader())
+    return loader
+
+
+def in_app_cached(key, mdfiles, build, cache=None):
+    """Return the value built from the sources of markdown files,
+    cached in the current app until the version of any of them changes.
+
+    Parameters
+    ----------
+    key : hashable
+        cache key.
+    mdfiles : Tuple[str, ...]
+        names of the markdown files (without .md extension).
+    build : callable (List[str]) -> object
+        builds the value from the sources.
+    cache : mapping or None
+        where the value is stored (e.g. `in_app_get_locale_cache()`).
+        If None, the values are kept while the app lives.
+    """
+    if cache is None:
+        cache = current_app.extensions.setdefault("mdform_compiled", {})
+    loader = in_app_get_loader()
+
+    entry = cache.get(key)
+    if entry is not None:
+        versions, value = entry
+        if all(
+            loader.get_version(mdfile) == version
+            for mdfile, version in zip(mdfiles, versions)
+        ):
+            return value
+
+    sources, versions = [], []
+    for mdfile in mdfiles:
+        source, version = loader.get_source(mdfile)
+        sources.append(source)
+        versions.append(version)
+
+    value = build(sources)
+    cache[key] = (tuple(versions), value)
+    return value
+
+
+def in_app_get_locale():
+    """The locale of the current request, as a string (e.g. "pt_BR"),
+    or None.
+
+    Given by calling app.config["MDFORM_LOCALE_SELECTOR"]
+    (e.g. `flask_babel.get_locale`), if set.
+    """
+    selector = in_app_get_config(LOCALE_SELECTOR)
+    if selector is None:
+        return None
+    locale = selector()
+    return None if locale is None else str(locale)
+
+
+def locale_chain(locale):
+    """Locales to look for, from the most specific.
+
+    >>> locale_chain("pt-BR")
+    ('pt_BR', 'pt')
+    """
+    parts = locale.replace("-", "_").split("_")
+    return tuple("_".join(parts[:n]) for n in range(len(parts), 0, -1))
+
+
+def in_app_get_locale_cache():
+    """The cache of the per-locale variants of the current app.
+
+    It keeps the most recently used app.config["MDFORM_LOCALE_CACHE_SIZE"]
+    entries, so memory does not grow with the number of locales.
+    """
+    cache = current_app.extensions.get("mdform_locale_cache")
+    if cache is None:
+        cache = current_app.extensions.setdefault(
+            "mdform_locale_cache", LRUCache(in_app_get_config(LOCALE_CACHE_SIZE))
+        )
+    return cache
+
+
+def in_app_get_lookup_cache():
+    """The cache of the markdown files found for each locale and tenant
+    (see `in_app_localized_mdfile` and `in_app_tenant_layer`).
+
+    It is separate from the caches of the variants, so looking up many
+    locales or tenants without their own files does not evict the
+    compiled variants. It keeps the most recently used
+    app.config["MDFORM_LOOKUP_CACHE_SIZE"] entries.
+    """
+    cache = current_app.extensions.get("mdform_lookup_cache")
+    if cache is None:
+        cache = current_app.extensions.setdefault(
+            "mdform_lookup_cache", LRUCache(in_app_get_config(LOOKUP_CACHE_SIZE))
+        )
+    return cache
+
+
+def _in_app_find_source(key, names):
+    """The first of the names found by the app loader, or None.
+
+    As with jinja templates, the result is cached unless
+    `app.jinja_env.auto_reload` is true.
+    """
+    cache = in_app_get_lookup_cache()
+    entry = cache.get(key)
+    if entry is None or current_app.jinja_env.auto_reload:
+        loader = in_app_get_loader()
+        entry = (None,)
+        for name in names:
+            try:
+                loader.get_version(name)
+            except TemplateNotFound:
+                continue
+            entry = (name,)
+            break
+        cache[key] = entry
+    return entry[0]
+
+
+def in_app_localized_mdfile(mdfile, locale):
+    """Name of the markdown file of a locale.
+
+    The first `<locale>/<mdfile>` found by the app loader for the locales
+    in `locale_chain`, or mdfile if there is none.
+    """
+    name = _in_app_find_source(
+        ("locale", mdfile, locale),
+        [f"{candidate}/{mdfile}" for candidate in locale_chain(locale)],
+    )
+    return mdfile if name is None else name
+
+
+def in_app_get_tenant():
+    """The tenant of the current request, as a string, or None.
+
+    Given by calling app.config["MDFORM_TENANT_SELECTOR"], if set.
+    """
+    selector = in_app_get_config(TENANT_SELECTOR)
+    if selector is None:
+        return None
+    tenant = selector()
+    return None if tenant is None else str(tenant)
+
+
+def in_app_get_tenant_cache():
+    """The cache of the per-tenant variants of the current app.
+
+    It keeps the most recently used app.config["MDFORM_TENANT_CACHE_SIZE"]
+    entries.
+    """
+    cache = current_app.extensions.get("mdform_tenant_cache")
+    if cache is None:
+        cache = current_app.extensions.setdefault(
+            "mdform_tenant_cache", LRUCache(in_app_get_config(TENANT_CACHE_SIZE))
+        )
+    return cache
+
+
+def in_app_tenant_layer(mdfile, tenant):
+    """Name of the override layer of a markdown file for a tenant,
+    or None if there is none.
+
+    Given by app.config["MDFORM_TENANT_LAYER"], formatted with
+    tenant and mdfile ("tenants/{tenant}/{mdfile}" by default).
+    """
+    name = in_app_get_config(TENANT_LAYER).format(tenant=tenant, mdfile=mdfile)
+    return _in_app_find_source(("tenant", mdfile, tenant), [name])
+
+
+def _in_app_compile(
+    mdfile,
+    source,
+    *,
+    read_only,
+    class_name,
+    block,
+    extends,
+    formatter,
+    extensions,
+    config_suffix,
+    cache=None,
+):
+    """Compile (or get from the cache) the markdown file source as mdfile."""
+
+    def build(sources):
+        nonlocal class_name, formatter, extensions, block, extends
+
+        class_name = class_name or in_app_get_config(CLASS_NAME)
+        formatter = formatter or in_app_get_config(FORMATTER)
+        extensions = extensions or in_app_get_config(EXTENSIONS)
+
+        block = block or in_app_get_config(BLOCK + config_suffix)
+        extends = extends or in_app_get_config(EXTENDS + config_suffix)
+
+        if callable(class_name):
+            class_name = class_name(mdfile)
+
+        meta, tmpl, Form = from_mdstr(
+            sources[0],
+            class_name=class_name,
+            read_only=read_only,
+            block=block,
+            extends=extends,
+            formatter=formatter,
+            extensions=extensions,
+            omit_inactive=read_only and in_app_get_config(OMIT_INACTIVE),
+        )
+
+        Form._mdfile = mdfile
+
+        return meta, tmpl, Form
+
+    key = (
+        "form",
+        source,
+        read_only,
+        class_name,
+        block,
+        extends,
+        formatter,
+        extensions,
+        config_suffix,
+    )
+    return in_app_cached(key, (source,), build, cache)
+
+
 def in_app_from_mdfile(
     mdfile,
     *,
@@ -70,34 +464,180 @@ def in_app_from_mdfile(
     formatter=None,
     extensions=None,
     config_suffix="",
+    locale=None,
+    tenant=None,
 ):
-    """A cached version of `from_mdfile` that must be used within an flask app."""
-    mdfile_name = mdfile + ".md"
+    """A cached version of `from_mdfile` that must be used within an flask app.
 
-    class_name = class_name or in_app_get_config(CLASS_NAME)
-    formatter = formatter or in_app_get_config(FORMATTER)
-    extensions = extensions or in_app_get_config(EXTENSIONS)
+    The source is loaded with the app loader (see `in_app_get_loader`)
+    and compiled again only if its version changes.
 
-    block = block or in_app_get_config(BLOCK + config_suffix)
-    extends = extends or in_app_get_config(EXTENDS + config_suffix)
+    Collapsed parts of read-only forms are omitted
+    if app.config["MDFORM_OMIT_INACTIVE"] is True.
 
-    if callable(class_name):
-        class_name = class_name(mdfile)
+    Forms included in app.config["MDFORM_BUNDLE"] (see `bundle`) are
+    taken from it, unless options other than read_only are given.
 
-    source, _, _ = current_app.jinja_loader.get_source(
-        current_app.jinja_env, f"md/{mdfile_name}"
-    )
+    For a locale (if None, given by `in_app_get_locale`), the source is
+    `<locale>/<mdfile>` if available (see `in_app_localized_mdfile`).
+    Otherwise, the form of mdfile is used with the labels translated by
+    app.config["MDFORM_TRANSLATE_LABEL"], a callable (label, locale) -> str,
+    if set. The translated form class shares the fields and template of
+    the form class (see `forms.relabel_form_cls`). Per-locale variants are
+    kept in `in_app_get_locale_cache`.
 
-    return from_mdstr(
-        source,
-        class_name=class_name,
+    For a tenant (if None, given by `in_app_get_tenant`) with an override
+    layer (see `in_app_tenant_layer`), the layer is applied on top of the
+    form (see `layers.apply_layer`). Per-tenant variants are kept in
+    `in_app_get_tenant_cache`.
+    """
+    options = dict(
         read_only=read_only,
+        class_name=class_name,
         block=block,
         extends=extends,
         formatter=formatter,
         extensions=extensions,
+        config_suffix=config_suffix,
     )
 
+    if locale is None:
+        locale = in_app_get_locale()
+    if tenant is None:
+        tenant = in_app_get_tenant()
+
+    compiled = None
+    source = mdfile if locale is None else in_app_localized_mdfile(mdfile, locale)
+    if source != mdfile:
+        compiled = _in_app_compile(
+            mdfile, source, cache=in_app_get_locale_cache(), **options
+        )
+    else:
+        bundle = in_app_get_config(BUNDLE)
+        if bundle is not None and not (
+            class_name or block or extends or formatter or extensions
+        ):
+            compiled = bundle.get_form(mdfile, read_only, config_suffix)
+        if compiled is None:
+            compiled = _in_app_compile(mdfile, mdfile, **options)
+
+        translate = locale is not None and in_app_get_config(TRANSLATE_LABEL)
+        if translate and compiled[2]._mdform_def:
+            compiled = _in_app_translated(compiled, locale, translate)
+
+    layer = None if tenant is None else in_app_tenant_layer(mdfile, tenant)
+    if layer is None:
+        return compiled
+
+    meta, tmpl, Form = compiled
+
+    def build(sources):
+        return apply_layer(
+            meta,
+            tmpl,
+            Form,
+            sources[0],
+            block=block or in_app_get_config(BLOCK + config_suffix),
+            formatter=formatter or in_app_get_config(FORMATTER),
+            extensions=extensions or in_app_get_config(EXTENSIONS),
+            omit_inactive=in_app_get_config(OMIT_INACTIVE),
+        )
+
+    # The variant is compiled again if the form class changes.
+    key = ("layer", layer, Form, block, formatter, extensions, config_suffix)
+    return in_app_cached(key, (layer,), build, in_app_get_tenant_cache())
+
+
+def _in_app_translated(compiled, locale, translate):
+    """The compiled form with the labels translated for a locale."""
+    meta, tmpl, Form = compiled
+    cache = in_app_get_locale_cache()
+    key = ("relabel", Form, locale)
+    Translated = cache.get(key)
+    if Translated is None:
+        Translated = relabel_form_cls(Form, lambda label: translate(label, locale))
+        cache[key] = Translated
+    return meta, tmpl, Translated
+
+
+def _in_app_source_version(mdfile):
+    """The locale, the names and the versions of the source of mdfile and
+    of the override layer of the tenant, to be used as part of an output
+    cache key.
+    """
+    loader = in_app_get_loader()
+    locale = in_app_get_locale()
+    source = mdfile if locale is None else in_app_localized_mdfile(mdfile, locale)
+
+    tenant = in_app_get_tenant()
+    layer = None if tenant is None else in_app_tenant_layer(mdfile, tenant)
+    layer_version = None if layer is None else loader.get_version(layer)
+
+    return locale, source, loader.get_version(source), layer, layer_version
+
+
+def _compile_template(jinja_env, tmpl_str):
+    return jinja_env.from_string(tmpl_str)
+
+
+def in_app_get_template(tmpl_str):
+    """A cached version of `jinja_env.from_string` that must be used within an flask app.
+
+    Templates generated from markdown are compiled once per app, and the
+    most recently used app.config["MDFORM_TEMPLATE_CACHE_SIZE"] are kept,
+    or taken from app.config["MDFORM_BUNDLE"] if included.
+    """
+    bundle = in_app_get_config(BUNDLE)
+    if bundle is not None:
+        template = bundle.get_template(current_app.jinja_env, tmpl_str)
+        if template is not None:
+            return template
+
+    cache = current_app.extensions.get("mdform_templates")
+    if cache is None:
+        cache = current_app.extensions.setdefault(
+            "mdform_templates", LRUCache(in_app_get_config(TEMPLATE_CACHE_SIZE))
+        )
+    template = cache.get(tmpl_str)
+    if template is None:
+        template = _compile_template(current_app.jinja_env, tmpl_str)
+        cache[tmpl_str] = template
+    return template
+
+
+def in_app_get_output_cache():
+    """The output cache of the current app.
+
+    Its size and compressors are given by app.config["MDFORM_OUTPUT_CACHE_SIZE"]
+    and app.config["MDFORM_COMPRESSORS"].
+    """
+    cache = current_app.extensions.get("mdform_output_cache")
+    if cache is None:
+        cache = current_app.extensions.setdefault(
+            "mdform_output_cache",
+            OutputCache(
+                in_app_get_config(OUTPUT_CACHE_SIZE), in_app_get_config(COMPRESSORS)
+            ),
+        )
+    return cache
+
+
+def _cached_output(key, render):
+    """Serve the output from the cache, rendering it if missing.
+
+    The session is not accessed, so messages flashed while
+    serving cached output are kept for the next rendered page.
+    """
+    cache = in_app_get_output_cache()
+    entry = cache.get(key)
+    if entry is None:
+        content = render()
+        if getattr(request_ctx, "flashes", None):
+            # flashed messages are shown only once.
+            return content
+        entry = cache.set(key, content)
+    return entry.to_response()
+
 
 def render_mdpage(
     mdfile=None,
@@ -142,7 +682,7 @@ def render_mdpage(
     if cfg_tmpl_context:
         tmpl_context = {**cfg_tmpl_context, **tmpl_context}
 
-    return current_app.jinja_env.from_string(tmpl_str).render(meta=meta, **tmpl_context)
+    return in_app_get_template(tmpl_str).render(meta=meta, **tmpl_context)
 
 
 def render_mdform(
@@ -156,6 +696,8 @@ def render_mdform(
     on_submit=None,
     flash_form_errors=None,
     tmpl_context=None,
+    json_api=None,
+    preview=False,
 ):
     """Renders an mdform with flask (with or without data)
 
@@ -182,12 +724,22 @@ def render_mdform(
         That format variable name and dict to string.
     on_submit : callable or None
         Functional that will be called upon form submission.
+        If it raises NotImplementedError, the submitted data is
+        rendered read-only.
     flash_form_errors : bool or callable
         Call flash errors for a given form. (default: True)
         Alternatively, a callable that takes a `flask_wtf.FlaskForm` form object
         and calls `flask.flash` can be used to customize the error message.
     tmpl_context : dict or None
         the variables that should be available in the context of the template.
+    json_api : bool or None
+        If true, requests with a JSON body or preferring a JSON response
+        are answered with JSON instead of a rendered template
+        (without flashing). If None, use app.config["MDFORM_JSON_API"]
+        which is False by default.
+    preview : bool
+        If true, a successfully submitted form is rendered read-only
+        with the submitted data instead of calling `on_submit`.
 
     Returns
     -------
@@ -206,39 +758,42 @@ def render_mdform(
         mdfile, read_only=read_only, block=block, extends=extends, formatter=formatter
     )
 
-    if data is None:
-        form = Form()
-    else:
-        form = Form.from_plain_dict(data)
+    if json_api is None:
+        json_api = in_app_get_config(JSON_API)
+
+    if json_api and in_app_wants_json():
+        return _render_mdform_json(Form, data, on_submit)
+
+    form_kwargs = _submit_form_kwargs(read_only, on_submit)
+    if data is not None:
+        form_kwargs.update(generate_form_kwargs(Form, data))
+    form = Form(**form_kwargs)
+
+    cfg_tmpl_context = in_app_get_config(TMPL_CONTEXT)
+    if cfg_tmpl_context:
+        tmpl_context = {**cfg_tmpl_context, **tmpl_context}
 
     if form.validate_on_submit():
-        try:
-            return on_submit(form, **request.view_args)
-        except NotImplementedError:
-            meta, tmpl_str, Form = in_app_from_mdfile(
+        return _render_submitted(
+            form,
+            on_submit,
+            preview,
+            lambda: in_app_from_mdfile(
                 mdfile,
                 read_only=True,
                 block=block,
                 extends=extends,
                 formatter=formatter,
-            )
-            form = Form.from_plain_dict(form.to_plain_dict())
-            return current_app.jinja_env.from_string(tmpl_str).render(
-                form=form, meta=meta
-            )
+            ),
+            tmpl_context,
+        )
 
     if callable(flash_form_errors):
         flash_form_errors(form)
     elif flash_form_errors:
         _flash_form_errors(form)
 
-    cfg_tmpl_context = in_app_get_config(TMPL_CONTEXT)
-    if cfg_tmpl_context:
-        tmpl_context = {**cfg_tmpl_context, **tmpl_context}
-
-    return current_app.jinja_env.from_string(tmpl_str).render(
-        form=form, meta=meta, **tmpl_context
-    )
+    return in_app_get_template(tmpl_str).render(form=form, meta=meta, **tmpl_context)
 
 
 def on_get_page(
@@ -247,6 +802,7 @@ def on_get_page(
     extends=None,
     formatter=None,
     flash_form_errors=True,
+    cache_output=False,
 ):
     """Flask decorator for app routes that renders a form,
     calling then wrapped function on successful form submission.
@@ -268,6 +824,10 @@ def on_get_page(
         Call flash errors for a given form. (default: True)
         Alternatively, a callable that takes a `flask_wtf.FlaskForm` form object
         and calls `flask.flash` can be used to customize the error message.
+    cache_output : bool
+        If true, the rendered output is cached (and compressed) by
+        template context (see `in_app_get_output_cache`). Use it only if
+        the page does not depend on anything else (e.g. the current user).
     """
 
     def decorator(f):
@@ -280,12 +840,25 @@ def on_get_page(
 
             tmpl_context = f(**request.view_args)
 
-            return render_mdpage(
-                mdfile,
-                block=block,
-                extends=extends,
-                tmpl_context=tmpl_context,
-            )
+            def render():
+                return render_mdpage(
+                    mdfile,
+                    block=block,
+                    extends=extends,
+                    tmpl_context=tmpl_context,
+                )
+
+            if cache_output:
+                key = (
+                    "page",
+                    *_in_app_source_version(mdfile),
+                    block,
+                    extends,
+                    data_key(tmpl_context),
+                )
+                return _cached_output(key, render)
+
+            return render()
 
         return decorated_function
 
@@ -299,6 +872,9 @@ def on_get_form(
     extends=None,
     formatter=None,
     flash_form_errors=True,
+    json_api=None,
+    cache_output=False,
+    preview=False,
 ):
     """Flask decorator for app routes that renders a form,
     calling then wrapped function on successful form submission.
@@ -322,8 +898,20 @@ def on_get_form(
         Call flash errors for a given form. (default: True)
         Alternatively, a callable that takes a `flask_wtf.FlaskForm` form object
         and calls `flask.flash` can be used to customize the error message.
+    json_api : bool or None
+        If true, clients preferring JSON get the data and the form schema.
+        If None, use app.config["MDFORM_JSON_API"] which is False by default.
+    preview : bool
+        If true, a successfully submitted form is rendered read-only
+        with the submitted data.
+    cache_output : bool
+        If true, the rendered output is cached (and compressed) by data
+        (see `in_app_get_output_cache`). Only for read-only forms.
     """
 
+    if cache_output and not read_only:
+        raise ValueError("Only read-only forms can be cached (`cache_output`).")
+
     def decorator(f):
         @functools.wraps(f)
         def decorated_function(*args, **kwargs):
@@ -339,17 +927,37 @@ def on_get_form(
             else:
                 tmpl_context = dict()
 
-            return render_mdform(
-                mdfile,
-                read_only=read_only,
-                block=block,
-                extends=extends,
-                formatter=formatter,
-                data=data,
-                on_submit=None,
-                flash_form_errors=flash_form_errors,
-                tmpl_context=tmpl_context,
-            )
+            def render():
+                return render_mdform(
+                    mdfile,
+                    read_only=read_only,
+                    block=block,
+                    extends=extends,
+                    formatter=formatter,
+                    data=data,
+                    on_submit=None,
+                    flash_form_errors=flash_form_errors,
+                    tmpl_context=tmpl_context,
+                    json_api=json_api,
+                    preview=preview,
+                )
+
+            if cache_output and not (
+                (in_app_get_config(JSON_API) if json_api is None else json_api)
+                and in_app_wants_json()
+            ):
+                key = (
+                    "form",
+                    *_in_app_source_version(mdfile),
+                    block,
+                    extends,
+                    formatter,
+                    data_key(data),
+                    data_key(tmpl_context),
+                )
+                return _cached_output(key, render)
+
+            return render()
 
         return decorated_function
 
@@ -363,6 +971,8 @@ def on_submit_form(
     extends=None,
     formatter=None,
     flash_form_errors=True,
+    json_api=None,
+    preview=False,
 ):
     """Flask decorator for app routes that renders a form,
     calling then wrapped function on successful form submission.
@@ -386,6 +996,13 @@ def on_submit_form(
         Call flash errors for a given form. (default: True)
         Alternatively, a callable that takes a `flask_wtf.FlaskForm` form object
         and calls `flask.flash` can be used to customize the error message.
+    json_api : bool or None
+        If true, JSON bodies are parsed using the form class and
+        the errors are returned as JSON.
+        If None, use app.config["MDFORM_JSON_API"] which is False by default.
+    preview : bool
+        If true, a successfully submitted form is rendered read-only
+        with the submitted data instead of calling the wrapped function.
     """
 
     def decorator(f):
@@ -405,6 +1022,8 @@ def on_submit_form(
                 data=None,
                 on_submit=f,
                 flash_form_errors=flash_form_errors,
+                json_api=json_api,
+                preview=preview,
             )
 
         return decorated_function
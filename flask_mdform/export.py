@@ -0,0 +1,223 @@
+"""
+    flask_mdform.export
+    ~~~~~~~~~~~~~~~~~~~
+
+    Export stored submissions (plain dicts as returned by `to_plain_dict`)
+    to CSV or JSON Lines, with columns derived from the form definition.
+
+        @app.route("/admin/survey.csv")
+        def export_survey():
+            return export_response("survey", (s.content for s in Submission.query))
+
+    :copyright: 2021 by flask-mdform Authors, see AUTHORS for more details.
+    :license: BSD, see LICENSE for more details.
+"""
+
+from __future__ import annotations
+
+import csv
+import datetime
+import json
+
+from flask import Response, stream_with_context
+from mdform import fields as mdform_fields
+
+from .deco import in_app_from_mdfile
+from .forms import cached_on_class
+
+#: Export formats and their mimetypes.
+FORMATS = {"csv": "text/csv", "jsonl": "application/x-ndjson"}
+
+
+class ExportColumn:
+    """How a field is exported.
+
+    Parameters
+    ----------
+    name : str
+        variable name of the field (JSON key).
+    header : str
+        label of the field (CSV header).
+    kind : str
+        "multiple" (checkbox), "file" or "scalar".
+    """
+
+    __slots__ = ("name", "header", "kind")
+
+    def __init__(self, name, header, kind):
+        self.name = name
+        self.header = header
+        self.kind = kind
+
+
+def get_export_columns(form_cls):
+    """Return the export columns of a form class, computed once per class.
+
+    Returns
+    -------
+    tuple of ExportColumn
+    """
+
+    def build():
+        out = []
+        for name, field in form_cls._mdform_def.items():
+            sf = field.specific_field
+            if isinstance(sf, mdform_fields.CheckboxField):
+                kind = "multiple"
+            elif isinstance(sf, mdform_fields.FileField):
+                kind = "file"
+            else:
+                kind = "scalar"
+            out.append(ExportColumn(name, field.label, kind))
+        return tuple(out)
+
+    return cached_on_class(form_cls, "_export_columns", build)
+
+
+def _json_default(value):
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    return str(value)
+
+
+def _csv_scalar(value):
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    return value
+
+
+def _csv_encoders(columns, multi_separator):
+    def multiple(value):
+        if value is None:
+            return None
+        if isinstance(value, str):
+            return value
+        return multi_separator.join(str(item) for item in value)
+
+    def file(value):
+        # the value returned by the upload function, usually a str.
+        if value is None or isinstance(value, str):
+            return value
+        return json.dumps(value, default=_json_default, sort_keys=True)
+
+    encoders = {"multiple": multiple, "file": file, "scalar": _csv_scalar}
+    return [encoders[column.kind] for column in columns]
+
+
+class _Echo:
+    """A file-like object that returns what is written."""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(form_cls, records, *, header=True, multi_separator=";", **fmtparams):
+    """Export records of a form class to CSV, one line at a time.
+
+    Parameters
+    ----------
+    form_cls : FlaskForm class
+    records : Iterable[dict]
+        plain dicts (as returned by `to_plain_dict`).
+    header : bool
+        If true, the first line contains the field labels.
+    multi_separator : str
+        separator of the values of checkbox fields.
+    **fmtparams
+        passed to `csv.writer`.
+
+    Yields
+    ------
+    str
+    """
+    columns = get_export_columns(form_cls)
+    encoders = _csv_encoders(columns, multi_separator)
+    names = [column.name for column in columns]
+
+    writer = csv.writer(_Echo(), **fmtparams)
+
+    if header:
+        yield writer.writerow([column.header for column in columns])
+
+    for record in records:
+        get = record.get
+        yield writer.writerow(
+            [encode(get(name)) for encode, name in zip(encoders, names)]
+        )
+
+
+def iter_jsonl(form_cls, records):
+    """Export records of a form class to JSON Lines, one line at a time.
+
+    Keys follow the order of the form, unknown keys are dropped
+    and missing fields are exported as null. Checkbox values are lists.
+
+    Parameters
+    ----------
+    form_cls : FlaskForm class
+    records : Iterable[dict]
+        plain dicts (as returned by `to_plain_dict`).
+
+    Yields
+    ------
+    str
+    """
+    columns = get_export_columns(form_cls)
+    names = [column.name for column in columns]
+    multiple = frozenset(column.name for column in columns if column.kind == "multiple")
+
+    encoder = json.JSONEncoder(
+        ensure_ascii=False, separators=(",", ":"), default=_json_default
+    )
+
+    for record in records:
+        get = record.get
+        out = {name: get(name) for name in names}
+        for name in multiple:
+            value = out[name]
+            if isinstance(value, str):
+                out[name] = [value]
+            elif value is not None and not isinstance(value, list):
+                out[name] = list(value)
+        yield encoder.encode(out) + "\n"
+
+
+def iter_export(form_cls, records, format="csv", **kwargs):
+    """Export records of a form class in a given format ("csv" or "jsonl")."""
+    if format == "csv":
+        return iter_csv(form_cls, records, **kwargs)
+    elif format == "jsonl":
+        return iter_jsonl(form_cls, records, **kwargs)
+    raise ValueError(f"Unknown format '{format}', valid formats are {tuple(FORMATS)}")
+
+
+def export_response(mdfile, records, format="csv", filename=None, **kwargs):
+    """Stream the export of records of the form defined in a markdown file.
+
+    Requires to be called inside an app.
+
+    Parameters
+    ----------
+    mdfile : str
+        Filename of the markdown file (without .md extension)
+        The file is loaded from the flask template folder.
+    records : Iterable[dict]
+        plain dicts (as returned by `to_plain_dict`).
+    format : str
+        "csv" or "jsonl".
+    filename : str or None
+        name of the downloaded file. If None, use mdfile and the format.
+    **kwargs
+        passed to `iter_csv`.
+
+    Returns
+    -------
+    flask.Response
+    """
+    _, _, Form = in_app_from_mdfile(mdfile)
+    lines = iter_export(Form, records, format, **kwargs)
+
+    filename = filename or f"{mdfile.rsplit('/', 1)[-1]}.{format}"
+    response = Response(stream_with_context(lines), mimetype=FORMATS[format])
+    response.headers.set("Content-Disposition", "attachment", filename=filename)
+    return response
@@ -13,9 +13,16 @@
 
 from __future__ import annotations
 
+import bisect
+import decimal
+import functools
+import itertools
+
+from flask import has_request_context, url_for
 from flask_wtf.file import FileAllowed, FileField, FileRequired, FileStorage
-from markupsafe import Markup
+from markupsafe import Markup, escape
 from mdform import fields as mdfields
+from werkzeug.routing import BuildError
 from wtforms import (
     DateField,
     DecimalField,
@@ -32,6 +39,104 @@ from wtforms import validators as v
 from wtforms import widgets
 
 
+class Choices(tuple):
+    """An immutable sequence of choices.
+
+    It is built once per form class (see `from_mdfield`) and shared by
+    all the fields bound from it, therefore it is used to cache data
+    derived from the choices such as the valid values or the
+    pre-rendered options.
+    """
+
+    @functools.cached_property
+    def _cache(self):
+        return {}
+
+    def cached(self, key, build):
+        """Return the cached value for a given key,
+        calling `build` if it is not available.
+        """
+        try:
+            return self._cache[key]
+        except KeyError:
+            value = self._cache[key] = build()
+            return value
+
+    def values(self, coerce=str):
+        """Return a frozenset with the valid (coerced) values."""
+
+        def build():
+            return frozenset(
+                coerce(c[0] if isinstance(c, (list, tuple)) else c) for c in self
+            )
+
+        return self.cached(("values", coerce), build)
+
+    def pairs(self):
+        """Return a tuple of (value, label) pairs."""
+
+        def build():
+            return tuple(
+                (c[0], c[1]) if isinstance(c, (list, tuple)) else (c, c) for c in self
+            )
+
+        return self.cached("pairs", build)
+
+    def labels(self, coerce=str):
+        """Return a dict mapping (coerced) values to (value, label) pairs."""
+
+        def build():
+            return {coerce(value): (value, label) for value, label in self.pairs()}
+
+        return self.cached(("labels", coerce), build)
+
+    def search(self, query, offset=0, limit=20):
+        """Search the choices which label or value starts with a given query
+        (case insensitive) using a sorted prefix index.
+
+        Parameters
+        ----------
+        query : str
+        offset : int
+            number of matches to skip.
+        limit : int
+            maximum number of matches to return.
+
+        Returns
+        -------
+        list of (value, label), bool
+            matched choices (in index order) and if there are more matches.
+        """
+
+        def build():
+            keys = set()
+            for ndx, (value, label) in enumerate(self.pairs()):
+                keys.add((str(label).casefold(), ndx))
+                keys.add((str(value).casefold(), ndx))
+            return tuple(sorted(keys))
+
+        index = self.cached("prefix_index", build)
+        pairs = self.pairs()
+        query = query.casefold()
+
+        seen = set()
+        out = []
+        for key, ndx in itertools.islice(
+            index, bisect.bisect_left(index, (query,)), None
+        ):
+            if not key.startswith(query):
+                break
+            if ndx in seen:
+                continue
+            seen.add(ndx)
+            if len(seen) > offset + limit:
+                return out, True
+            if len(seen) > offset:
+                out.append(pairs[ndx])
+
+        return out, False
+
+
 class ListWidgetPlus(widgets.ListWidget):
     """
     Renders a list of fields as a `ul` or `ol` list.
@@ -43,22 +148,233 @@ class ListWidgetPlus(widgets.ListWidget):
     If `prefix_label` is set, the subfield's label is printed before the field,
     otherwise afterwards. The latter is useful for iterating radios or
     checkboxes.
+
+    For fields with `Choices`, the static part of each option is rendered
+    and escaped only once and the id, name and the `checked`, `disabled`
+    and `readonly` attributes are spliced in for each call.
     """
 
     def __call__(self, field, **kwargs):
         subfield_kw = {k: v for k, v in kwargs.items() if k in ("disabled", "readonly")}
         kwargs.setdefault("id", field.id)
         html = ["<{} {}>".format(self.html_tag, widgets.html_params(**kwargs))]
-        for subfield in field:
+        options = self._render_options(field, subfield_kw)
+        if options is not None:
+            html.extend(options)
+        else:
+            for subfield in field:
+                if self.prefix_label:
+                    html.append(f"<li>{subfield.label} {subfield(**subfield_kw)}</li>")
+                else:
+                    html.append(f"<li>{subfield(**subfield_kw)} {subfield.label}</li>")
+        html.append("</%s>" % self.html_tag)
+        return Markup("".join(html))
+
+    def _render_options(self, field, subfield_kw):
+        """Render the options of a field from its cached parts.
+
+        Returns None if the field cannot be rendered this way,
+        and therefore the subfields must be iterated.
+        """
+        choices = getattr(field, "choices", None)
+        if not isinstance(choices, Choices) or field.render_kw:
+            return None
+
+        if not all(isinstance(value, bool) for value in subfield_kw.values()):
+            return None
+
+        option_widget = field.option_widget
+        flags = {
+            k
+            for k in dir(field.flags)
+            if k in option_widget.validation_attrs and k not in subfield_kw
+        }
+        if not flags <= {"required"}:
+            return None
+
+        # The id and name (which depend on the prefix) are inserted
+        # when rendering, so the cached parts are shared by all forms.
+        key = (option_widget.input_type, field.coerce, "required" in flags)
+
+        parts = choices.cached(key, lambda: self._build_option_parts(choices, *key))
+        if parts is None:
+            return None
+
+        dyn1 = "disabled " if subfield_kw.get("disabled") else ""
+        dyn2 = " readonly" if subfield_kw.get("readonly") else ""
+
+        data = field.data
+        if isinstance(field, SelectMultipleField):
+            if data is None:
+                data = ()
+            try:
+                data = frozenset(data)
+            except TypeError:
+                pass
+
+            def is_checked(value):
+                return value in data
+
+        else:
+
+            def is_checked(value):
+                return value == data
+
+        field_id = str(escape(field.id))
+        name = str(escape(field.name))
+
+        out = []
+        for value, suffix, label, tail in parts:
+            option_id = field_id + suffix
+            checked = "checked " if is_checked(value) else ""
+            label = f'<label for="{option_id}">{label}</label>'
+            tag = f'<input {checked}{dyn1}id="{option_id}" name="{name}"{dyn2} {tail}'
             if self.prefix_label:
-                html.append(f"<li>{subfield.label} {subfield(**subfield_kw)}</li>")
+                out.append(f"<li>{label} {tag}</li>")
             else:
-                html.append(f"<li>{subfield(**subfield_kw)} {subfield.label}</li>")
-        html.append("</%s>" % self.html_tag)
+                out.append(f"<li>{tag} {label}</li>")
+        return out
+
+    def _build_option_parts(self, choices, input_type, coerce, required):
+        """Build the static parts of each option:
+        the coerced value, the suffix of the id, the escaped label
+        and the end of the input tag.
+        """
+        if not choices:
+            return ()
+
+        required = "required " if required else ""
+
+        parts = []
+        for ndx, choice in enumerate(choices):
+            if isinstance(choice, (list, tuple)):
+                if len(choice) != 2:
+                    # choices with render_kw
+                    return None
+                value, label = choice
+            else:
+                value = label = choice
+
+            tail = f'{required}type="{input_type}" value="{escape(str(value))}">'
+            parts.append((coerce(value), f"-{ndx}", str(escape(label)), tail))
+
+        return tuple(parts)
+
+
+class _ChoicesMixin:
+    """Keeps the `Choices` given to the field instead of copying them
+    into a list, so that the data cached on them is shared among
+    all the instances of the field.
+    """
+
+    def __init__(self, label=None, validators=None, choices=None, **kwargs):
+        if callable(choices):
+            choices = choices()
+        super().__init__(label, validators, choices=choices, **kwargs)
+        if isinstance(choices, Choices):
+            self.choices = choices
+
+    def _choice_values(self):
+        """Return the frozenset of valid values,
+        or None if choices are not `Choices` (e.g. modified after binding).
+        """
+        if self.validate_choice and isinstance(self.choices, Choices):
+            return self.choices.values(self.coerce)
+        return None
+
+
+class SelectFieldPlus(_ChoicesMixin, SelectField):
+    """
+    A SelectField that validates the choice using
+    a set of the valid values.
+    """
+
+    def pre_validate(self, form):
+        values = self._choice_values()
+        if values is None:
+            return super().pre_validate(form)
+
+        try:
+            valid = self.data in values
+        except TypeError:
+            return super().pre_validate(form)
+
+        if not valid:
+            raise v.ValidationError(self.gettext("Not a valid choice."))
+
+
+class TypeaheadSelect(widgets.Select):
+    """
+    Renders a select field with only the selected option.
+
+    The url to search the remaining options (see `blueprint.typeahead`)
+    is given in the `data-typeahead-url` attribute.
+    """
+
+    def __call__(self, field, **kwargs):
+        url = field.typeahead_url()
+        if url:
+            kwargs.setdefault("data_typeahead_url", url)
+        kwargs.setdefault("id", field.id)
+        flags = getattr(field, "flags", {})
+        for k in dir(flags):
+            if k in self.validation_attrs and k not in kwargs:
+                kwargs[k] = getattr(flags, k)
+        html = [f"<select {widgets.html_params(name=field.name, **kwargs)}>"]
+        for value, label in field.iter_selected():
+            html.append(self.render_option(value, label, True))
+        html.append("</select>")
         return Markup("".join(html))
 
 
-class MultiCheckboxField(SelectMultipleField):
+class TypeaheadSelectField(SelectFieldPlus):
+    """
+    A SelectField that renders only the selected option,
+    the others are searched by the client using the typeahead endpoint.
+    """
+
+    widget = TypeaheadSelect()
+
+    def __init__(self, label=None, validators=None, **kwargs):
+        super().__init__(label, validators, **kwargs)
+        self.mdfile = getattr(kwargs.get("_form"), "_mdfile", None)
+
+    def iter_selected(self):
+        """Yields the selected (value, label)."""
+        if self.data is None:
+            return
+        if isinstance(self.choices, Choices):
+            try:
+                pair = self.choices.labels(self.coerce).get(self.data)
+            except TypeError:
+                pair = None
+            if pair is not None:
+                yield pair
+            return
+        for value, label, selected, _ in self.iter_choices():
+            if selected:
+                yield value, label
+
+    def typeahead_url(self):
+        """Url of the typeahead endpoint for this field,
+        or None if it cannot be built.
+        """
+        if self.mdfile is None or not has_request_context():
+            return None
+
+        from .deco import BLUEPRINT, in_app_get_config
+
+        try:
+            return url_for(
+                in_app_get_config(BLUEPRINT) + ".typeahead",
+                mdfile=self.mdfile,
+                field=self.short_name,
+            )
+        except BuildError:
+            return None
+
+
+class MultiCheckboxField(_ChoicesMixin, SelectMultipleField):
     """
     A multiple-select, except displays a list of checkboxes.
 
@@ -69,8 +385,28 @@ class MultiCheckboxField(SelectMultipleField):
     widget = ListWidgetPlus(prefix_label=False)
     option_widget = widgets.CheckboxInput()
 
+    def pre_validate(self, form):
+        values = self._choice_values()
+        if values is None or not self.data:
+            return super().pre_validate(form)
+
+        try:
+            unacceptable = [str(data) for data in set(self.data) if data not in values]
+        except TypeError:
+            return super().pre_validate(form)
 
-class RadioFieldPlus(SelectField):
+        if unacceptable:
+            raise v.ValidationError(
+                self.ngettext(
+                    "'%(value)s' is not a valid choice for this field.",
+                    "'%(value)s' are not valid choices for this field.",
+                    len(unacceptable),
+                )
+                % dict(value="', '".join(unacceptable))
+            )
+
+
+class RadioFieldPlus(SelectFieldPlus):
     """
     Like a SelectField, except displays a list of radio buttons.
 
@@ -95,6 +431,8 @@ class FileSize:
         error message
     """
 
+    __slots__ = ("min_size", "max_size", "message")
+
     def __init__(self, max_size, min_size=0, message=None):
         self.min_size = min_size
         self.max_size = max_size
@@ -119,7 +457,33 @@ class FileSize:
             )
 
 
-def from_mdfield(f: mdfields.Field):
+# Floats are rendered as number inputs (WTForms uses a text input).
+_FLOAT_WIDGET = widgets.NumberInput(step="any")
+
+
+def _html5_kw(**kwargs):
+    """Render keywords for HTML5 client-side validation attributes
+    not already derived from the validators flags
+    (e.g. required, maxlength, min, max).
+    """
+    return {k: value for k, value in kwargs.items() if value is not None} or None
+
+
+def from_mdfield(f: mdfields.Field, choices=None, typeahead=False):
+    """Generate a WTForms field from an mdform field.
+
+    Parameters
+    ----------
+    f : mdform.fields.Field
+        field definition.
+    choices : callable or None
+        for select, radio and checkbox fields,
+        a callable returning the choices to use instead
+        of the ones in the definition.
+    typeahead : bool
+        for select fields, render only the selected option
+        (see `TypeaheadSelectField`).
+    """
     validators = []
 
     if f.required:
@@ -131,19 +495,42 @@ def from_mdfield(f: mdfields.Field):
     if length:
         validators.append(v.length(max=length))
 
+    if choices is not None and not isinstance(
+        sf, (mdfields.SelectField, mdfields.RadioField, mdfields.CheckboxField)
+    ):
+        raise TypeError(f"Cannot set choices for {sf.__class__}")
+
+    if typeahead and not isinstance(sf, mdfields.SelectField):
+        raise TypeError(f"Cannot use typeahead for {sf.__class__}")
+
     if isinstance(sf, mdfields.StringField):
         return StringField(f.label, validators=validators)
     elif isinstance(sf, mdfields.TextAreaField):
         return TextAreaField(f.label, validators=validators)
     elif isinstance(sf, mdfields.IntegerField):
         validators.append(v.NumberRange(min=sf.min, max=sf.max))
-        return IntegerField(f.label, validators=validators)
+        return IntegerField(
+            f.label, validators=validators, render_kw=_html5_kw(step=sf.step)
+        )
     elif isinstance(sf, mdfields.FloatField):
         validators.append(v.NumberRange(min=sf.min, max=sf.max))
-        return FloatField(f.label, validators=validators)
+        return FloatField(
+            f.label,
+            validators=validators,
+            widget=_FLOAT_WIDGET,
+            render_kw=_html5_kw(step=sf.step),
+        )
     elif isinstance(sf, mdfields.DecimalField):
         validators.append(v.NumberRange(min=sf.min, max=sf.max))
-        return DecimalField(f.label, validators=validators, places=sf.places)
+        step = sf.step
+        if step is None and sf.places is not None:
+            step = str(decimal.Decimal(1).scaleb(-sf.places))
+        return DecimalField(
+            f.label,
+            validators=validators,
+            places=sf.places,
+            render_kw=_html5_kw(step=step),
+        )
     elif isinstance(sf, mdfields.DateField):
         return DateField(f.label, validators=validators)
     elif isinstance(sf, mdfields.TimeField):
@@ -155,17 +542,29 @@ def from_mdfield(f: mdfields.Field):
             validators.append(v.Optional())
         return EmailField(f.label, validators=validators)
     elif isinstance(sf, mdfields.SelectField):
-        return SelectField(f.label, choices=sf.choices, validators=validators)
+        field_class = TypeaheadSelectField if typeahead else SelectFieldPlus
+        return field_class(
+            f.label, choices=choices or Choices(sf.choices), validators=validators
+        )
     elif isinstance(sf, mdfields.RadioField):
-        return RadioFieldPlus(f.label, choices=sf.choices, validators=validators)
+        return RadioFieldPlus(
+            f.label, choices=choices or Choices(sf.choices), validators=validators
+        )
     elif isinstance(sf, mdfields.CheckboxField):
-        return MultiCheckboxField(f.label, choices=sf.choices, validators=validators)
+        return MultiCheckboxField(
+            f.label, choices=choices or Choices(sf.choices), validators=validators
+        )
     elif isinstance(sf, mdfields.FileField):
         validators.append(FileSize(max_size=5 * 1024 * 1024))
         validators.append(FileRequired())
         if sf.allowed:
             validators.append(FileAllowed(sf.allowed, sf.description or sf.allowed))
-        return FileField(f.label, validators=validators)
+            accept = ",".join("." + ext.lstrip(".") for ext in sf.allowed)
+        else:
+            accept = None
+        return FileField(
+            f.label, validators=validators, render_kw=_html5_kw(accept=accept)
+        )
     else:
         raise TypeError(f"Unknown specific field: {sf.__class__}")
 
@@ -182,9 +581,14 @@ class MyEmailWidget(widgets.TextInput):
         return Markup(html % (field._value(), field._value()))
 
 
+# Widgets are stateless, a single instance is shared by all generated fields.
+_URL_WIDGET = MyUrlWidget()
+_EMAIL_WIDGET = MyEmailWidget()
+
+
 def generate_LinkField(label):
-    return StringField(label, widget=MyUrlWidget())
+    return StringField(label, widget=_URL_WIDGET)
 
 
 def generate_EmailField(label):
-    return StringField(label, widget=MyEmailWidget())
+    return StringField(label, widget=_EMAIL_WIDGET)
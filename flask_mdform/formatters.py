@@ -11,6 +11,40 @@
 from __future__ import annotations
 
 
+def _bs4_args(variable_name, field, jquery_var):
+    """Keyword arguments (as jinja source) used to render a field
+    with Bootstrap4 classes.
+    """
+    args = []
+
+    tag_class = ["form-control"]
+    if field.is_label_hidden:
+        tag_class.append("nolabel")
+
+    collapse_on = getattr(field.specific_field, "collapse_on", None)
+    if collapse_on:
+        if collapse_on.startswith("~"):
+            collapse_on = collapse_on[1:]
+            comparator = "==="
+        else:
+            comparator = "!=="
+
+        tag_class.append("collapser")
+
+        if jquery_var:
+            args.append(
+                f"""onchange="{jquery_var}('#accordion-{variable_name}').toggle({jquery_var}(this).val() {comparator} '{collapse_on}');" """
+            )
+
+    args.append('class="%s"' % " ".join("%s" % c for c in tag_class))
+
+    length = getattr(field.specific_field, "length", None)
+    if length:
+        args.append("maxlength=%d" % length)
+
+    return args
+
+
 def flask_wtf_bs4(jquery_var="jQuery", wtf_prefix="wtf."):
     """Formatter that use flask, WTF and Bootstrap4
 
@@ -25,35 +59,56 @@ def flask_wtf_bs4(jquery_var="jQuery", wtf_prefix="wtf."):
     """
 
     def _inner(variable_name, field):
-        args = ["form.%s" % variable_name]
-        args.append("form_type='horizontal'")
+        args = ["form.%s" % variable_name, "form_type='horizontal'"]
+        args.extend(_bs4_args(variable_name, field, jquery_var))
 
-        tag_class = ["form-control"]
-        if field.is_label_hidden:
-            tag_class.append("nolabel")
+        return "{{ %sform_field(%s) }}" % (wtf_prefix, ", ".join(args))
 
-        collapse_on = getattr(field.specific_field, "collapse_on", None)
-        if collapse_on:
-            if collapse_on.startswith("~"):
-                collapse_on = collapse_on[1:]
-                comparator = "==="
-            else:
-                comparator = "!=="
+    return _inner
 
-            tag_class.append("collapser")
 
-            if jquery_var:
-                args.append(
-                    f"""onchange="{jquery_var}('#accordion-{variable_name}').toggle({jquery_var}(this).val() {comparator} '{collapse_on}');" """
-                )
+def flask_wtf_bs4_static(jquery_var="jQuery", horizontal_columns=("lg", 2, 10)):
+    """Formatter that use flask, WTF and Bootstrap4 without macros.
 
-        args.append('class="%s"' % " ".join("%s" % c for c in tag_class))
+    The markup of the horizontal `form_field` macro of Flask-Bootstrap4
+    is emitted when the form is compiled, leaving only the label,
+    the widget and the error list to be rendered on each request.
 
-        length = getattr(field.specific_field, "length", None)
-        if length:
-            args.append("maxlength=%d" % length)
+    Parameters
+    ----------
+    jquery_var : str
+        Name of the jQuery variable
+    horizontal_columns : (str, int, int)
+        Bootstrap breakpoint, width of the label column
+        and width of the field column.
 
-        return "{{ %sform_field(%s) }}" % (wtf_prefix, ", ".join(args))
+    Returns
+    -------
+    callable (str, dict) -> str
+    """
+    size, label_cols, field_cols = horizontal_columns
+    label_class = f"form-control-label col-{size}-{label_cols}"
+    field_class = f"col-{size}-{field_cols}"
+    offset_class = f"offset-{size}-{label_cols} col-{size}-{field_cols}"
+
+    def _inner(variable_name, field):
+        var = "form.%s" % variable_name
+        args = _bs4_args(variable_name, field, jquery_var)
+        args.append("required=%s.flags.required is true" % var)
+
+        return (
+            f'<div class="form-group{{% if {var}.errors %}} has-danger{{% endif %}} row'
+            f'{{% if {var}.flags.required %}} required{{% endif %}}">'
+            f'{{{{ {var}.label(class="{label_class}") }}}}'
+            f'<div class="{field_class}">{{{{ {var}({", ".join(args)}) }}}}</div>'
+            f"{{% for error in {var}.errors %}}"
+            f'<div class="{offset_class}"><div class="invalid-feedback">'
+            f"{{{{ error }}}}</div></div>"
+            f"{{% else %}}{{% if {var}.description %}}"
+            f'<div class="{offset_class}"><small class="form-text text-muted">'
+            f"{{{{ {var}.description|safe }}}}</small></div>"
+            f"{{% endif %}}{{% endfor %}}</div>"
+        )
 
     return _inner
 
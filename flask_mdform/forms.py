@@ -12,15 +12,48 @@ from __future__ import annotations
 
 import decimal
 import pathlib
+import sys
+import weakref
 from datetime import date, time
 
 from flask_wtf import FlaskForm
 from mdform import FormExtension, Markdown
 from mdform import fields as mdform_fields
-from wtforms import SubmitField
+from wtforms import Field, SubmitField
+from wtforms.fields.core import UnboundField
 from wtforms_components import read_only
 
-from . import fields
+from . import choices, codecs, fields
+from .collapse import CollapseMap, omit_collapsed, parse_collapse
+
+#: Metadata key listing the select fields rendered in typeahead mode.
+TYPEAHEAD_META_KEY = "typeahead"
+
+#: Canonical mdform field definitions, shared among all compiled forms
+#: (e.g. the editable and read-only variants of the same markdown file).
+_MDFIELDS = weakref.WeakValueDictionary()
+
+
+def _intern_mdfield(field):
+    """Return the canonical (shared) instance of an mdform field definition."""
+    try:
+        return _MDFIELDS.setdefault(field, field)
+    except TypeError:
+        # unhashable definition, cannot be shared.
+        return field
+
+
+def _compact_definition(fields_by_label):
+    """Intern variable names and mdform field definitions."""
+    return {
+        sys.intern(name): _intern_mdfield(field)
+        for name, field in fields_by_label.items()
+    }
+
+
+def _compact_meta(meta):
+    """Intern metadata keys."""
+    return {sys.intern(key): value for key, value in meta.items()}
 
 
 def filled_form_to_content(
@@ -57,46 +90,7 @@ def filled_form_to_content(
     -------
     dict
     """
-    out = {}
-    # noinspection PyProtectedMember
-    for name, field in form._fields.items():
-        if name in skip:
-            continue
-
-        if isinstance(
-            field,
-            (
-                fields.StringField,
-                fields.TextAreaField,
-                fields.IntegerField,
-                fields.FloatField,
-                fields.EmailField,
-                fields.RadioFieldPlus,
-                fields.MultiCheckboxField,
-                fields.SelectField,
-            ),
-        ):
-            out[name] = field.data
-
-        elif isinstance(field, fields.DecimalField):
-            out[name] = str(field.data)
-
-        elif isinstance(field, (fields.DateField, fields.TimeField)):
-            out[name] = field.data.isoformat()
-
-        elif isinstance(field, fields.FileField):
-            if field.data is None:
-                out[name] = None
-                continue
-            out[name] = upload_func(field.data)
-
-        elif isinstance(field, skip_types):
-            pass
-
-        else:
-            raise ValueError(f"Cannot serialize form field for {field}")
-
-    return out
+    return dump_form_values(form, upload_func, skip=skip, skip_types=skip_types)
 
 
 def generate_form_kwargs(form_cls, data, on_missing_field="raise", skip=tuple()):
@@ -128,21 +122,95 @@ def generate_form_kwargs(form_cls, data, on_missing_field="raise", skip=tuple())
             f"on_missing_field must be 'raise', 'add' or 'ignore' not '{on_missing_field}'"
         )
 
+    plan = get_field_plan(form_cls)
+
     out = {}
     for name, value in data.items():
         if name in skip:
             continue
-        field = getattr(form_cls, name, None)
-        if field is None or not hasattr(field, "field_class"):
-            if on_missing_field == "raise":
-                raise ValueError(f"No field found named '{name}'")
-            elif on_missing_field == "add":
-                out[name] = value
-            continue
 
-        field_class = field.field_class
+        item = plan.get(name)
+        if item is None:
+            field = getattr(form_cls, name, None)
+            if field is None or not hasattr(field, "field_class"):
+                if on_missing_field == "raise":
+                    raise ValueError(f"No field found named '{name}'")
+                elif on_missing_field == "add":
+                    out[name] = value
+                continue
+            item = FieldPlan(field.field_class)
+
+        out[name] = item.load(value)
+
+    return out
+
+
+def _as_is(value):
+    return value
+
+
+def _kwarg_loader(field_class):
+    """Return a callable that parses a serialized value
+    into a form kwarg for a given field class.
+    """
+    if field_class in (
+        fields.StringField,
+        fields.TextAreaField,
+        fields.IntegerField,
+        fields.FloatField,
+        fields.EmailField,
+        fields.RadioFieldPlus,
+        fields.MultiCheckboxField,
+        fields.TypeaheadSelectField,
+        fields.SelectFieldPlus,
+        fields.SelectField,
+    ):
+        return _as_is
+
+    elif field_class is fields.DecimalField:
+        return decimal.Decimal
+
+    elif field_class is fields.DateField:
+        return date.fromisoformat
+
+    elif field_class is fields.TimeField:
+        return time.fromisoformat
+
+    elif field_class is fields.FileField:
+        return _as_is
+
+    def _unsupported(value):
+        raise ValueError(f"Cannot generate form kwarg for {field_class}")
+
+    return _unsupported
+
 
-        if field_class in (
+def _dump_str(value):
+    return None if value is None else str(value)
+
+
+def _dump_isoformat(value):
+    return None if value is None else value.isoformat()
+
+
+def _value_dumper(field_class):
+    """Return a callable that serializes the data of a field
+    of a given class into a json compatible value.
+
+    File fields return None, as they require an upload function.
+    """
+    if issubclass(field_class, fields.FileField):
+        return None
+
+    elif issubclass(field_class, fields.DecimalField):
+        return _dump_str
+
+    elif issubclass(field_class, (fields.DateField, fields.TimeField)):
+        return _dump_isoformat
+
+    elif issubclass(
+        field_class,
+        (
             fields.StringField,
             fields.TextAreaField,
             fields.IntegerField,
@@ -151,25 +219,65 @@ def generate_form_kwargs(form_cls, data, on_missing_field="raise", skip=tuple())
             fields.RadioFieldPlus,
             fields.MultiCheckboxField,
             fields.SelectField,
-        ):
-            out[name] = value
+        ),
+    ):
+        return _as_is
 
-        elif field_class is fields.DecimalField:
-            out[name] = decimal.Decimal(value)
+    def _unsupported(value):
+        raise ValueError(f"Cannot serialize form field for {field_class}")
 
-        elif field_class is fields.DateField:
-            out[name] = date.fromisoformat(value)
+    return _unsupported
 
-        elif field_class is fields.TimeField:
-            out[name] = time.fromisoformat(value)
 
-        elif field_class is fields.FileField:
-            out[name] = value
+class FieldPlan:
+    """How the values of a field are serialized.
 
-        else:
-            raise ValueError(f"Cannot generate form kwarg for {field_class}")
+    Parameters
+    ----------
+    field_class : type
+        the WTForms field class.
+    """
 
-    return out
+    __slots__ = ("field_class", "load", "dump")
+
+    def __init__(self, field_class):
+        self.field_class = field_class
+        #: parses a serialized value into a form kwarg.
+        self.load = _kwarg_loader(field_class)
+        #: serializes the data of the field (None for files).
+        self.dump = _value_dumper(field_class)
+
+
+def cached_on_class(form_cls, attr, build):
+    """Return a value stored in the class (not inherited),
+    calling `build` to compute it if not available.
+    """
+    try:
+        return form_cls.__dict__[attr]
+    except KeyError:
+        value = build()
+        # Using type.__setattr__ to avoid WTForms resetting the fields.
+        type.__setattr__(form_cls, attr, value)
+        return value
+
+
+def get_field_plan(form_cls):
+    """Return a dict mapping each field name of a form class to its `FieldPlan`.
+
+    It is computed once per class.
+    """
+
+    def build():
+        plan = {}
+        for name in dir(form_cls):
+            if name.startswith("_"):
+                continue
+            field = getattr(form_cls, name, None)
+            if hasattr(field, "field_class"):
+                plan[sys.intern(name)] = FieldPlan(field.field_class)
+        return plan
+
+    return cached_on_class(form_cls, "_field_plan", build)
 
 
 class DictFormMixin:
@@ -191,6 +299,133 @@ class DictFormMixin:
         )
         return cls(**data)
 
+    def to_bytes(self, codec="json", upload_func=None, skip=("csrf_token", "submit")):
+        """Serialize the data of the form to bytes,
+        using the field plan of the class and a codec (see `codecs`).
+        """
+        return codecs.get_codec(codec).dumps(
+            dump_form_values(self, upload_func, skip=skip)
+        )
+
+    @classmethod
+    def from_bytes(cls, content, codec="json", on_missing_field="raise", skip=tuple()):
+        """Create a form from bytes serialized with `to_bytes`."""
+        return cls(
+            **load_form_kwargs(
+                cls, content, codec, on_missing_field=on_missing_field, skip=skip
+            )
+        )
+
+
+def dump_form_values(
+    form,
+    upload_func=None,
+    *,
+    skip=("csrf_token", "submit"),
+    skip_types=(SubmitField,),
+):
+    """Serialize the data of a form (see `filled_form_to_content`)
+    using the field plan of the form class.
+
+    Parameters
+    ----------
+    form : FlaskForm or WTForm object
+    upload_func: func
+        uploads a file and return the url
+    skip : tuple of strings
+        fields to skip.
+    skip_types : tuple of types
+        field classes to skip.
+
+    Returns
+    -------
+    dict
+    """
+    plan = get_field_plan(type(form))
+
+    out = {}
+    # noinspection PyProtectedMember
+    for name, field in form._fields.items():
+        if name in skip:
+            continue
+
+        if isinstance(field, skip_types):
+            continue
+
+        item = plan.get(name)
+        if item is None:
+            if not isinstance(field, Field):
+                raise ValueError(f"Cannot serialize form field for {field}")
+            item = FieldPlan(type(field))
+
+        if item.dump is None:
+            # file fields, kept as is if already uploaded (e.g. the url).
+            if field.data is None or isinstance(field.data, str):
+                out[name] = field.data
+            else:
+                out[name] = upload_func(field.data)
+        else:
+            out[name] = item.dump(field.data)
+
+    return out
+
+
+def load_form_kwargs(
+    form_cls, content, codec="json", on_missing_field="raise", skip=tuple()
+):
+    """Decode bytes with a codec (see `codecs`) and parse them into form kwargs
+    using the field plan of the class (see `generate_form_kwargs`).
+    """
+    data = codecs.get_codec(codec).loads(content)
+    if not isinstance(data, dict):
+        raise ValueError("The content is not a mapping")
+    return generate_form_kwargs(
+        form_cls, data, on_missing_field=on_missing_field, skip=skip
+    )
+
+
+class CollapseFormMixin:
+    """A form mixin that does not validate the fields inside
+    collapsed parts (see `collapse`).
+    """
+
+    _collapse_map = CollapseMap()
+
+    #: plain dict with the value of control fields that are not in the form.
+    collapse_data = None
+
+    def section_shown(self, control):
+        """True if the part controlled by a field is shown for the form data."""
+        return self._collapse_map.shown(self, control)
+
+    def inactive_fields(self):
+        """Names of the fields inside collapsed parts for the form data."""
+        return self._collapse_map.inactive_fields(self)
+
+    def validate(self, extra_validators=None):
+        if not self._collapse_map:
+            return super().validate(extra_validators=extra_validators)
+
+        inactive = self.inactive_fields()
+        if not inactive:
+            return super().validate(extra_validators=extra_validators)
+
+        # Same as `wtforms.Form.validate`, skipping the inactive fields.
+        # The form keeps all fields, so the validators of the active
+        # ones (e.g. inline `validate_<name>`) can use any of them.
+        success = True
+        for name, field in self._fields.items():
+            if name in inactive:
+                field.errors = []
+                continue
+            extra = list((extra_validators or {}).get(name, ()))
+            inline = getattr(self.__class__, f"validate_{name}", None)
+            if inline is not None:
+                extra.append(inline)
+            if not field.validate(self, extra):
+                success = False
+        return success
+
 
 class ReadOnlyFormMixin:
     """A form that convert all fields into read-only."""
@@ -203,6 +438,38 @@ class ReadOnlyFormMixin:
             for attr_name in self._read_only_attrs:
                 read_only(getattr(self, attr_name))
 
+    @classmethod
+    def from_form(cls, form):
+        """Create a read-only form with the data of a bound form
+        (e.g. the editable variant after validation).
+
+        The data is copied as is, without serializing it.
+
+        Parameters
+        ----------
+        form : FlaskForm or WTForm object
+
+        Returns
+        -------
+        FlaskForm
+        """
+        data = {
+            name: form[name].data for name in cls._read_only_attrs or () if name in form
+        }
+        return cls(formdata=None, prefix=form._prefix, data=data)
+
+
+class ReadOnlyForm(FlaskForm):
+    """Base class of read-only forms.
+
+    No CSRF token is generated when rendering read-only forms. This avoids
+    writing to the session (and setting a session cookie). Forms taking
+    a submission must enable it (`render_mdform` passes `meta={"csrf": ...}`).
+    """
+
+    class Meta:
+        csrf = False
+
 
 def from_mdstr(
     mdstr,
@@ -212,6 +479,7 @@ def from_mdstr(
     extends=None,
     formatter=None,
     extensions=(),
+    omit_inactive=False,
 ):
     """Generates form metadata, template, form from markdown form.
 
@@ -231,21 +499,91 @@ def from_mdstr(
         That format variable name and dict to string.
     extensions : list
         Python Markdown extensions to load.
+    omit_inactive : bool
+        If true and read-only, the content of collapsed parts is not rendered.
 
     Returns
     -------
     dict, str, FlaskForm
     """
+    collapse_map = parse_collapse(mdstr)
+    if read_only and omit_inactive:
+        mdstr = omit_collapsed(mdstr, collapse_map)
+
+    meta, html, definition = convert_mdstr(mdstr, formatter, extensions)
+
+    choice_providers = choices.providers_from_meta(meta)
+    typeahead = _names_from_meta(meta, TYPEAHEAD_META_KEY)
+
+    if read_only:
+        wtform = generate_read_only_form_cls(
+            class_name,
+            definition,
+            choice_providers=choice_providers,
+            typeahead=typeahead,
+            collapse_map=collapse_map,
+        )
+    else:
+        wtform = generate_form_cls(
+            class_name,
+            definition,
+            choice_providers=choice_providers,
+            typeahead=typeahead,
+            collapse_map=collapse_map,
+        )
+
+    return meta, wrap_template(html, block, extends), wtform
+
+
+def convert_mdstr(mdstr, formatter=None, extensions=(), meta=True):
+    """Convert markdown form content to html.
+
+    Parameters
+    ----------
+    mdstr : str
+        markdown content
+    formatter : callable
+        That format variable name and dict to string.
+    extensions : list
+        Python Markdown extensions to load.
+    meta : bool
+        If false, leading lines are not parsed as metadata.
+
+    Returns
+    -------
+    dict, str, Dict[str, Field]
+        metadata, html and field definitions by variable name.
+    """
     md = Markdown(
         extensions=["meta", FormExtension(formatter=formatter)] + list(extensions)
     )
+    if not meta:
+        # The meta extension stops at the first blank line.
+        mdstr = "\n" + mdstr
     html = md.convert(mdstr)
 
-    if read_only:
-        wtform = generate_read_only_form_cls(class_name, md.mdform_definition)
-    else:
-        wtform = generate_form_cls(class_name, md.mdform_definition)
+    return (
+        _compact_meta(md.Meta),
+        html,
+        _compact_definition(md.mdform_definition),
+    )
+
+
+def wrap_template(html, block=None, extends=None):
+    """Insert html into a block of a template that is extended.
+
+    Parameters
+    ----------
+    html : str
+    block :  str
+        Name of the block where the html is inserted.
+    extends : str
+        Name of the template that is extended.
 
+    Returns
+    -------
+    str
+    """
     if extends:
         tmpl = '{%- extends "' + extends + '" %}\n'
     else:
@@ -258,7 +596,7 @@ def from_mdstr(
     else:
         tmpl += html
 
-    return md.Meta, tmpl, wtform
+    return tmpl
 
 
 def from_mdfile(
@@ -269,6 +607,7 @@ def from_mdfile(
     extends=None,
     formatter=None,
     extensions=(),
+    omit_inactive=False,
 ):
     """Generates form metadata, template, form from markdown form.
 
@@ -289,6 +628,9 @@ def from_mdfile(
     extensions : list
         Python Markdown extensions to load.
 
+    omit_inactive : bool
+        If true and read-only, the content of collapsed parts is not rendered.
+
     Returns
     -------
     dict, str, FlaskForm
@@ -299,10 +641,80 @@ def from_mdfile(
     class_name = class_name or mdfile.stem
 
     with mdfile.open(mode="r", encoding="utf-8") as fi:
-        return from_mdstr(fi.read(), class_name, read_only, block, extends, formatter)
+        return from_mdstr(
+            fi.read(),
+            class_name,
+            read_only,
+            block,
+            extends,
+            formatter,
+            omit_inactive=omit_inactive,
+        )
+
+
+def _names_from_meta(meta, key):
+    """Parse a list of comma or line separated variable names from the metadata."""
+    return tuple(
+        name.strip()
+        for line in meta.get(key, ())
+        for name in line.split(",")
+        if name.strip()
+    )
+
+
+def _lazy_choices(label, choice_providers):
+    """Return a callable to obtain the choices of a field from a provider,
+    or None if the field uses the choices in the definition.
+    """
+    if choice_providers and label in choice_providers:
+        return choices.lazy_choices(choice_providers[label])
+    return None
+
+
+def _check_labels(fields_by_label, labels, what):
+    for label in labels or ():
+        if label not in fields_by_label:
+            raise ValueError(f"Cannot set {what}, no field named '{label}'")
+
+
+def unbound_field(label, field, choice_providers=None, typeahead=(), read_only=False):
+    """Generate the (unbound) WTForms field of an mdform field definition.
+
+    Parameters
+    ----------
+    label : str
+        variable name of the field.
+    field : Field
+        mdform field definition.
+    choice_providers : Dict[str, str] or None
+        maps field labels to the name of choice provider.
+    typeahead : Iterable[str]
+        labels of the select fields which only render the selected option.
+    read_only : bool
+        If true, generate the field of a read-only form.
+
+    Returns
+    -------
+    UnboundField
+    """
+    if read_only and isinstance(field.specific_field, mdform_fields.EmailField):
+        return fields.generate_EmailField(label)
+    return fields.from_mdfield(
+        field,
+        _lazy_choices(label, choice_providers),
+        typeahead=label in typeahead,
+    )
 
 
-def generate_form_cls(name, fields_by_label, base_cls=FlaskForm):
+def generate_form_cls(
+    name,
+    fields_by_label,
+    base_cls=FlaskForm,
+    *,
+    choice_providers=None,
+    typeahead=(),
+    collapse_map=None,
+):
     """Generate a FlaskForm derived class with an attribute for each field.
     It also adds a submit button.
 
@@ -312,30 +724,55 @@ def generate_form_cls(name, fields_by_label, base_cls=FlaskForm):
         name of the class
     fields_by_label : Dict[str, Dict[str, Any]]
         fields organized by their labels
+    choice_providers : Dict[str, str] or None
+        maps field labels to the name of choice provider.
+    typeahead : Iterable[str]
+        labels of the select fields which only render the selected option.
+    collapse_map : CollapseMap or None
+        collapsable parts and the fields they contain.
 
     Returns
     -------
     FlaskForm
     """
+    _check_labels(fields_by_label, choice_providers, "choice provider")
+    _check_labels(fields_by_label, typeahead, "typeahead")
+
     cls = type(
         name,
         (
+            CollapseFormMixin,
             DictFormMixin,
             base_cls,
         ),
         {},
     )
     for label, field in fields_by_label.items():
-        setattr(cls, label, fields.from_mdfield(field))
+        setattr(cls, label, unbound_field(label, field, choice_providers, typeahead))
 
     setattr(cls, "submit", SubmitField("Submit"))
 
     setattr(cls, "_mdform_def", fields_by_label)
+    setattr(cls, "_choice_providers", dict(choice_providers or {}))
+    setattr(cls, "_typeahead", frozenset(typeahead))
+    setattr(
+        cls,
+        "_collapse_map",
+        CollapseMap() if collapse_map is None else collapse_map,
+    )
 
     return cls
 
 
-def generate_read_only_form_cls(name, fields_by_label, base_cls=FlaskForm):
+def generate_read_only_form_cls(
+    name,
+    fields_by_label,
+    base_cls=ReadOnlyForm,
+    *,
+    choice_providers=None,
+    typeahead=(),
+    collapse_map=None,
+):
     """Generate a Flask derived class that is read-only.
 
     For this purpose, it overwrite the type certain fields.
@@ -346,27 +783,75 @@ def generate_read_only_form_cls(name, fields_by_label, base_cls=FlaskForm):
         name of the class
     fields_by_label : Dict[str, Field]
         fields organized by their labels
+    choice_providers : Dict[str, str] or None
+        maps field labels to the name of choice provider.
+    typeahead : Iterable[str]
+        labels of the select fields which only render the selected option.
+    collapse_map : CollapseMap or None
+        collapsable parts and the fields they contain.
 
     Returns
     -------
     FlaskForm
 
     """
-    cls = type(name, (ReadOnlyFormMixin, DictFormMixin, base_cls), {})
+    _check_labels(fields_by_label, choice_providers, "choice provider")
+    _check_labels(fields_by_label, typeahead, "typeahead")
+
+    cls = type(
+        name, (ReadOnlyFormMixin, CollapseFormMixin, DictFormMixin, base_cls), {}
+    )
     for label, field in fields_by_label.items():
-        if isinstance(field.specific_field, mdform_fields.EmailField):
-            setattr(cls, label, fields.generate_EmailField(label))
-        # elif field["type"] == "DateField":
-        #     field = {**field, "type": "StringField"}
-        # elif field["type"] == "TimeField":
-        #     field = {**field, "type": "StringField"}
-        # elif field["type"] == "DateTimeField":
-        #     field = {**field, "type": "StringField"}
-        else:
-            setattr(cls, label, fields.from_mdfield(field))
+        setattr(
+            cls,
+            label,
+            unbound_field(label, field, choice_providers, typeahead, read_only=True),
+        )
 
     cls._read_only_attrs = tuple(fields_by_label.keys())
 
     setattr(cls, "_mdform_def", fields_by_label)
+    setattr(cls, "_choice_providers", dict(choice_providers or {}))
+    setattr(cls, "_typeahead", frozenset(typeahead))
+    setattr(
+        cls,
+        "_collapse_map",
+        CollapseMap() if collapse_map is None else collapse_map,
+    )
 
     return cls
+
+
+def relabel_form_cls(form_cls, translate):
+    """Generate a subclass of a form class with translated labels.
+
+    The subclass shares the field names, validators, definition and
+    template of the form class: only the labels of the fields and
+    the submit button differ.
+
+    Parameters
+    ----------
+    form_cls : FlaskForm class
+        generated from markdown.
+    translate : callable (str) -> str
+        returns the translated label.
+
+    Returns
+    -------
+    FlaskForm
+    """
+    attrs = {"__module__": form_cls.__module__}
+    for name in (*form_cls._mdform_def, "submit"):
+        unbound = getattr(form_cls, name, None)
+        if not isinstance(unbound, UnboundField):
+            continue
+        args, kwargs = unbound.args, unbound.kwargs
+        if args:
+            args = (translate(args[0]), *args[1:])
+        elif "label" in kwargs:
+            kwargs = {**kwargs, "label": translate(kwargs["label"])}
+        attrs[name] = UnboundField(
+            unbound.field_class, *args, name=unbound.name, **kwargs
+        )
+
+    return type(form_cls.__name__, (form_cls,), attrs)
@@ -0,0 +1,166 @@
+"""
+    flask_mdform.freeze
+    ~~~~~~~~~~~~~~~~~~~
+
+    Export pages and read-only forms to static html files,
+    which can then be served without the app (e.g. by nginx).
+
+        routes = [
+            ("about", None),
+            ("record", ({"uid": uid} for uid in archived_uids())),
+        ]
+        freeze(app, routes, "build/", precompress=True)
+
+    or as a flask command:
+
+        app.cli.add_command(create_freeze_command(routes))
+
+    :copyright: 2021 by flask-mdform Authors, see AUTHORS for more details.
+    :license: BSD, see LICENSE for more details.
+"""
+
+from __future__ import annotations
+
+import gzip
+import pathlib
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+
+import click
+from flask import current_app, url_for
+from flask.cli import with_appcontext
+
+
+def iter_urls(app, routes):
+    """Build the urls of the routes to freeze.
+
+    Parameters
+    ----------
+    app : flask.Flask
+    routes : Iterable[str or (str, Iterable[dict] or None)]
+        endpoints, or endpoints and an iterable of view args.
+
+    Yields
+    ------
+    str
+    """
+    with app.test_request_context():
+        for route in routes:
+            if isinstance(route, str):
+                endpoint, view_args = route, None
+            else:
+                endpoint, view_args = route
+
+            for values in view_args or ({},):
+                yield url_for(endpoint, **values)
+
+
+def url_to_path(destination, url):
+    """Path of the static file for a given url.
+
+    Urls ending in / are stored as index.html,
+    otherwise the .html suffix is added.
+    """
+    destination = pathlib.Path(destination).resolve()
+
+    path = urllib.parse.unquote(urllib.parse.urlsplit(url).path).strip("/")
+    if not path or url.endswith("/"):
+        path = (path + "/index.html").lstrip("/")
+    else:
+        path += ".html"
+
+    out = (destination / path).resolve()
+    if destination not in out.parents:
+        raise ValueError(f"Cannot freeze {url} outside {destination}")
+    return out
+
+
+def _freeze_url(app, destination, url, precompress):
+    response = app.test_client().get(url)
+    if response.status_code != 200:
+        raise RuntimeError(f"Cannot freeze {url}: {response.status}")
+
+    path = url_to_path(destination, url)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    content = response.get_data()
+    path.write_bytes(content)
+    written = [path]
+
+    if precompress:
+        gz_path = path.with_name(path.name + ".gz")
+        # mtime=0 makes the output reproducible.
+        gz_path.write_bytes(gzip.compress(content, compresslevel=9, mtime=0))
+        written.append(gz_path)
+
+    return written
+
+
+def freeze(app, routes, destination, *, precompress=False, max_workers=None):
+    """Render routes (e.g. `on_get_page` and `on_get_form(read_only=True)`)
+    to static html files.
+
+    The urls are requested in parallel using the test client,
+    therefore all the compiled forms and templates are shared.
+
+    Parameters
+    ----------
+    app : flask.Flask
+    routes : Iterable[str or (str, Iterable[dict] or None)]
+        endpoints, or endpoints and an iterable of view args.
+    destination : str or pathlib.Path
+        folder in which the files are written.
+    precompress : bool
+        If true, a gzipped copy (.gz) of each file is also written
+        (e.g. for nginx `gzip_static`).
+    max_workers : int or None
+        maximum number of threads used to render.
+
+    Returns
+    -------
+    list of pathlib.Path
+        written files.
+    """
+    urls = list(iter_urls(app, routes))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        written = executor.map(
+            lambda url: _freeze_url(app, destination, url, precompress), urls
+        )
+        return [path for paths in written for path in paths]
+
+
+def create_freeze_command(routes, name="freeze"):
+    """Create a flask command that freezes the given routes.
+
+    Parameters
+    ----------
+    routes : Iterable[str or (str, Iterable[dict] or None)] or callable
+        endpoints, or endpoints and an iterable of view args.
+        A callable returning them is called within the app context.
+    name : str
+        name of the command.
+
+    Returns
+    -------
+    click.Command
+    """
+
+    @click.command(name)
+    @click.argument("destination", type=click.Path(file_okay=False))
+    @click.option("--precompress", is_flag=True, help="Write gzipped copies.")
+    @click.option("--workers", type=int, default=None, help="Number of threads.")
+    @with_appcontext
+    def command(destination, precompress, workers):
+        """Render pages and read-only forms to static html files."""
+        app = current_app._get_current_object()
+        written = freeze(
+            app,
+            routes() if callable(routes) else routes,
+            destination,
+            precompress=precompress,
+            max_workers=workers,
+        )
+        click.echo(f"{len(written)} files written to {destination}")
+
+    return command
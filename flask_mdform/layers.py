@@ -0,0 +1,198 @@
+"""
+    flask_mdform.layers
+    ~~~~~~~~~~~~~~~~~~~
+
+    Override layers: markdown applied on top of a compiled form
+    (e.g. per tenant, see `MDFORM_TENANT_SELECTOR`).
+
+        [section:contact]
+        phone* = ___
+        channel = {Email, Phone, Post}
+
+    A field of the layer named as a field of the form replaces it
+    (e.g. with other choices or validators) and keeps its markup and
+    position. Other content is added after the form content.
+
+    The form class of a layer is a subclass of the form class, so the
+    fields that are not replaced are shared. The template is the form
+    template, extended only if the layer adds content.
+
+    :copyright: 2021 by flask-mdform Authors, see AUTHORS for more details.
+    :license: BSD, see LICENSE for more details.
+"""
+
+from __future__ import annotations
+
+from mdform.extension import default_label_sanitizer
+from wtforms.fields.core import UnboundField
+
+from . import choices
+from .collapse import CollapseMap, classify_lines, omit_collapsed, parse_collapse
+from .forms import (
+    TYPEAHEAD_META_KEY,
+    ReadOnlyFormMixin,
+    _check_labels,
+    _compact_definition,
+    _names_from_meta,
+    convert_mdstr,
+    unbound_field,
+)
+
+_END_BLOCK = "{% endblock %}"
+
+
+def extend_template(tmpl, html, block=None):
+    """Append html to a template generated by `forms.wrap_template`
+    with the same block.
+
+    Returns
+    -------
+    str
+    """
+    if not block:
+        return tmpl + html
+    if not tmpl.endswith(_END_BLOCK):
+        raise ValueError(f"The template does not end with the block {block}")
+    return tmpl[: -len(_END_BLOCK)] + html + _END_BLOCK
+
+
+def layer_form_cls(
+    form_cls, definition, *, choice_providers=None, typeahead=(), collapse_map=None
+):
+    """Generate a subclass of a form class with the fields of a layer.
+
+    Parameters
+    ----------
+    form_cls : FlaskForm class
+        generated from markdown.
+    definition : Dict[str, Field]
+        fields of the layer organized by their labels.
+    choice_providers : Dict[str, str] or None
+        maps field labels to the name of choice provider.
+    typeahead : Iterable[str]
+        labels of the select fields which only render the selected option.
+    collapse_map : CollapseMap or None
+        collapsable parts of the layer and the fields they contain.
+
+    Returns
+    -------
+    FlaskForm
+    """
+    mdform_def = {**form_cls._mdform_def, **definition}
+    choice_providers = {**form_cls._choice_providers, **(choice_providers or {})}
+    typeahead = form_cls._typeahead | frozenset(typeahead)
+
+    _check_labels(mdform_def, choice_providers, "choice provider")
+    _check_labels(mdform_def, typeahead, "typeahead")
+
+    read_only = issubclass(form_cls, ReadOnlyFormMixin)
+
+    attrs = {"__module__": form_cls.__module__}
+    for label, field in definition.items():
+        unbound = unbound_field(label, field, choice_providers, typeahead, read_only)
+        replaced = getattr(form_cls, label, None)
+        if isinstance(replaced, UnboundField):
+            # keep the position of the replaced field.
+            unbound.creation_counter = replaced.creation_counter
+        attrs[label] = unbound
+
+    submit = getattr(form_cls, "submit", None)
+    if isinstance(submit, UnboundField) and any(
+        label not in form_cls._mdform_def for label in definition
+    ):
+        # redefined to be placed after the added fields.
+        attrs["submit"] = UnboundField(
+            submit.field_class, *submit.args, name=submit.name, **submit.kwargs
+        )
+
+    base_map = form_cls._collapse_map
+    if collapse_map:
+        base_map = CollapseMap(
+            {**base_map.conditions, **collapse_map.conditions},
+            {**base_map.dependencies, **collapse_map.dependencies},
+        )
+
+    attrs["_mdform_def"] = mdform_def
+    attrs["_choice_providers"] = choice_providers
+    attrs["_typeahead"] = typeahead
+    attrs["_collapse_map"] = base_map
+    if read_only:
+        attrs["_read_only_attrs"] = tuple(mdform_def)
+
+    return type(form_cls.__name__, (form_cls,), attrs)
+
+
+def apply_layer(
+    meta,
+    tmpl,
+    form_cls,
+    mdstr,
+    block=None,
+    formatter=None,
+    extensions=(),
+    omit_inactive=False,
+):
+    """Apply an override layer to a compiled form.
+
+    Parameters
+    ----------
+    meta : dict
+        metadata of the form, updated with the metadata of the layer.
+    tmpl : str
+        template of the form.
+    form_cls : FlaskForm class
+        generated from markdown.
+    mdstr : str
+        markdown content of the layer.
+    block :  str
+        Name of the block in which the form template was inserted.
+    formatter : callable
+        That format variable name and dict to string.
+    extensions : list
+        Python Markdown extensions to load.
+    omit_inactive : bool
+        If true and read-only, the content of collapsed parts is not rendered.
+
+    Returns
+    -------
+    dict, str, FlaskForm
+
+    Raises
+    ------
+    ValueError
+        if the lines of the layer cannot be classified with mdform
+        (see `collapse.classify_lines`).
+    """
+    collapse_map = parse_collapse(mdstr)
+    if omit_inactive and issubclass(form_cls, ReadOnlyFormMixin):
+        mdstr = omit_collapsed(mdstr, collapse_map)
+
+    # Replaced fields keep the markup of the form.
+    added, replaced = [], {}
+    lines = classify_lines(mdstr, default_label_sanitizer)
+    if lines is None:
+        raise ValueError("Cannot locate the fields of the layer with this mdform")
+    for line, kind, name, field in lines:
+        if kind == "field" and name in form_cls._mdform_def:
+            replaced[name] = field
+        else:
+            added.append(line)
+
+    layer_meta, html, definition = convert_mdstr(
+        "\n".join(added), formatter, extensions
+    )
+
+    cls = layer_form_cls(
+        form_cls,
+        {**_compact_definition(replaced), **definition},
+        choice_providers=choices.providers_from_meta(layer_meta),
+        typeahead=_names_from_meta(layer_meta, TYPEAHEAD_META_KEY),
+        collapse_map=collapse_map,
+    )
+
+    if html.strip():
+        tmpl = extend_template(tmpl, html, block)
+    if layer_meta:
+        meta = {**meta, **layer_meta}
+
+    return meta, tmpl, cls
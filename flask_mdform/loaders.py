@@ -0,0 +1,243 @@
+"""
+    flask_mdform.loaders
+    ~~~~~~~~~~~~~~~~~~~~
+
+    Loaders of markdown form sources (`MDFORM_LOADER`).
+
+    Besides the source, a loader gives a version of each markdown file
+    that is cheap to obtain (e.g. a modification time, a counter or a
+    checksum stored next to the source). Compiled forms are cached
+    together with the version, and compiled again only if it changes.
+
+        app.config["MDFORM_LOADER"] = SQLiteLoader("forms.db")
+
+    :copyright: 2021 by flask-mdform Authors, see AUTHORS for more details.
+    :license: BSD, see LICENSE for more details.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import importlib.resources
+import os
+import sqlite3
+import threading
+import zipfile
+
+from flask import current_app
+from jinja2 import TemplateNotFound
+
+
+class SourceLoader:
+    """Base class of markdown source loaders.
+
+    Loaders must raise `jinja2.TemplateNotFound` for unknown names.
+    """
+
+    def get_version(self, name):
+        """Return the version of a markdown file (a hashable value),
+        without fetching its source.
+        """
+        raise NotImplementedError
+
+    def get_source(self, name):
+        """Return the source of a markdown file and its version.
+
+        Returns
+        -------
+        str, object
+        """
+        raise NotImplementedError
+
+
+class JinjaLoader(SourceLoader):
+    """Load markdown files from the jinja loader of the current app
+    (`md/<name>.md` by default).
+
+    The version is a hash of the source. As with jinja templates,
+    files are checked for changes only if `app.jinja_env.auto_reload`
+    is true (e.g. in debug mode).
+
+    Parameters
+    ----------
+    prefix : str
+        folder of the markdown files.
+    suffix : str
+        extension of the markdown files.
+    """
+
+    def __init__(self, prefix="md/", suffix=".md"):
+        self.prefix = prefix
+        self.suffix = suffix
+        self._uptodate = {}
+
+    def get_version(self, name):
+        current = self._uptodate.get(name)
+        if current is not None:
+            version, uptodate = current
+            if uptodate is None or not current_app.jinja_env.auto_reload or uptodate():
+                return version
+        # first use or modified, the version is the hash of the source.
+        return self.get_source(name)[1]
+
+    def get_source(self, name):
+        source, filename, uptodate = current_app.jinja_loader.get_source(
+            current_app.jinja_env, self.prefix + name + self.suffix
+        )
+        version = hashlib.sha1(source.encode("utf-8")).hexdigest()
+        self._uptodate[name] = (version, uptodate)
+        return source, version
+
+
+class ZipLoader(SourceLoader):
+    """Load markdown files from a zip archive.
+
+    The version is the CRC of the entry, read from the central directory
+    of the archive, which is read again only if the archive is modified.
+
+    Parameters
+    ----------
+    path : str or os.PathLike
+        zip archive.
+    prefix : str
+        folder of the markdown files inside the archive.
+    suffix : str
+        extension of the markdown files.
+    """
+
+    def __init__(self, path, prefix="", suffix=".md"):
+        self.path = os.fspath(path)
+        self.prefix = prefix
+        self.suffix = suffix
+        self._lock = threading.Lock()
+        self._stamp = None
+        self._entries = {}
+
+    def _info(self, name):
+        stat = os.stat(self.path)
+        stamp = stat.st_mtime_ns, stat.st_size
+        with self._lock:
+            if stamp != self._stamp:
+                with zipfile.ZipFile(self.path) as zf:
+                    self._entries = {info.filename: info for info in zf.infolist()}
+                self._stamp = stamp
+            info = self._entries.get(self.prefix + name + self.suffix)
+        if info is None:
+            raise TemplateNotFound(name)
+        return info
+
+    def get_version(self, name):
+        info = self._info(name)
+        return info.CRC, info.file_size
+
+    def get_source(self, name):
+        info = self._info(name)
+        with zipfile.ZipFile(self.path) as zf:
+            source = zf.read(info).decode("utf-8")
+        return source, (info.CRC, info.file_size)
+
+
+class PackageLoader(SourceLoader):
+    """Load markdown files from package resources.
+
+    The version is the modification time of the resource if it is
+    a file, otherwise resources are assumed not to change.
+
+    Parameters
+    ----------
+    package : str
+        name of the package.
+    folder : str
+        folder of the markdown files inside the package.
+    suffix : str
+        extension of the markdown files.
+    """
+
+    def __init__(self, package, folder="md", suffix=".md"):
+        self.package = package
+        self.folder = folder
+        self.suffix = suffix
+
+    def _resource(self, name):
+        resource = importlib.resources.files(self.package)
+        for part in (self.folder + "/" + name + self.suffix).split("/"):
+            if part:
+                resource = resource.joinpath(part)
+        if not resource.is_file():
+            raise TemplateNotFound(name)
+        return resource
+
+    def get_version(self, name):
+        resource = self._resource(name)
+        try:
+            return os.stat(resource).st_mtime_ns
+        except TypeError:
+            # not a file in the filesystem (e.g. inside a zipped package)
+            return 0
+
+    def get_source(self, name):
+        version = self.get_version(name)
+        return self._resource(name).read_text(encoding="utf-8"), version
+
+
+class SQLiteLoader(SourceLoader):
+    """Load markdown files from a SQLite table with
+    the columns `name`, `source` and `version`.
+
+    `set_source` stores a source incrementing its version,
+    so that the version check does not fetch the source.
+
+    Parameters
+    ----------
+    database : str or os.PathLike
+        passed to `sqlite3.connect`.
+    table : str
+        name of the table, created if it does not exist.
+    """
+
+    def __init__(self, database, table="mdform_sources"):
+        if not table.isidentifier():
+            raise ValueError(f"Invalid table name: {table}")
+        self.table = table
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(database, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} ("
+                "name TEXT PRIMARY KEY, "
+                "source TEXT NOT NULL, "
+                "version INTEGER NOT NULL DEFAULT 1)"
+            )
+
+    def _fetchone(self, query, name):
+        with self._lock:
+            row = self._connection.execute(query, (name,)).fetchone()
+        if row is None:
+            raise TemplateNotFound(name)
+        return row
+
+    def get_version(self, name):
+        (version,) = self._fetchone(
+            f"SELECT version FROM {self.table} WHERE name = ?", name
+        )
+        return version
+
+    def get_source(self, name):
+        source, version = self._fetchone(
+            f"SELECT source, version FROM {self.table} WHERE name = ?", name
+        )
+        return source, version
+
+    def set_source(self, name, source):
+        """Store the source of a markdown file, incrementing its version."""
+        with self._lock, self._connection:
+            self._connection.execute(
+                f"INSERT INTO {self.table} (name, source) VALUES (?, ?) "
+                "ON CONFLICT(name) DO UPDATE "
+                "SET source = excluded.source, version = version + 1",
+                (name, source),
+            )
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
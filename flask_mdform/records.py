@@ -0,0 +1,312 @@
+"""
+    flask_mdform.records
+    ~~~~~~~~~~~~~~~~~~~~
+
+    Render many records of one form as an html table or list of cards,
+    without a form instance per record.
+
+        @app.route("/admin/submissions")
+        def submissions():
+            return stream_records("survey", Submission.query.yield_per(500))
+
+    :copyright: 2021 by flask-mdform Authors, see AUTHORS for more details.
+    :license: BSD, see LICENSE for more details.
+"""
+
+from __future__ import annotations
+
+import collections.abc
+import datetime
+import decimal
+
+from flask import Response, stream_with_context
+from markupsafe import Markup, escape
+from mdform import fields as mdform_fields
+
+from . import fields
+from .deco import in_app_from_mdfile
+from .forms import cached_on_class
+
+#: Layouts available for the records.
+LAYOUTS = ("table", "cards")
+
+
+class Column:
+    """How a field of a record is rendered.
+
+    Parameters
+    ----------
+    name : str
+        variable name of the field.
+    label : str
+        label of the field (already escaped).
+    format : callable (value) -> str
+        function converting a non empty value into escaped html.
+    """
+
+    __slots__ = ("name", "label", "format")
+
+    def __init__(self, name, label, format):
+        self.name = name
+        self.label = label
+        self.format = format
+
+
+def _format_text(value):
+    return escape(value)
+
+
+def _format_date(value):
+    if isinstance(value, datetime.date):
+        value = value.isoformat()
+    return escape(value)
+
+
+def _format_time(value):
+    if isinstance(value, str):
+        try:
+            value = datetime.time.fromisoformat(value)
+        except ValueError:
+            pass
+    if isinstance(value, datetime.time):
+        value = value.strftime("%H:%M")
+    return escape(value)
+
+
+def _format_email(value):
+    return Markup("<a href='mailto:%s'>%s</a>") % (value, value)
+
+
+def _decimal_formatter(places):
+    if places is None:
+        return _format_text
+
+    quantum = decimal.Decimal(1).scaleb(-places)
+
+    def _format(value):
+        try:
+            value = decimal.Decimal(str(value)).quantize(quantum)
+        except (decimal.InvalidOperation, ValueError):
+            pass
+        return escape(value)
+
+    return _format
+
+
+def _choice_formatter(labels, multiple):
+    def _label(value):
+        return labels.get(str(value), (None, value))[1]
+
+    if multiple:
+
+        def _format(value):
+            if isinstance(value, str):
+                value = (value,)
+            return escape(", ".join(str(_label(item)) for item in value))
+
+    else:
+
+        def _format(value):
+            return escape(_label(value))
+
+    return _format
+
+
+def _choices(unbound):
+    choices = unbound.kwargs.get("choices", ())
+    if callable(choices):
+        choices = choices()
+    if not isinstance(choices, fields.Choices):
+        choices = fields.Choices(choices)
+    return choices
+
+
+def _static_format(sf):
+    """Formatter for fields which do not depend on choices."""
+    if isinstance(sf, mdform_fields.DecimalField):
+        return _decimal_formatter(sf.places)
+    elif isinstance(sf, mdform_fields.DateField):
+        return _format_date
+    elif isinstance(sf, mdform_fields.TimeField):
+        return _format_time
+    elif isinstance(sf, mdform_fields.EmailField):
+        return _format_email
+    return _format_text
+
+
+_CHOICE_FIELDS = (
+    mdform_fields.SelectField,
+    mdform_fields.RadioField,
+    mdform_fields.CheckboxField,
+)
+
+
+def get_columns(form_cls, names=None):
+    """Return the columns used to render records of a form class.
+
+    Formatters are computed once per class. For choice fields, the
+    (cached) labels are looked up on each call as providers might
+    change them.
+
+    Parameters
+    ----------
+    form_cls : FlaskForm class
+    names : Iterable[str] or None
+        variable names of the fields to include (in order).
+        If None, all fields are included.
+
+    Returns
+    -------
+    list of Column
+    """
+
+    def build():
+        out = {}
+        for name, field in form_cls._mdform_def.items():
+            sf = field.specific_field
+            if isinstance(sf, _CHOICE_FIELDS):
+                # resolved below, providers might change the choices.
+                fmt = None
+            else:
+                fmt = _static_format(sf)
+            out[name] = Column(name, escape(field.label), fmt)
+        return out
+
+    columns = cached_on_class(form_cls, "_record_columns", build)
+
+    if names is None:
+        names = columns.keys()
+    elif any(name not in columns for name in names):
+        raise ValueError(f"Unknown fields in {names} for {form_cls.__name__}")
+
+    out = []
+    for name in names:
+        column = columns[name]
+        if column.format is None:
+            sf = form_cls._mdform_def[name].specific_field
+            labels = _choices(getattr(form_cls, name)).labels()
+            column = Column(
+                name,
+                column.label,
+                _choice_formatter(labels, isinstance(sf, mdform_fields.CheckboxField)),
+            )
+        out.append(column)
+    return out
+
+
+def _getter(record):
+    if isinstance(record, collections.abc.Mapping):
+        return record.get
+    return lambda name: getattr(record, name, None)
+
+
+def _cells(columns, record):
+    get = _getter(record)
+    for column in columns:
+        value = get(column.name)
+        if value is None or (not value and isinstance(value, (str, list, tuple))):
+            yield ""
+        else:
+            yield column.format(value)
+
+
+def iter_records_html(
+    form_cls, records, *, layout="table", names=None, css_class="", chunk_size=100
+):
+    """Render records of a form class as html, in chunks.
+
+    Parameters
+    ----------
+    form_cls : FlaskForm class
+    records : Iterable[dict or object]
+        plain dicts (as returned by `to_plain_dict`) or row-like objects
+        with an attribute per field.
+    layout : str
+        "table" or "cards".
+    names : Iterable[str] or None
+        variable names of the fields to include (in order).
+    css_class : str
+        extra class of the table or container.
+    chunk_size : int
+        number of records per yielded chunk.
+
+    Returns
+    -------
+    Iterator[str]
+    """
+    if layout not in LAYOUTS:
+        raise ValueError(f"Unknown layout '{layout}', valid layouts are {LAYOUTS}")
+
+    # Columns are checked before rendering starts.
+    columns = get_columns(form_cls, names)
+    css_class = escape(("mdform-records " + css_class).strip())
+
+    return _iter_records_html(columns, records, layout, css_class, chunk_size)
+
+
+def _iter_records_html(columns, records, layout, css_class, chunk_size):
+    if layout == "table":
+        yield (
+            f'<table class="{css_class}"><thead><tr>'
+            + "".join(f"<th>{column.label}</th>" for column in columns)
+            + "</tr></thead><tbody>"
+        )
+
+        def _render(record):
+            return (
+                "<tr>"
+                + "".join(f"<td>{cell}</td>" for cell in _cells(columns, record))
+                + "</tr>"
+            )
+
+        end = "</tbody></table>"
+    else:
+        yield f'<div class="{css_class}">'
+        terms = [f"<dt>{column.label}</dt>" for column in columns]
+
+        def _render(record):
+            return (
+                '<div class="card"><dl>'
+                + "".join(
+                    f"{term}<dd>{cell}</dd>"
+                    for term, cell in zip(terms, _cells(columns, record))
+                )
+                + "</dl></div>"
+            )
+
+        end = "</div>"
+
+    chunk = []
+    for record in records:
+        chunk.append(_render(record))
+        if len(chunk) >= chunk_size:
+            yield "".join(chunk)
+            chunk.clear()
+    if chunk:
+        yield "".join(chunk)
+
+    yield end
+
+
+def stream_records(mdfile, records, **kwargs):
+    """Stream records of the form defined in a markdown file as html.
+
+    Requires to be called inside an app.
+
+    Parameters
+    ----------
+    mdfile : str
+        Filename of the markdown file (without .md extension)
+        The file is loaded from the flask template folder.
+    records : Iterable[dict or object]
+        plain dicts or row-like objects.
+    **kwargs
+        passed to `iter_records_html`.
+
+    Returns
+    -------
+    flask.Response
+    """
+    _, _, Form = in_app_from_mdfile(mdfile, read_only=True)
+    chunks = iter_records_html(Form, records, **kwargs)
+    return Response(stream_with_context(chunks), mimetype="text/html")
@@ -0,0 +1,228 @@
+"""
+    flask_mdform.schema
+    ~~~~~~~~~~~~~~~~~~~
+
+    Describe the fields of a generated form in a json compatible format
+    and as a JSON Schema.
+
+    :copyright: 2021 by flask-mdform Authors, see AUTHORS for more details.
+    :license: BSD, see LICENSE for more details.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+import json
+
+from flask_wtf.file import FileAllowed, FileRequired
+from mdform import fields as mdform_fields
+from wtforms import validators as v
+
+from . import fields
+from .forms import cached_on_class
+
+
+def _field_schema(name, field, choice_provider=None):
+    sf = field.specific_field
+    out = dict(
+        name=name,
+        label=field.label,
+        type=sf.__class__.__name__,
+        required=field.required,
+    )
+    out.update(dataclasses.asdict(sf))
+    if choice_provider:
+        out.pop("choices", None)
+        out["choices_provider"] = choice_provider
+    return out
+
+
+def form_schema(form_cls):
+    """Return a json compatible description of the fields of a form class
+    generated from markdown.
+
+    It is computed once per class.
+
+    Parameters
+    ----------
+    form_cls : FlaskForm class
+
+    Returns
+    -------
+    list of dict
+        a dictionary for each field containing the name, label, type,
+        required and attributes of the specific field.
+        For fields with a choice provider, the choices are replaced
+        by the name of the provider (`choices_provider`).
+    """
+
+    def build():
+        providers = getattr(form_cls, "_choice_providers", {})
+        return [
+            _field_schema(name, field, providers.get(name))
+            for name, field in form_cls._mdform_def.items()
+        ]
+
+    return cached_on_class(form_cls, "_form_schema", build)
+
+
+#: JSON Schema dialect of the generated schemas.
+JSON_SCHEMA_DIALECT = "https://json-schema.org/draft/2020-12/schema"
+
+#: Pattern of the times accepted by `generate_form_kwargs` (ISO format).
+TIME_PATTERN = r"^\d{2}:\d{2}(:\d{2}(\.\d+)?)?$"
+
+
+def _choice_values(unbound):
+    choices = unbound.kwargs.get("choices")
+    if choices is None or callable(choices):
+        return None
+    if not isinstance(choices, fields.Choices):
+        choices = fields.Choices(choices)
+    return [value for value, _ in choices.pairs()]
+
+
+def _property_schema(field, unbound, choice_provider=None):
+    """JSON Schema of a single field, from its definition and the
+    validators of the (unbound) WTForms field.
+    """
+    sf = field.specific_field
+
+    if isinstance(sf, (mdform_fields.StringField, mdform_fields.TextAreaField)):
+        out = dict(type="string")
+    elif isinstance(sf, mdform_fields.IntegerField):
+        out = dict(type="integer")
+    elif isinstance(sf, mdform_fields.FloatField):
+        out = dict(type="number")
+    elif isinstance(sf, mdform_fields.DecimalField):
+        # serialized as a string (see `filled_form_to_content`)
+        # but numbers are also accepted.
+        out = dict(type=["string", "number"], format="decimal")
+    elif isinstance(sf, mdform_fields.DateField):
+        out = dict(type="string", format="date")
+    elif isinstance(sf, mdform_fields.TimeField):
+        out = dict(type="string", pattern=TIME_PATTERN)
+    elif isinstance(sf, mdform_fields.EmailField):
+        out = dict(type="string")
+    elif isinstance(sf, (mdform_fields.SelectField, mdform_fields.RadioField)):
+        out = dict(type="string")
+    elif isinstance(sf, mdform_fields.CheckboxField):
+        out = dict(type="array", uniqueItems=True, items=dict(type="string"))
+    elif isinstance(sf, mdform_fields.FileField):
+        # files are serialized as the value returned by the upload function.
+        out = dict(type="string")
+    else:
+        raise TypeError(f"Unknown specific field: {sf.__class__}")
+
+    out["title"] = field.label
+
+    required = False
+    for validator in unbound.kwargs.get("validators", ()):
+        if isinstance(validator, (v.DataRequired, v.InputRequired, FileRequired)):
+            required = True
+        elif isinstance(validator, v.Length):
+            if validator.max is not None and validator.max >= 0:
+                out["maxLength"] = validator.max
+            if validator.min is not None and validator.min > 0:
+                out["minLength"] = validator.min
+        elif isinstance(validator, v.NumberRange):
+            if validator.min is not None:
+                out["minimum"] = validator.min
+            if validator.max is not None:
+                out["maximum"] = validator.max
+        elif isinstance(validator, v.Email):
+            out["format"] = "email"
+        elif isinstance(validator, FileAllowed):
+            out["x-allowed-extensions"] = list(validator.upload_set)
+        elif isinstance(validator, fields.FileSize):
+            out["x-max-size"] = validator.max_size
+            if validator.min_size:
+                out["x-min-size"] = validator.min_size
+
+    if choice_provider:
+        out["x-choices-provider"] = choice_provider
+    else:
+        values = _choice_values(unbound)
+        if values is not None:
+            if out["type"] == "array":
+                out["items"]["enum"] = values
+            else:
+                out["enum"] = values
+
+    if required:
+        # DataRequired also rejects empty strings and lists.
+        if out["type"] == "string":
+            out.setdefault("minLength", 1)
+        elif out["type"] == "array":
+            out["minItems"] = 1
+    elif out["type"] != "array":
+        if isinstance(out["type"], list):
+            out["type"] = out["type"] + ["null"]
+        else:
+            out["type"] = [out["type"], "null"]
+        if "enum" in out:
+            out["enum"] = out["enum"] + [None]
+
+    return out, required
+
+
+def json_schema(form_cls):
+    """Return a JSON Schema of the plain dict of a form class generated
+    from markdown (see `DictFormMixin.to_plain_dict`).
+
+    It is derived from the field definitions and the WTForms validators,
+    and computed once per class.
+
+    Parameters
+    ----------
+    form_cls : FlaskForm class
+
+    Returns
+    -------
+    dict
+    """
+
+    def build():
+        providers = getattr(form_cls, "_choice_providers", {})
+        properties = {}
+        required = []
+        for name, field in form_cls._mdform_def.items():
+            properties[name], is_required = _property_schema(
+                field, getattr(form_cls, name), providers.get(name)
+            )
+            if is_required:
+                required.append(name)
+
+        return {
+            "$schema": JSON_SCHEMA_DIALECT,
+            "title": form_cls.__name__,
+            "type": "object",
+            "properties": properties,
+            "required": required,
+            "additionalProperties": False,
+        }
+
+    return cached_on_class(form_cls, "_json_schema", build)
+
+
+def json_schema_bytes(form_cls):
+    """Return the JSON Schema of a form class serialized to bytes
+    and its ETag (computed once per class).
+
+    Parameters
+    ----------
+    form_cls : FlaskForm class
+
+    Returns
+    -------
+    bytes, str
+    """
+
+    def build():
+        content = json.dumps(
+            json_schema(form_cls), sort_keys=True, separators=(",", ":")
+        ).encode("utf-8")
+        return content, hashlib.sha1(content).hexdigest()
+
+    return cached_on_class(form_cls, "_json_schema_bytes", build)
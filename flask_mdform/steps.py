@@ -0,0 +1,457 @@
+"""
+    flask_mdform.steps
+    ~~~~~~~~~~~~~~~~~~
+
+    Multi-step forms split from one markdown file at page break markers
+    (a line with `[page]`, optionally titled as `[page: Contact details]`).
+
+    Each step has its own form class and template, so each request only
+    renders and validates the fields of the current step. The data of
+    the previous steps is kept in a signed hidden input (`mdform_state`)
+    and merged into the single-page form class after the last step.
+
+        @app.route("/survey", methods=["GET", "POST"])
+        def survey():
+            return render_mdform_steps("survey", on_submit=save_survey)
+
+    :copyright: 2021 by flask-mdform Authors, see AUTHORS for more details.
+    :license: BSD, see LICENSE for more details.
+"""
+
+from __future__ import annotations
+
+import re
+
+from flask import current_app, request
+from flask_wtf.form import SUBMIT_METHODS
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+from wtforms import SubmitField
+
+from .deco import (
+    BLOCK,
+    CLASS_NAME,
+    EXTENDS,
+    EXTENSIONS,
+    FORMATTER,
+    STEPS_MAX_AGE,
+    TMPL_CONTEXT,
+    _flash_form_errors,
+    in_app_cached,
+    in_app_get_config,
+    in_app_get_mdfile,
+    in_app_get_template,
+)
+from .forms import (
+    convert_mdstr,
+    from_mdstr,
+    generate_form_cls,
+    generate_form_kwargs,
+    get_field_plan,
+    wrap_template,
+)
+
+#: A line with `[page]` or `[page: title]` starts a new step.
+PAGE_BREAK_RE = re.compile(
+    r"^[ \t]*\[page(?:[ \t]*:[ \t]*(?P<title>[^\]\n]*?))?[ \t]*\][ \t]*$",
+    re.MULTILINE,
+)
+
+#: Name of the hidden input holding the signed state.
+STATE_FIELD = "mdform_state"
+
+_STATE_INPUT = (
+    '<input type="hidden" name="' + STATE_FIELD + '" value="{{ mdform_state|e }}">'
+)
+
+_STATE_SALT = "flask-mdform.steps"
+
+
+def split_mdstr(mdstr):
+    """Split markdown content at page break markers.
+
+    Returns
+    -------
+    list of (str or None, str)
+        title and markdown content of each chunk.
+    """
+    out = []
+    title, start = None, 0
+    for match in PAGE_BREAK_RE.finditer(mdstr):
+        out.append((title, mdstr[start : match.start()]))
+        title, start = match.group("title") or None, match.end()
+    out.append((title, mdstr[start:]))
+    return out
+
+
+class Step:
+    """A step of a multi-step form.
+
+    Parameters
+    ----------
+    index : int
+        position of the step, starting at 0.
+    title : str or None
+        title given in the page break marker.
+    tmpl : str
+        template of the step.
+    form_cls : FlaskForm class
+        form with the fields of the step.
+    """
+
+    __slots__ = ("index", "title", "tmpl", "form_cls")
+
+    def __init__(self, index, title, tmpl, form_cls):
+        self.index = index
+        self.title = title
+        self.tmpl = tmpl
+        self.form_cls = form_cls
+
+    def __repr__(self):
+        return f"<Step {self.index} {self.title!r}>"
+
+    def make_form(self, data=None, collapse_data=None):
+        """Create the form of the step, filled with the plain dict data
+        (of this or other steps) if given, instead of the request form data.
+
+        The collapsable parts controlled by fields of other steps
+        use the value in collapse_data (by default, data).
+        """
+        if data is None:
+            form = self.form_cls()
+        else:
+            kwargs = generate_form_kwargs(
+                self.form_cls, data, on_missing_field="ignore"
+            )
+            form = self.form_cls(formdata=None, **kwargs)
+        form.collapse_data = data if collapse_data is None else collapse_data
+        return form
+
+
+class FormSteps:
+    """A form split in steps.
+
+    Parameters
+    ----------
+    meta : dict
+        metadata of the markdown file.
+    form_cls : FlaskForm class
+        single-page form with all fields.
+    steps : tuple of Step
+    """
+
+    def __init__(self, meta, form_cls, steps):
+        self.meta = meta
+        self.form_cls = form_cls
+        self.steps = steps
+        #: names of the file fields, which require an upload function.
+        self.file_fields = frozenset(
+            name for name, item in get_field_plan(form_cls).items() if item.dump is None
+        )
+
+    def __len__(self):
+        return len(self.steps)
+
+    def __getitem__(self, index):
+        return self.steps[index]
+
+    def __iter__(self):
+        return iter(self.steps)
+
+    def merge(self, data):
+        """Create the single-page form from the accumulated plain dict data.
+
+        Returns
+        -------
+        FlaskForm
+        """
+        kwargs = generate_form_kwargs(self.form_cls, data)
+        # The CSRF token was checked when each step was submitted.
+        return self.form_cls(formdata=None, meta={"csrf": False}, **kwargs)
+
+    def validate(self, form):
+        """Validate the merged form as a whole (e.g. the validators
+        and collapsable parts across steps).
+
+        File fields, which hold the urls of the files uploaded
+        in their step, are not validated again.
+
+        Returns
+        -------
+        bool
+        """
+        form.validate()
+        for name in self.file_fields:
+            form[name].errors = []
+        return not form.errors
+
+
+def from_mdstr_steps(
+    mdstr,
+    class_name,
+    block=None,
+    extends=None,
+    formatter=None,
+    extensions=(),
+):
+    """Generates the steps of a form from markdown form with page break markers.
+
+    Parameters
+    ----------
+    mdstr : str
+        markdown content
+    class_name : str
+        class of the form. Steps are named `<class_name>Step<index>`.
+    block :  str
+        Name of the block where the form is inserted.
+    extends : str
+        Name of the template that is extended.
+    formatter : callable
+        That format variable name and dict to string.
+    extensions : list
+        Python Markdown extensions to load.
+
+    Returns
+    -------
+    FormSteps
+    """
+    meta, _, form_cls = from_mdstr(
+        mdstr, class_name, formatter=formatter, extensions=extensions
+    )
+
+    choice_providers = form_cls._choice_providers
+    typeahead = form_cls._typeahead
+    collapse_map = form_cls._collapse_map
+
+    chunks = []
+    for title, chunk in split_mdstr(mdstr):
+        _, html, definition = convert_mdstr(
+            chunk, formatter, extensions, meta=not chunks
+        )
+        if definition or html.strip():
+            chunks.append((title, html, definition))
+
+    seen = set()
+    for _, _, definition in chunks:
+        repeated = seen.intersection(definition)
+        if repeated:
+            raise ValueError(f"Fields {sorted(repeated)} are in more than one step")
+        seen.update(definition)
+    if seen != set(form_cls._mdform_def):
+        raise ValueError("The steps do not contain the same fields as the form")
+
+    steps = []
+    last = len(chunks) - 1
+    for index, (title, html, definition) in enumerate(chunks):
+        step_cls = generate_form_cls(
+            f"{class_name}Step{index}",
+            definition,
+            choice_providers={
+                label: provider
+                for label, provider in choice_providers.items()
+                if label in definition
+            },
+            typeahead=[label for label in typeahead if label in definition],
+            collapse_map=collapse_map.restrict(definition),
+        )
+        if index < last:
+            step_cls.submit = SubmitField("Next")
+        if index > 0:
+            step_cls.back = SubmitField("Back")
+
+        tmpl = wrap_template(html + _STATE_INPUT, block, extends)
+        steps.append(Step(index, title, tmpl, step_cls))
+
+    return FormSteps(meta, form_cls, tuple(steps))
+
+
+def in_app_steps_from_mdfile(
+    mdfile,
+    *,
+    class_name=None,
+    block=None,
+    extends=None,
+    formatter=None,
+    extensions=None,
+):
+    """A cached version of `from_mdstr_steps` that must be used within an flask app."""
+
+    def build(sources):
+        nonlocal class_name, formatter, extensions, block, extends
+
+        class_name = class_name or in_app_get_config(CLASS_NAME)
+        formatter = formatter or in_app_get_config(FORMATTER)
+        extensions = extensions or in_app_get_config(EXTENSIONS)
+
+        block = block or in_app_get_config(BLOCK)
+        extends = extends or in_app_get_config(EXTENDS)
+
+        if callable(class_name):
+            class_name = class_name(mdfile)
+
+        steps = from_mdstr_steps(
+            sources[0],
+            class_name=class_name,
+            block=block,
+            extends=extends,
+            formatter=formatter,
+            extensions=extensions,
+        )
+        steps.form_cls._mdfile = mdfile
+
+        return steps
+
+    key = ("steps", mdfile, class_name, block, extends, formatter, extensions)
+    return in_app_cached(key, (mdfile,), build)
+
+
+def _serializer():
+    return URLSafeTimedSerializer(current_app.secret_key, salt=_STATE_SALT)
+
+
+def dump_state(index, data):
+    """Sign the current step and the accumulated plain dict data.
+
+    The state is signed, not encrypted.
+    """
+    return _serializer().dumps({"step": index, "data": data})
+
+
+def load_state(token, max_age=None):
+    """Return the step and accumulated data of a signed state,
+    or None if the signature is not valid or older than max_age seconds.
+    """
+    try:
+        state = _serializer().loads(token, max_age=max_age)
+    except BadSignature:
+        return None
+    return state["step"], state["data"]
+
+
+def _flash_step_errors(form, flash_form_errors):
+    if callable(flash_form_errors):
+        flash_form_errors(form)
+    elif flash_form_errors:
+        _flash_form_errors(form)
+
+
+def render_mdform_steps(
+    mdfile=None,
+    *,
+    on_submit,
+    upload_func=None,
+    block=None,
+    extends=None,
+    formatter=None,
+    flash_form_errors=True,
+    tmpl_context=None,
+    max_age=None,
+):
+    """Renders the current step of a multi-step mdform with flask.
+
+    Requires to be called inside an app.
+
+    The template of each step contains the signed state as a hidden input,
+    and the context variables `step` (Step) and `steps` (FormSteps).
+    Steps other than the first have a `back` button.
+
+    Parameters
+    ----------
+    mdfile : str
+        Filename of the markdown file (without .md extension)
+        The file is loaded from the flask template folder.
+    on_submit : callable
+        Functional that will be called after the last step with
+        the single-page form filled with the data of all steps.
+    upload_func: func
+        uploads a file and return the url. Files are uploaded
+        when their step is submitted and the merged form contains
+        the url. Required if the form has file fields.
+    block :  str or None
+        Name of the block where the form is inserted.
+        If None, use app.config["MDFORM_BLOCK"] which is "innerform" by default.
+    extends : str or None
+        Name of the template that is extended.
+        If None, use app.config["MDFORM_EXTENDS"] which is "form.html" by default.
+    formatter : callable
+        That format variable name and dict to string.
+    flash_form_errors : bool or callable
+        Call flash errors for a given form. (default: True)
+        Alternatively, a callable that takes a `flask_wtf.FlaskForm` form object
+        and calls `flask.flash` can be used to customize the error message.
+    tmpl_context : dict or None
+        the variables that should be available in the context of the template.
+    max_age : int or None
+        seconds after which the signed state expires, starting over.
+        If None, use app.config["MDFORM_STEPS_MAX_AGE"] which is 3600 by default.
+
+    Returns
+    -------
+    Return a rendered step.
+    """
+    tmpl_context = tmpl_context or {}
+
+    for key in ("form", "meta", "step", "steps", "mdform_state"):
+        if key in tmpl_context:
+            raise ValueError(
+                f"'{key}' cannot be a key in the `tmpl_context` dict as it is reserved by flask-mdform"
+            )
+
+    mdfile = mdfile or in_app_get_mdfile()
+
+    steps = in_app_steps_from_mdfile(
+        mdfile, block=block, extends=extends, formatter=formatter
+    )
+
+    if steps.file_fields and upload_func is None:
+        raise ValueError(
+            f"upload_func is required by the file fields {sorted(steps.file_fields)}"
+        )
+
+    if max_age is None:
+        max_age = in_app_get_config(STEPS_MAX_AGE)
+
+    cfg_tmpl_context = in_app_get_config(TMPL_CONTEXT)
+    if cfg_tmpl_context:
+        tmpl_context = {**cfg_tmpl_context, **tmpl_context}
+
+    state = None
+    if request.method in SUBMIT_METHODS:
+        state = load_state(request.form.get(STATE_FIELD, ""), max_age)
+        if state is not None and not 0 <= state[0] < len(steps):
+            state = None
+
+    if state is None:
+        # Not submitted, or without a valid state: start over.
+        index, data = 0, {}
+        form = steps[0].make_form(data)
+    else:
+        index, data = state
+        form = steps[index].make_form(collapse_data=data)
+
+        if index > 0 and form.back.data:
+            index -= 1
+            form = steps[index].make_form(data)
+
+        elif form.validate():
+            data = {**data, **form.to_plain_dict(upload_func)}
+
+            if index < len(steps) - 1:
+                index += 1
+                form = steps[index].make_form(data)
+            else:
+                merged = steps.merge(data)
+                if steps.validate(merged):
+                    return on_submit(merged, **request.view_args)
+                _flash_step_errors(merged, flash_form_errors)
+
+        else:
+            _flash_step_errors(form, flash_form_errors)
+
+    return in_app_get_template(steps[index].tmpl).render(
+        form=form,
+        meta=steps.meta,
+        step=steps[index],
+        steps=steps,
+        mdform_state=dump_state(index, data),
+        **tmpl_context,
+    )
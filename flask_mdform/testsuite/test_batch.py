@@ -0,0 +1,90 @@
+import pytest
+
+from flask_mdform import from_mdstr
+from flask_mdform.batch import validate_records
+
+_, _, Form = from_mdstr(
+    """
+Name* = ___[5]
+Age = ###[0:120]
+Score* = #.#f[0:1]
+Amount = #.#[0:10]
+Day = d/m/y
+Mail* = @
+Other Mail = @
+Color* = {(Red), Blue}
+Size = (x) S () M
+Tags = [] A [] B [] C
+""",
+    "BatchForm",
+)
+
+VALID = {
+    "name": "Ann",
+    "age": 30,
+    "score": 0.5,
+    "amount": "1.10",
+    "day": "2020-12-23",
+    "mail": "ann@example.com",
+    "other_mail": None,
+    "color": "Red",
+    "size": "S",
+    "tags": ["A"],
+}
+
+RECORDS = [
+    VALID,
+    {**VALID, "name": "Too long name", "age": 130, "score": 2.0},
+    {**VALID, "name": "  ", "mail": "not an email", "other_mail": "neither"},
+    {**VALID, "color": "Green", "size": None, "tags": ["A", "X", "Y"]},
+    {**VALID, "age": None, "amount": "-1", "score": None, "tags": []},
+    {"mail": "bob@example.com"},
+]
+
+
+def _form_errors(app, record):
+    with app.test_request_context():
+        form = Form.from_plain_dict(record, on_missing_field="ignore")
+        form.validate()
+        return {
+            name: errors
+            for name, errors in form.errors.items()
+            if name not in ("csrf_token", "submit")
+        }
+
+
+@pytest.mark.parametrize("use_numpy", [False, True])
+def test_same_errors_as_wtforms(app, use_numpy):
+    if use_numpy:
+        pytest.importorskip("numpy")
+
+    out = validate_records(Form, RECORDS, use_numpy=use_numpy)
+
+    expected = {}
+    for row, record in enumerate(RECORDS):
+        errors = _form_errors(app, record)
+        if errors:
+            expected[row] = errors
+
+    assert 0 not in out
+    assert out == expected
+
+
+def test_parse_errors():
+    out = validate_records(
+        Form, [{**VALID, "age": "old", "day": "23/12/2020"}], use_numpy=False
+    )
+    assert out == {
+        0: {"age": ["Not a valid integer value."], "day": ["Not a valid date value."]}
+    }
+
+
+def test_collapsed_fields():
+    _, _, CollapseForm = from_mdstr(
+        "more = {Yes[o], No}\n[collapse:more]\ndetails* = ___\n[endcollapse]",
+        "BatchCollapseForm",
+    )
+    records = [{"more": "No"}, {"more": "Yes"}, {"more": "Yes", "details": "x"}]
+    assert validate_records(CollapseForm, records) == {
+        1: {"details": ["This field is required."]}
+    }
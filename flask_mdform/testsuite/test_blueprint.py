@@ -0,0 +1,127 @@
+from flask_mdform import create_blueprint, render_mdform
+from flask_mdform.loaders import SQLiteLoader
+
+
+def test_typeahead_render(app, client):
+    app.register_blueprint(create_blueprint(), url_prefix="/mdform")
+
+    @app.route("/", methods=["GET", "POST"])
+    def index():
+        return render_mdform("typeahead", data={"country": "UY"})
+
+    ret = client.get("/")
+    assert ret.data.decode("utf-8") == (
+        '\n<p><label for="country">Country</label> '
+        '<select data-typeahead-url="/mdform/typeahead/country/typeahead" '
+        'id="country" name="country" required>'
+        '<option selected value="UY">Uruguay</option></select></p>'
+    )
+
+
+def test_typeahead_search(app, client):
+    app.register_blueprint(create_blueprint(), url_prefix="/mdform")
+
+    ret = client.get("/mdform/typeahead/country/typeahead?q=u")
+    assert ret.json == {
+        "results": [
+            {"value": "US", "label": "United States"},
+            {"value": "UY", "label": "Uruguay"},
+        ],
+        "page": 1,
+        "more": False,
+    }
+
+    ret = client.get("/mdform/typeahead/country/typeahead?q=U&per_page=1")
+    assert ret.json["results"] == [{"value": "US", "label": "United States"}]
+    assert ret.json["more"]
+
+    ret = client.get("/mdform/typeahead/country/typeahead?q=U&per_page=1&page=2")
+    assert ret.json["results"] == [{"value": "UY", "label": "Uruguay"}]
+    assert not ret.json["more"]
+
+    ret = client.get("/mdform/typeahead/country/typeahead?q=arg")
+    assert ret.json["results"] == [{"value": "AR", "label": "Argentina"}]
+
+    assert client.get("/mdform/typeahead/name/index").status_code == 404
+    assert client.get("/mdform/typeahead/country/not_a_file").status_code == 404
+
+
+def test_typeahead_validate(app, client):
+    @app.route("/", methods=["POST"])
+    def index():
+        return render_mdform(
+            "typeahead",
+            on_submit=lambda form: form.country.data,
+            flash_form_errors=False,
+        )
+
+    ret = client.post("/", data={"country": "BR"})
+    assert ret.data.decode("utf-8") == "BR"
+
+    ret = client.post("/", data={"country": "XX"})
+    assert "<select" in ret.data.decode("utf-8")
+
+
+def test_validate(app, client):
+    app.config["WTF_CSRF_ENABLED"] = True
+    app.register_blueprint(create_blueprint(), url_prefix="/mdform")
+
+    ret = client.post(
+        "/mdform/validate/index?fields=name,email",
+        data={"name": "x" * 31, "email": "john@smith.com"},
+    )
+    assert ret.json == {
+        "valid": False,
+        "errors": {"name": ["Field cannot be longer than 30 characters."]},
+    }
+    assert "Set-Cookie" not in ret.headers
+
+    ret = client.post(
+        "/mdform/validate/index?fields=name&fields=email",
+        json={"name": "John", "email": "john"},
+    )
+    assert ret.json == {
+        "valid": False,
+        "errors": {"email": ["Invalid email address."]},
+    }
+
+    ret = client.post("/mdform/validate/index?fields=name", data={"name": "John"})
+    assert ret.json == {"valid": True, "errors": {}}
+
+    ret = client.post("/mdform/validate/index", data={"name": "John"})
+    assert not ret.json["valid"]
+    assert set(ret.json["errors"]) == {"email", "day", "time"}
+
+    ret = client.post("/mdform/validate/index?fields=not_a_field", data={})
+    assert ret.status_code == 400
+
+
+def test_validate_collapsed(app, client):
+    loader = SQLiteLoader(":memory:")
+    loader.set_source(
+        "survey", "more = {Yes[o], No}\n[collapse:more]\ndetails* = ___\n[endcollapse]"
+    )
+    app.config["MDFORM_LOADER"] = loader
+    app.register_blueprint(create_blueprint(), url_prefix="/mdform")
+
+    ret = client.post("/mdform/validate/survey", data={"more": "No"})
+    assert ret.json == {"valid": True, "errors": {}}
+
+    ret = client.post("/mdform/validate/survey?fields=details", data={"more": "Yes"})
+    assert ret.json == {
+        "valid": False,
+        "errors": {"details": ["This field is required."]},
+    }
+
+
+def test_schema(app, client):
+    app.register_blueprint(create_blueprint(), url_prefix="/mdform")
+
+    ret = client.get("/mdform/schema/index")
+    assert ret.status_code == 200
+    assert ret.mimetype == "application/schema+json"
+    assert set(ret.json["properties"]) == {"name", "email", "day", "time", "skipme"}
+
+    etag = ret.headers["ETag"]
+    ret = client.get("/mdform/schema/index", headers={"If-None-Match": etag})
+    assert ret.status_code == 304
@@ -0,0 +1,64 @@
+import pickle
+import sys
+
+import pytest
+
+from flask_mdform import deco, on_get_page, render_mdform
+from flask_mdform.bundle import build_bundle, load_bundle
+from flask_mdform.testsuite import data_test
+
+
+def _not_compiled(*args, **kwargs):
+    raise AssertionError("Compiled outside the bundle")
+
+
+def _routes(app):
+    @app.route("/", methods=["GET"])
+    def index():
+        return render_mdform("index")
+
+    @app.route("/ro", methods=["GET"])
+    def read_only():
+        return render_mdform(
+            "index", read_only=True, data=data_test.DATA["peter@capusotto.com"]
+        )
+
+    @app.route("/about")
+    @on_get_page("about")
+    def about():
+        pass
+
+
+@pytest.mark.parametrize("zip", [False, True])
+def test_bundle(app, tmp_path, monkeypatch, zip):
+    monkeypatch.setattr(sys, "path", list(sys.path))
+
+    _routes(app)
+    client = app.test_client()
+    expected = {url: client.get(url).data for url in ("/", "/ro", "/about")}
+
+    package = f"mdform_bundle_{'zip' if zip else 'dir'}"
+    out = build_bundle(
+        app, tmp_path, mdfiles=["index"], pages=["about"], package=package, zip=zip
+    )
+    assert out.exists()
+
+    bundle = load_bundle(tmp_path / f"{package}.zip" if zip else tmp_path, package)
+    assert set(bundle.index) == {
+        ("index", False, ""),
+        ("index", True, ""),
+        ("about", False, "_PAGE"),
+    }
+
+    monkeypatch.setattr(deco, "from_mdstr", _not_compiled)
+    monkeypatch.setattr(deco, "_compile_template", _not_compiled)
+
+    app.config["MDFORM_BUNDLE"] = bundle
+    for url, data in expected.items():
+        assert client.get(url).data == data, url
+
+    _, _, Form = bundle.get_form("index")
+    assert Form.__module__ == f"{package}.form_0"
+    assert Form.__name__ == "MdForm"
+    assert pickle.loads(pickle.dumps(Form)) is Form
+    assert bundle.get_form("missing") is None
@@ -0,0 +1,116 @@
+import threading
+
+import pytest
+
+from flask_mdform import choices, from_mdstr, register_choice_provider
+
+PROVIDED = """Choices: country = test_countries
+         tags = test_tags
+
+Country = {AR}
+Tags = [] x
+"""
+
+
+@pytest.fixture
+def provider_calls():
+    calls = []
+
+    @register_choice_provider("test_countries")
+    def countries():
+        calls.append("countries")
+        return [("AR", "Argentina"), ("UY", "Uruguay")]
+
+    register_choice_provider("test_tags", lambda: ("a", "b"), ttl=10)
+
+    yield calls
+
+    choices.unregister_choice_provider("test_countries")
+    choices.unregister_choice_provider("test_tags")
+
+
+def test_providers_from_meta():
+    assert choices.providers_from_meta({}) == {}
+    assert choices.providers_from_meta({"choices": ["a = b", " c=d "]}) == {
+        "a": "b",
+        "c": "d",
+    }
+    with pytest.raises(ValueError):
+        choices.providers_from_meta({"choices": ["a b"]})
+
+
+def test_provided_choices(app, provider_calls):
+    _, _, Form = from_mdstr(PROVIDED, "ProvidedForm")
+    assert Form._choice_providers == {
+        "country": "test_countries",
+        "tags": "test_tags",
+    }
+
+    # Providers are called lazily
+    assert provider_calls == []
+
+    with app.test_request_context():
+        form = Form(country="UY", tags=["b"])
+        assert list(form.country.choices) == [("AR", "Argentina"), ("UY", "Uruguay")]
+        assert list(form.tags.choices) == ["a", "b"]
+        assert form.validate()
+
+        Form(country="UY")
+        assert provider_calls == ["countries"]
+
+    with pytest.raises(ValueError):
+        from_mdstr("Choices: other = test_countries\n\nCountry = {AR}", "Form")
+
+    with pytest.raises(TypeError):
+        from_mdstr("Choices: country = test_countries\n\nCountry = ___", "Form")
+
+    with pytest.raises(ValueError):
+        choices.get_choices("not_registered")
+
+
+def test_provider_ttl(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(choices.time, "monotonic", lambda: now[0])
+
+    values = iter(("a", "b", "c"))
+    provider = choices.ChoiceProvider(lambda: (next(values),), ttl=10)
+
+    assert provider() == ("a",)
+    now[0] = 5
+    assert provider() == ("a",)
+    now[0] = 10
+    assert provider() == ("b",)
+
+    provider.invalidate()
+    assert provider() == ("c",)
+
+
+def test_provider_stale_while_revalidate(app, monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(choices.time, "monotonic", lambda: now[0])
+
+    release = threading.Event()
+    values = iter(("a", "b"))
+
+    def slow():
+        value = next(values)
+        if value == "b":
+            release.wait(5)
+        return (value,)
+
+    provider = choices.ChoiceProvider(slow, ttl=10, stale_while_revalidate=True)
+    assert provider() == ("a",)
+
+    now[0] = 10
+    with app.app_context():
+        # the stale value is returned without waiting for the refresh.
+        assert provider() == ("a",)
+        assert provider() == ("a",)
+
+    release.set()
+    for thread in threading.enumerate():
+        if thread is not threading.current_thread() and thread.daemon:
+            thread.join(5)
+
+    now[0] = 11
+    assert provider() == ("b",)
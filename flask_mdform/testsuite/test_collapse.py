@@ -0,0 +1,180 @@
+import pytest
+from flask import render_template_string
+from mdform.extension import FormPreprocessor
+
+from flask_mdform import collapse, from_mdstr
+from flask_mdform.collapse import (
+    CollapseMap,
+    classify_lines,
+    omit_collapsed,
+    parse_collapse,
+)
+
+MDSTR = """
+more* = {Yes[o], No}
+
+[collapse:more]
+details* = ___
+
+closed = {Yes[c], No}
+
+[collapse:closed]
+reason* = ___
+[endcollapse]
+[endcollapse]
+
+[section:other]
+extra = {Yes[o], No}
+
+[collapse:extra]
+notes* = ___
+[endcollapse]
+
+[collapse]
+always* = ___
+[endcollapse]
+"""
+
+OTHER_MDSTR = """
+[section: Contact Data ]
+Número de teléfono* = ___
+[collapse]
+Año = ###
+</div>
+[collapse: Más ]
+<div id="accordion-x">
+  indented = ___
+[endcollapse]
+[endcollapse]
+[section:]
+plain text with = sign
+Éxtra = {A[o], B}
+[collapse:éxtra]
+x = ___
+[endcollapse]
+"""
+
+
+def test_classify_lines():
+    assert [
+        (kind, name) for _, kind, name, _ in classify_lines(OTHER_MDSTR) if kind
+    ] == [
+        ("field", "contact data_numero_de_telefono"),
+        ("collapse", "contact data_0"),
+        ("field", "contact data_ano"),
+        ("collapse", "contact data_mas"),
+        ("endcollapse", None),
+        ("endcollapse", None),
+        ("field", "extra"),
+        ("collapse", "extra"),
+        ("field", "x"),
+        ("endcollapse", None),
+    ]
+    assert parse_collapse(OTHER_MDSTR).dependencies == {"x": ("extra",)}
+
+
+def test_unexpected_mdform_output(monkeypatch):
+    class Preprocessor(FormPreprocessor):
+        def run(self, lines):
+            return [line.upper() for line in lines]
+
+    monkeypatch.setattr(collapse, "FormPreprocessor", Preprocessor)
+
+    with pytest.warns(RuntimeWarning):
+        assert not parse_collapse(MDSTR)
+    with pytest.warns(RuntimeWarning):
+        assert omit_collapsed(MDSTR, CollapseMap()) == MDSTR
+
+
+def test_parse_collapse():
+    collapse_map = parse_collapse(MDSTR)
+
+    assert set(collapse_map.conditions) == {"more", "closed", "other_extra"}
+    assert collapse_map.dependencies == {
+        "details": ("more",),
+        "closed": ("more",),
+        "reason": ("more", "closed"),
+        "other_notes": ("other_extra",),
+    }
+
+
+def test_validate_inactive(app):
+    _, _, Form = from_mdstr(MDSTR, "CollapseForm")
+
+    base = {"more": "No", "closed": "No", "other_extra": "No", "other_always": "x"}
+
+    with app.test_request_context(method="POST", data=base):
+        form = Form()
+        assert form.inactive_fields() == {"details", "closed", "reason", "other_notes"}
+        assert form.validate()
+        assert "other_always" in form._fields
+
+    with app.test_request_context(method="POST", data={**base, "more": "Yes"}):
+        form = Form()
+        assert form.inactive_fields() == {"other_notes"}
+        assert not form.validate()
+        assert set(form.errors) == {"details", "reason"}
+
+    data = {**base, "more": "Yes", "closed": "Yes", "details": "x"}
+    with app.test_request_context(method="POST", data=data):
+        form = Form()
+        assert form.inactive_fields() == {"reason", "other_notes"}
+        assert form.validate()
+
+
+def test_validate_inactive_sees_all_fields(app):
+    _, _, Form = from_mdstr(MDSTR, "CollapseHookForm")
+    seen = []
+
+    def validate_other_always(form, field):
+        seen.append(set(form._fields))
+
+    type.__setattr__(Form, "validate_other_always", validate_other_always)
+
+    data = {"more": "No", "closed": "No", "other_extra": "No", "other_always": "x"}
+    with app.test_request_context(method="POST", data=data):
+        form = Form()
+        assert form.validate()
+        assert seen == [set(form._fields)]
+        assert {"details", "reason"} <= seen[0]
+
+
+def test_validate_skips_inactive(app):
+    _, _, Form = from_mdstr(MDSTR, "CollapseSpyForm")
+    calls = []
+
+    def spy(form, field):
+        calls.append(field.name)
+
+    type.__setattr__(Form, "validate_details", spy)
+
+    data = {"more": "No", "closed": "No", "other_extra": "No", "other_always": "x"}
+    with app.test_request_context(method="POST", data=data):
+        form = Form()
+        assert form.validate(extra_validators={"reason": [spy]})
+        assert calls == []
+
+    data = {**data, "more": "Yes", "details": "x"}
+    with app.test_request_context(method="POST", data=data):
+        form = Form()
+        assert not form.validate(extra_validators={"reason": [spy]})
+        assert calls == ["details"]
+        assert set(form.errors) == {"reason"}
+
+
+def test_omit_inactive(app):
+    data = {"more": "No", "closed": "No", "other_extra": "Yes", "other_always": "x"}
+
+    with app.test_request_context():
+        _, tmpl, Form = from_mdstr(MDSTR, "CollapseRO", read_only=True)
+        out = render_template_string(tmpl, form=Form.from_plain_dict(data))
+        assert 'id="details"' in out
+
+        _, tmpl, Form = from_mdstr(
+            MDSTR, "CollapseRO", read_only=True, omit_inactive=True
+        )
+        out = render_template_string(tmpl, form=Form.from_plain_dict(data))
+        assert 'id="details"' not in out
+        assert 'id="reason"' not in out
+        assert 'id="other_notes"' in out
+        assert 'id="other_always"' in out
@@ -0,0 +1,169 @@
+from flask import jsonify
+
+from flask_mdform.compose import compose_mdstr, render_composite
+from flask_mdform.testsuite import data_test
+
+
+def test_compose_mdstr(app):
+    meta, tmpl, Form = compose_mdstr(
+        (("a", "Title: A\n\nname* = ___"), ("b", "name = ___")),
+        "Composite",
+        block="innerform",
+        extends="form.html",
+    )
+
+    assert meta == {"a": {"title": ["A"]}, "b": {}}
+    assert tmpl.startswith('{%- extends "form.html" %}')
+    assert '{% with form = form["a"].form, meta = meta["a"] %}' in tmpl
+    assert list(Form._parts) == ["a", "b"]
+    assert Form._parts["a"].submit is None
+
+    with app.test_request_context():
+        form = Form(formdata=None)
+        assert [field.name for field in form.a] == ["a-name"]
+        assert form.b.form.meta.csrf is False
+
+
+def test_render_composite(app, client):
+    @app.route("/", methods=["GET", "POST"])
+    def index():
+        return render_composite(
+            ("index", "billing"),
+            on_submit=lambda form: jsonify(form.to_plain_dict()),
+            flash_form_errors=False,
+        )
+
+    @app.route("/ro", methods=["GET"])
+    def read_only():
+        return render_composite(
+            ("index", "billing"),
+            read_only=True,
+            data={
+                "index": data_test.DATA["peter@capusotto.com"],
+                "billing": {"name": "Peter", "card": "123"},
+            },
+        )
+
+    ret = client.get("/")
+    out = ret.data.decode("utf-8")
+    assert 'id="index-name"' in out
+    assert 'id="billing-name"' in out
+    assert "Billing details" in out
+
+    data = data_test.DATA["peter@capusotto.com"]
+    formdata = {f"index-{key}": value for key, value in data.items()}
+
+    # Invalid billing part.
+    ret = client.post("/", data=formdata)
+    assert b'id="billing-card"' in ret.data
+
+    ret = client.post(
+        "/", data={**formdata, "billing-name": "Peter", "billing-card": "123"}
+    )
+    assert ret.json == {
+        "index": {**data, "time": "02:18:00"},
+        "billing": {"name": "Peter", "card": "123"},
+    }
+
+    ret = client.get("/ro")
+    out = ret.data.decode("utf-8")
+    assert 'value="Peter"' in out
+    assert "readonly" in out
+
+
+def _composite_data():
+    return {
+        "index": data_test.DATA["peter@capusotto.com"],
+        "billing": {"name": "Peter", "card": "123"},
+    }
+
+
+def _composite_formdata():
+    return {
+        f"{name}-{key}": value
+        for name, part in _composite_data().items()
+        for key, value in part.items()
+    }
+
+
+def _not_implemented(form):
+    raise NotImplementedError
+
+
+def test_render_composite_read_only_fallback(app, client):
+    @app.route("/", methods=["POST"])
+    def index():
+        return render_composite(("index", "billing"), on_submit=_not_implemented)
+
+    @app.route("/preview", methods=["POST"])
+    def preview():
+        return render_composite(
+            ("index", "billing"), on_submit=_not_implemented, preview=True
+        )
+
+    for url in ("/", "/preview"):
+        out = client.post(url, data=_composite_formdata()).data.decode("utf-8")
+        assert 'id="billing-name"' in out
+        assert 'value="Peter"' in out
+        assert "readonly" in out
+
+
+def test_render_composite_read_only_requires_csrf_token(app, client):
+    @app.route("/", methods=["POST"])
+    def index():
+        return render_composite(
+            ("index", "billing"),
+            read_only=True,
+            on_submit=lambda form: "submitted",
+            flash_form_errors=False,
+        )
+
+    app.config["WTF_CSRF_ENABLED"] = True
+    assert client.post("/", data=_composite_formdata()).data != b"submitted"
+
+    app.config["WTF_CSRF_ENABLED"] = False
+    assert client.post("/", data=_composite_formdata()).data == b"submitted"
+
+
+def test_render_composite_json_api(app, client):
+    @app.route("/", methods=["GET", "POST"])
+    def index():
+        return render_composite(
+            ("index", "billing"),
+            data=_composite_data(),
+            on_submit=lambda form: jsonify(form.billing.data),
+            json_api=True,
+        )
+
+    @app.route("/ni", methods=["POST"])
+    def not_implemented():
+        return render_composite(
+            ("index", "billing"), on_submit=_not_implemented, json_api=True
+        )
+
+    ret = client.get("/", headers={"Accept": "application/json"})
+    assert ret.json["data"] == _composite_data()
+    assert set(ret.json["schema"]) == {"index", "billing"}
+    assert [field["name"] for field in ret.json["schema"]["billing"]] == [
+        "name",
+        "card",
+    ]
+
+    ret = client.post("/", json=_composite_data())
+    assert ret.json == {"name": "Peter", "card": "123"}
+
+    ret = client.post("/ni", json=_composite_data())
+    assert ret.json == {
+        "data": {
+            "index": {**data_test.DATA["peter@capusotto.com"], "time": "02:18:00"},
+            "billing": {"name": "Peter", "card": "123"},
+        }
+    }
+
+    ret = client.post("/", json={**_composite_data(), "billing": {"card": "1" * 17}})
+    assert ret.status_code == 400
+    assert set(ret.json["errors"]["billing"]) == {"name", "card"}
+
+    ret = client.post("/", json={"billing": []})
+    assert ret.status_code == 400
+    assert "form" in ret.json["errors"]
@@ -1,8 +1,16 @@
+import gzip
+import io
+
 import pytest
+from flask_wtf.csrf import generate_csrf
 
 from flask_mdform import from_mdstr, on_get_form, on_submit_form, render_mdform
-from flask_mdform.deco import in_app_from_mdfile
-from flask_mdform.testsuite import data_test
+from flask_mdform.deco import (
+    in_app_from_mdfile,
+    in_app_get_output_cache,
+    in_app_get_template,
+)
+from flask_mdform.testsuite import conftest, data_test
 
 meta, html, BasicForm = from_mdstr(data_test.TEXT_2, "BasicForm")
 
@@ -140,3 +148,218 @@ def test_in_app_from_mdfile(app):
             "blank-value": [""],
             "base_url": [r"http://example.com"],
         }
+
+
+def test_json_api(app, client):
+    app.config["MDFORM_JSON_API"] = True
+
+    @app.route("/<username>", methods=["GET"])
+    @on_get_form(mdfile="index")
+    def get(username):
+        return data_test.DATA[username]
+
+    @app.route("/<username>", methods=["POST"])
+    @on_submit_form(mdfile="index")
+    def post(form, username):
+        return dict(username=username, day=form.day.data.isoformat())
+
+    @app.route("/ni/<username>", methods=["POST"])
+    @on_submit_form(mdfile="index")
+    def not_implemented(form, username):
+        raise NotImplementedError
+
+    # HTML is still rendered for browsers.
+    ret = client.get("/peter@capusotto.com")
+    assert ret.data.decode("utf-8") == data_test.RENDERED_JINJA_WTF_INDEX_PETER
+
+    ret = client.get("/peter@capusotto.com", headers={"Accept": "application/json"})
+    assert ret.json["data"] == data_test.DATA["peter@capusotto.com"]
+    assert [field["name"] for field in ret.json["schema"]] == [
+        "name",
+        "email",
+        "day",
+        "time",
+        "skipme",
+    ]
+    assert ret.json["schema"][0] == {
+        "name": "name",
+        "label": "name",
+        "type": "StringField",
+        "required": True,
+        "length": 30,
+    }
+
+    ret = client.post(
+        "/peter@capusotto.com", json=data_test.DATA["peter@capusotto.com"]
+    )
+    assert ret.json == {"username": "peter@capusotto.com", "day": "2020-12-23"}
+
+    ret = client.post(
+        "/ni/peter@capusotto.com", json=data_test.DATA["peter@capusotto.com"]
+    )
+    assert ret.json == {
+        "data": {**data_test.DATA["peter@capusotto.com"], "time": "02:18:00"}
+    }
+
+    ret = client.post("/peter@capusotto.com", json={"name": "x" * 31})
+    assert ret.status_code == 400
+    assert ret.json["errors"]["name"] == ["Field cannot be longer than 30 characters."]
+    assert "email" in ret.json["errors"]
+
+    ret = client.post("/peter@capusotto.com", json={"day": "not a date"})
+    assert ret.status_code == 400
+    assert "form" in ret.json["errors"]
+
+    ret = client.post("/peter@capusotto.com", json=[])
+    assert ret.status_code == 400
+
+
+def test_json_api_csrf(app, client):
+    app.config["MDFORM_JSON_API"] = True
+    app.config["WTF_CSRF_ENABLED"] = True
+
+    @app.route("/token", methods=["GET"])
+    def token():
+        return generate_csrf()
+
+    @app.route("/<username>", methods=["POST"])
+    @on_submit_form(mdfile="index")
+    def post(form, username):
+        return dict(username=username)
+
+    data = data_test.DATA["peter@capusotto.com"]
+
+    ret = client.post("/peter@capusotto.com", json=data)
+    assert ret.status_code == 400
+    assert "csrf_token" in ret.json["errors"]
+    assert "Set-Cookie" not in ret.headers
+
+    csrf_token = client.get("/token").data.decode("utf-8")
+    ret = client.post(
+        "/peter@capusotto.com", json=data, headers={"X-CSRFToken": csrf_token}
+    )
+    assert ret.json == {"username": "peter@capusotto.com"}
+    assert "Set-Cookie" not in ret.headers
+
+
+def test_get_form_ro_does_not_touch_session(app, client):
+    app.config["WTF_CSRF_ENABLED"] = True
+
+    @app.route("/<username>", methods=["GET"])
+    @on_get_form(mdfile="index", read_only=True)
+    def index(username):
+        return data_test.DATA[username]
+
+    ret = client.get("/peter@capusotto.com")
+    assert ret.status_code == 200
+    assert "csrf_token" not in ret.data.decode("utf-8")
+    assert "Set-Cookie" not in ret.headers
+    assert "Cookie" not in ret.headers.get("Vary", "")
+
+
+def test_post_form_ro_requires_csrf_token(app, client):
+    app.config["WTF_CSRF_ENABLED"] = True
+    calls = []
+
+    @app.route("/<username>", methods=["POST"])
+    @on_submit_form(mdfile="index", read_only=True)
+    def bla(form, username):
+        calls.append(username)
+        return username
+
+    def post():
+        return client.post(
+            "/peter@capusotto.com",
+            data=data_test.DATA["peter@capusotto.com"],
+            content_type="application/x-www-form-urlencoded",
+        )
+
+    assert post().status_code == 200
+    assert calls == []
+
+    app.config["WTF_CSRF_ENABLED"] = False
+    assert post().data.decode("utf-8") == "peter@capusotto.com"
+    assert calls == ["peter@capusotto.com"]
+
+
+def test_submit_form_preview(app, client):
+    @app.route("/<username>", methods=["GET", "POST"])
+    def index(username):
+        return render_mdform("index_avatar", preview=True)
+
+    data = dict(data_test.DATA["peter@capusotto.com"])
+    data["avatar"] = (io.BytesIO(b"image"), "avatar.png")
+
+    ret = client.post(
+        "/peter@capusotto.com", data=data, content_type="multipart/form-data"
+    )
+    assert ret.status_code == 200
+    html = ret.data.decode("utf-8")
+    assert 'name="name" readonly required type="text" value="Peter Capusotto"' in html
+    assert 'id="avatar" name="avatar" readonly' in html
+
+
+def test_post_form_preview(app, client):
+    @app.route("/<username>", methods=["POST"])
+    @on_submit_form(mdfile="index", preview=True)
+    def bla(form, username):
+        raise AssertionError("not called in preview")
+
+    ret = client.post(
+        "/peter@capusotto.com",
+        data=data_test.DATA["peter@capusotto.com"],
+        content_type="application/x-www-form-urlencoded",
+    )
+    assert ret.data.decode("utf-8") == data_test.RENDERED_JINJA_WTF_INDEX_PETER_RO
+
+
+def test_get_form_cache_output(app, client):
+    calls = []
+
+    @app.route("/<username>", methods=["GET"])
+    @on_get_form(mdfile="index", read_only=True, cache_output=True)
+    def index(username):
+        calls.append(username)
+        return data_test.DATA[username]
+
+    expected = data_test.RENDERED_JINJA_WTF_INDEX_PETER_RO.encode("utf-8")
+
+    ret = client.get("/peter@capusotto.com")
+    assert ret.data == expected
+    assert "Content-Encoding" not in ret.headers
+    assert ret.headers["Vary"] == "Accept-Encoding"
+
+    ret = client.get("/peter@capusotto.com", headers={"Accept-Encoding": "gzip"})
+    assert ret.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(ret.data) == expected
+
+    ret = client.get(
+        "/peter@capusotto.com",
+        headers={"Accept-Encoding": "gzip", "If-None-Match": ret.headers["ETag"]},
+    )
+    assert ret.status_code == 304
+
+    with app.app_context():
+        assert len(in_app_get_output_cache()) == 1
+    assert calls == ["peter@capusotto.com"] * 3
+
+
+def test_get_form_cache_output_requires_read_only():
+    with pytest.raises(ValueError):
+        on_get_form(mdfile="index", cache_output=True)
+
+
+def test_in_app_get_template_per_app(app):
+    app.config["MDFORM_TEMPLATE_CACHE_SIZE"] = 2
+    other = conftest.Flask(__name__)
+
+    with app.app_context():
+        template = in_app_get_template("{{ 1 }}")
+        assert in_app_get_template("{{ 1 }}") is template
+        assert template.environment is app.jinja_env
+        in_app_get_template("{{ 2 }}")
+        in_app_get_template("{{ 3 }}")
+        assert len(app.extensions["mdform_templates"]) == 2
+
+    with other.app_context():
+        assert in_app_get_template("{{ 1 }}").environment is other.jinja_env
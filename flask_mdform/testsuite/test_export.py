@@ -0,0 +1,55 @@
+import json
+
+import pytest
+
+from flask_mdform import from_mdstr
+from flask_mdform.export import export_response, iter_csv, iter_export, iter_jsonl
+from flask_mdform.testsuite import data_test
+
+_, _, Form = from_mdstr(
+    """
+Name* = ___
+Amount = #.#
+Tags = [] A [] B [] C
+Photo = ...
+""",
+    "ExportForm",
+)
+
+RECORDS = [
+    {"name": "Ann, Jr.", "amount": "1.10", "tags": ["A", "C"], "photo": "a.png"},
+    {"name": "Bob", "tags": [], "photo": {"url": "b.png"}, "other": 1},
+]
+
+
+def test_csv():
+    assert list(iter_csv(Form, RECORDS)) == [
+        "Name,Amount,Tags,Photo\r\n",
+        '"Ann, Jr.",1.10,A;C,a.png\r\n',
+        'Bob,,,"{""url"": ""b.png""}"\r\n',
+    ]
+
+
+def test_jsonl():
+    lines = list(iter_jsonl(Form, RECORDS))
+    assert lines[1] == (
+        '{"name":"Bob","amount":null,"tags":[],"photo":{"url":"b.png"}}\n'
+    )
+    assert json.loads(lines[0]) == RECORDS[0]
+
+
+def test_unknown_format():
+    with pytest.raises(ValueError):
+        iter_export(Form, RECORDS, "xml")
+
+
+def test_export_response(app, client):
+    @app.route("/export")
+    def export():
+        return export_response("index", data_test.DATA.values(), header=False)
+
+    ret = client.get("/export")
+    assert ret.is_streamed
+    assert ret.headers["Content-Disposition"] == "attachment; filename=index.csv"
+    lines = ret.data.decode("utf-8").splitlines()
+    assert lines[0] == "John Smith,john@smith.com,2020-12-23,02:18,123"
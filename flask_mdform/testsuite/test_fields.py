@@ -0,0 +1,113 @@
+import pytest
+from wtforms_components import read_only
+
+from flask_mdform import from_mdstr
+from flask_mdform.testsuite import data_test
+
+meta, html, BasicForm = from_mdstr(data_test.ALL_FIELDS, "BasicForm")
+
+LIST_FIELDS = """
+Radio Field* = (x) A () B () C D
+Checkbox Field = [x] A [] B [] C
+"""
+
+
+def _render_iterating(field, **kwargs):
+    choices = field.choices
+    field.choices = list(choices)
+    try:
+        return field(**kwargs)
+    finally:
+        field.choices = choices
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        {},
+        {"radio_field": "B", "checkbox_field": ["A", "C"]},
+        {"radio_field": "Z", "checkbox_field": []},
+    ],
+)
+def test_list_widget_bulk_render(app, data):
+    _, _, Form = from_mdstr(LIST_FIELDS, "ListForm")
+
+    with app.test_request_context():
+        for prefix in ("", "p-"):
+            form = Form(prefix=prefix, **data)
+            for field in (form.radio_field, form.checkbox_field):
+                assert field() == _render_iterating(field)
+                assert field(disabled=True, readonly=True) == _render_iterating(
+                    field, disabled=True, readonly=True
+                )
+                read_only(field)
+                assert field() == _render_iterating(field)
+
+
+def test_list_widget_cache_shared_by_prefixes(app):
+    _, _, Form = from_mdstr(LIST_FIELDS, "ListPrefixForm")
+
+    with app.test_request_context():
+        Form().radio_field()
+        choices = Form().radio_field.choices
+        size = len(choices._cache)
+
+        for prefix in ("a-", "b-", 'c"<-'):
+            field = Form(prefix=prefix).radio_field
+            assert field() == _render_iterating(field)
+
+        assert len(choices._cache) == size
+
+
+def _errors_iterating(field, form):
+    choices = field.choices
+    field.choices = list(choices)
+    try:
+        field.validate(form)
+        return field.errors
+    finally:
+        field.choices = choices
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        {"radio_field": "B", "checkbox_field": ["A", "C"], "select_field": "B"},
+        {"radio_field": "Z", "checkbox_field": ["Y", "A"], "select_field": "Z"},
+        {"radio_field": "Z", "checkbox_field": ["Y", "A", "X"]},
+    ],
+)
+def test_choices_validation(app, data):
+    with app.test_request_context():
+        form = BasicForm(**data)
+        for name in ("radio_field", "checkbox_field", "select_field"):
+            field = getattr(form, name)
+            field.validate(form)
+            assert field.errors == _errors_iterating(field, form)
+
+
+HTML5_FIELDS = """
+Integer* = ###[1:10:2]
+Decimal = #.#[0:5:0.5:1]
+Places = #.#
+Float = #.#f[0:5]
+Upload = ...[jpg, png]
+"""
+
+
+def test_html5_attributes(app):
+    _, _, Form = from_mdstr(HTML5_FIELDS, "HTML5Form")
+
+    with app.test_request_context():
+        form = Form()
+        assert form.integer() == (
+            '<input id="integer" max="10" min="1" name="integer" '
+            'required step="2" type="number" value="">'
+        )
+        assert 'step="0.5"' in form.decimal()
+        assert 'step="0.01"' in form.places()
+        assert form.float() == (
+            '<input id="float" max="5.0" min="0.0" name="float" '
+            'step="any" type="number" value="">'
+        )
+        assert 'accept=".jpg,.png"' in form.upload()
@@ -1,6 +1,7 @@
 import mdform
+from flask import render_template_string
 
-from flask_mdform import formatters
+from flask_mdform import formatters, from_mdstr
 from flask_mdform.testsuite import data_test
 
 
@@ -17,3 +18,30 @@ def test_flask_wtf_bs4():
 def test_flask_wtf_bs4_nolabel():
     html, _ = mdform.parse(data_test.TEXT_3, formatters.flask_wtf_bs4("jQuery"))
     assert html == data_test.JINJA_WTF_BS4_3
+
+
+def test_flask_wtf_bs4_static(app):
+    _, html, Form = from_mdstr(
+        data_test.TEXT_3, "MDForm", formatter=formatters.flask_wtf_bs4_static()
+    )
+    assert "wtf." not in html
+
+    with app.test_request_context(method="POST", data={"name": "x" * 31}):
+        form = Form()
+        form.validate()
+        out = render_template_string(html, form=form)
+
+    assert out.startswith("<p>Welcome to the form tester</p>")
+    assert (
+        '<div class="form-group has-danger row required">'
+        '<label class="form-control-label col-lg-2" for="name">name</label>'
+        '<div class="col-lg-10"><input class="form-control" id="name" '
+        'maxlength="30" name="name" required type="text" '
+        'value="xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx"></div>'
+        '<div class="offset-lg-2 col-lg-10"><div class="invalid-feedback">'
+        "Field cannot be longer than 30 characters.</div></div></div>"
+    ) in out
+    assert (
+        '<input class="form-control nolabel" id="e_mail" name="e_mail" '
+        'required type="email" value="">'
+    ) in out
@@ -1,10 +1,12 @@
+import gc
 import pathlib
+import tracemalloc
 
 import pytest
 import wtforms
 from wtforms_components import ReadOnlyWidgetProxy
 
-from flask_mdform import formatters, from_mdfile, from_mdstr
+from flask_mdform import codecs, fields, formatters, from_mdfile, from_mdstr
 from flask_mdform.forms import (
     ReadOnlyFormMixin,
     filled_form_to_content,
@@ -157,3 +159,59 @@ def test_from_mdfile():
         from_mdfile(mdfile, formatter=formatters.flask_wtf, extends="mypage")[1]
         == '{%- extends "mypage" %}\n' + data_test.JINJA_WTF_1
     )
+
+
+def test_compact_compiled_form():
+    from_mdstr(data_test.ALL_FIELDS, "Warmup")
+    gc.collect()
+
+    tracemalloc.start()
+    try:
+        start, _ = tracemalloc.get_traced_memory()
+        cached = [
+            from_mdstr(data_test.ALL_FIELDS, f"Form{i}", read_only=bool(i % 2))
+            for i in range(20)
+        ]
+        gc.collect()
+        end, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    bytes_per_form = (end - start) / len(cached)
+    assert bytes_per_form < 16 * 1024
+
+    # Definitions are shared among compiled forms.
+    def0, def1 = cached[0][2]._mdform_def, cached[1][2]._mdform_def
+    assert def0 == def1
+    for name in def0:
+        assert def0[name] is def1[name]
+
+    assert not hasattr(fields.FileSize(max_size=10), "__dict__")
+
+
+@pytest.mark.parametrize("codec", ["json", "msgpack"])
+def test_to_from_bytes(app, codec):
+    if codec not in codecs._CODECS:
+        pytest.skip(f"{codec} is not installed")
+
+    # Form is modified by test_serialize
+    _, _, Form = from_mdstr(data_test.ALL_FIELDS, "CodecForm")
+
+    with app.app_context():
+        filled_form = Form(**data_test.FORM_KWARGS_ALL)
+        expected = filled_form.to_plain_dict(dummy_upload_func, skip=("skipme",))
+
+        content = filled_form.to_bytes(
+            codec, dummy_upload_func, skip=("csrf_token", "submit", "skipme")
+        )
+        assert isinstance(content, bytes)
+        assert codecs.get_codec(codec).loads(content) == expected
+
+        form = Form.from_bytes(content, codec)
+        assert form.to_plain_dict(dummy_upload_func, skip=("skipme",)) == expected
+
+    with pytest.raises(ValueError):
+        Form.from_bytes(b"[]", "json")
+
+    with pytest.raises(ValueError):
+        codecs.get_codec("xml")
@@ -0,0 +1,54 @@
+import gzip
+
+from flask_mdform import on_get_form, on_get_page
+from flask_mdform.freeze import create_freeze_command, freeze, url_to_path
+from flask_mdform.testsuite import data_test
+
+
+def _add_routes(app):
+    @app.route("/about")
+    @on_get_page("about")
+    def about():
+        return {}
+
+    @app.route("/record/<username>")
+    @on_get_form("index", read_only=True)
+    def record(username):
+        return data_test.DATA[username]
+
+
+ROUTES = [
+    "about",
+    ("record", ({"username": u} for u in ("john@smith.com", "peter@capusotto.com"))),
+]
+
+
+def test_url_to_path(tmp_path):
+    assert url_to_path(tmp_path, "/") == tmp_path / "index.html"
+    assert url_to_path(tmp_path, "/a/b/") == tmp_path / "a" / "b" / "index.html"
+    assert url_to_path(tmp_path, "/a/b") == tmp_path / "a" / "b.html"
+
+
+def test_freeze(app, tmp_path):
+    _add_routes(app)
+
+    written = freeze(app, ROUTES, tmp_path, precompress=True, max_workers=2)
+    assert len(written) == 6
+
+    about = (tmp_path / "about.html").read_text()
+    assert "<h1>About us</h1>" in about
+
+    path = tmp_path / "record" / "peter@capusotto.com.html"
+    content = path.read_bytes()
+    assert content.decode("utf-8") == data_test.RENDERED_JINJA_WTF_INDEX_PETER_RO
+    assert gzip.decompress(path.with_suffix(".html.gz").read_bytes()) == content
+
+
+def test_freeze_command(app, tmp_path):
+    _add_routes(app)
+    app.cli.add_command(create_freeze_command(lambda: ["about"]))
+
+    result = app.test_cli_runner().invoke(args=["freeze", str(tmp_path)])
+    assert result.exit_code == 0, result.output
+    assert (tmp_path / "about.html").exists()
+    assert not (tmp_path / "about.html.gz").exists()
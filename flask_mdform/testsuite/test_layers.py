@@ -0,0 +1,123 @@
+import pytest
+from flask import request
+
+from flask_mdform import render_mdform
+from flask_mdform.deco import (
+    in_app_from_mdfile,
+    in_app_get_tenant_cache,
+    in_app_tenant_layer,
+)
+from flask_mdform.layers import extend_template
+from flask_mdform.loaders import SQLiteLoader
+
+BASE = """name* = ___
+color = {Red, Blue}
+"""
+
+LAYER = """color = {Red, Green, Blue}
+phone = ___
+"""
+
+
+def _setup(app):
+    loader = SQLiteLoader(":memory:")
+    loader.set_source("survey", BASE)
+    loader.set_source("tenants/acme/survey", LAYER)
+    loader.set_source("tenants/beta/survey", "color = {Red, Yellow}")
+    app.config["MDFORM_LOADER"] = loader
+    app.config["MDFORM_TENANT_SELECTOR"] = lambda: request.args.get("tenant")
+    return loader
+
+
+def test_extend_template():
+    assert extend_template("a", "b") == "ab"
+    assert (
+        extend_template("{% block x %}a{% endblock %}", "b", "x")
+        == "{% block x %}ab{% endblock %}"
+    )
+    with pytest.raises(ValueError):
+        extend_template("a", "b", "x")
+
+
+def test_render_tenant(app, client):
+    _setup(app)
+
+    @app.route("/", methods=["GET"])
+    def index():
+        return render_mdform("survey")
+
+    ret = client.get("/?tenant=acme")
+    assert b'id="phone"' in ret.data
+    assert b"Green" in ret.data
+
+    ret = client.get("/")
+    assert b'id="phone"' not in ret.data
+    assert b"Green" not in ret.data
+
+    ret = client.get("/?tenant=other")
+    assert b'id="name"' in ret.data
+    assert b'id="phone"' not in ret.data
+
+
+@pytest.mark.parametrize("read_only", [False, True])
+def test_shared_base(app, read_only):
+    _setup(app)
+
+    with app.test_request_context():
+        assert in_app_tenant_layer("survey", "acme") == "tenants/acme/survey"
+        assert in_app_tenant_layer("survey", "other") is None
+
+        _, tmpl, Base = in_app_from_mdfile("survey", read_only=read_only)
+        _, acme_tmpl, Acme = in_app_from_mdfile(
+            "survey", read_only=read_only, tenant="acme"
+        )
+        _, beta_tmpl, Beta = in_app_from_mdfile(
+            "survey", read_only=read_only, tenant="beta"
+        )
+
+        for Form in (Acme, Beta):
+            assert issubclass(Form, Base)
+            assert "name" not in Form.__dict__
+            assert Form._mdform_def["name"] is Base._mdform_def["name"]
+
+        # only replaced fields share the template.
+        assert beta_tmpl is tmpl
+        assert acme_tmpl != tmpl
+        assert acme_tmpl.startswith(tmpl[: -len("{% endblock %}")])
+
+        assert list(Acme._mdform_def) == ["name", "color", "phone"]
+        expected = ["name", "color", "phone"]
+        if not read_only:
+            expected.append("submit")
+        assert [f.name for f in Acme()] == expected
+
+        data = {"name": "Ana", "color": "Green", "phone": "555"}
+        assert Acme.from_plain_dict(data).to_plain_dict() == data
+        assert ("Yellow", "Yellow") in Beta().color.choices
+
+        if not read_only:
+            with app.test_request_context(method="POST", data=data):
+                assert Acme().validate()
+                assert not Base().validate()
+
+        assert (
+            in_app_from_mdfile("survey", read_only=read_only, tenant="acme")[2] is Acme
+        )
+
+
+def test_bounded_cache(app):
+    loader = _setup(app)
+    app.config["MDFORM_TENANT_CACHE_SIZE"] = 2
+    for tenant in ("t1", "t2", "t3"):
+        loader.set_source(f"tenants/{tenant}/survey", "phone = ___")
+
+    with app.test_request_context():
+        for tenant in ("t1", "t2", "t3"):
+            in_app_from_mdfile("survey", tenant=tenant)
+        assert len(in_app_get_tenant_cache()) == 2
+
+        # looking up tenants without a layer does not evict variants.
+        _, _, Form = in_app_from_mdfile("survey", tenant="t3")
+        for tenant in ("u1", "u2", "u3"):
+            in_app_from_mdfile("survey", tenant=tenant)
+        assert in_app_from_mdfile("survey", tenant="t3")[2] is Form
@@ -0,0 +1,80 @@
+import zipfile
+
+import pytest
+from jinja2 import TemplateNotFound
+
+from flask_mdform import render_mdform
+from flask_mdform.deco import in_app_from_mdfile
+from flask_mdform.loaders import PackageLoader, SQLiteLoader, ZipLoader
+
+
+class CountingSQLiteLoader(SQLiteLoader):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fetched = []
+
+    def get_source(self, name):
+        self.fetched.append(name)
+        return super().get_source(name)
+
+
+def test_sqlite_loader(app, client):
+    loader = CountingSQLiteLoader(":memory:")
+    loader.set_source("survey", "name = ___")
+    app.config["MDFORM_LOADER"] = loader
+
+    assert loader.get_version("survey") == 1
+    with pytest.raises(TemplateNotFound):
+        loader.get_version("missing")
+
+    @app.route("/", methods=["GET"])
+    def index():
+        return render_mdform("survey")
+
+    assert b'id="name"' in client.get("/").data
+    assert b'id="name"' in client.get("/").data
+    assert loader.fetched == ["survey"]
+
+    loader.set_source("survey", "email = @")
+    assert loader.get_version("survey") == 2
+
+    ret = client.get("/")
+    assert b'id="email"' in ret.data
+    assert b'id="name"' not in ret.data
+    assert loader.fetched == ["survey", "survey"]
+
+
+def test_zip_loader(app, tmp_path):
+    path = tmp_path / "forms.zip"
+    with zipfile.ZipFile(path, "w") as zf:
+        zf.writestr("forms/survey.md", "name = ___")
+
+    loader = ZipLoader(path, prefix="forms/")
+    version = loader.get_version("survey")
+    assert loader.get_source("survey") == ("name = ___", version)
+    with pytest.raises(TemplateNotFound):
+        loader.get_version("missing")
+
+    app.config["MDFORM_LOADER"] = loader
+    with app.app_context():
+        _, _, Form = in_app_from_mdfile("survey")
+        assert list(Form._mdform_def) == ["name"]
+        assert in_app_from_mdfile("survey")[2] is Form
+
+    with zipfile.ZipFile(path, "w") as zf:
+        zf.writestr("forms/survey.md", "email = @")
+
+    assert loader.get_version("survey") != version
+    with app.app_context():
+        _, _, Form = in_app_from_mdfile("survey")
+        assert list(Form._mdform_def) == ["email"]
+
+
+def test_package_loader():
+    loader = PackageLoader("flask_mdform.testsuite", "templates/md")
+
+    source, version = loader.get_source("index")
+    assert "name* = ___[30]" in source
+    assert loader.get_version("index") == version
+    with pytest.raises(TemplateNotFound):
+        loader.get_source("missing")
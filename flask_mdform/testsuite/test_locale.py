@@ -0,0 +1,111 @@
+from flask import request
+
+from flask_mdform import on_get_form, render_mdform
+from flask_mdform.deco import (
+    in_app_from_mdfile,
+    in_app_get_locale_cache,
+    in_app_get_lookup_cache,
+    in_app_localized_mdfile,
+    locale_chain,
+)
+from flask_mdform.loaders import SQLiteLoader
+
+LABELS = {"es": {"Name": "Nombre", "Submit": "Enviar"}}
+
+
+def _setup(app):
+    loader = SQLiteLoader(":memory:")
+    loader.set_source("survey", "Name = ___")
+    loader.set_source("fr/survey", "Nom = ___")
+    app.config["MDFORM_LOADER"] = loader
+    app.config["MDFORM_LOCALE_SELECTOR"] = lambda: request.args.get("lang")
+    return loader
+
+
+def test_locale_chain():
+    assert locale_chain("pt-BR") == ("pt_BR", "pt")
+    assert locale_chain("es") == ("es",)
+
+
+def test_localized_source(app, client):
+    _setup(app)
+
+    @app.route("/", methods=["GET"])
+    def index():
+        return render_mdform("survey")
+
+    assert b'id="name"' in client.get("/").data
+    assert b'id="nom"' in client.get("/?lang=fr_CA").data
+    assert b'id="name"' in client.get("/?lang=es").data
+
+    with app.test_request_context("/?lang=fr_CA"):
+        assert in_app_localized_mdfile("survey", "fr_CA") == "fr/survey"
+        assert in_app_localized_mdfile("survey", "es") == "survey"
+        _, _, Form = in_app_from_mdfile("survey")
+        assert Form._mdfile == "survey"
+
+
+def test_translated_labels(app):
+    _setup(app)
+    app.config["MDFORM_TRANSLATE_LABEL"] = lambda label, locale: LABELS.get(
+        locale, {}
+    ).get(label, label)
+
+    with app.test_request_context():
+        for read_only in (False, True):
+            _, tmpl, Base = in_app_from_mdfile("survey", read_only=read_only)
+            _, es_tmpl, Form = in_app_from_mdfile(
+                "survey", read_only=read_only, locale="es"
+            )
+            assert issubclass(Form, Base)
+            assert Form._mdform_def is Base._mdform_def
+            assert es_tmpl is tmpl
+            assert (
+                in_app_from_mdfile("survey", read_only=read_only, locale="es")[2]
+                is Form
+            )
+
+            form = Form.from_plain_dict({"name": "Ana"})
+            assert form.name.label.text == "Nombre"
+            assert form.name.data == "Ana"
+            assert form.to_plain_dict() == {"name": "Ana"}
+            assert Base().name.label.text == "Name"
+            if not read_only:
+                assert form.submit.label.text == "Enviar"
+
+
+def test_bounded_cache(app):
+    _setup(app)
+    app.config["MDFORM_LOCALE_CACHE_SIZE"] = 2
+    app.config["MDFORM_TRANSLATE_LABEL"] = lambda label, locale: label.upper()
+
+    with app.test_request_context():
+        for locale in ("de", "it", "ja", "ko"):
+            in_app_from_mdfile("survey", locale=locale)
+        assert len(in_app_get_locale_cache()) == 2
+
+
+def test_lookups_do_not_evict_variants(app):
+    _setup(app)
+    app.config["MDFORM_LOCALE_CACHE_SIZE"] = 1
+
+    with app.test_request_context():
+        _, _, Form = in_app_from_mdfile("survey", locale="fr")
+        for locale in ("de", "it", "ja", "ko"):
+            in_app_from_mdfile("survey", locale=locale)
+        assert len(in_app_get_locale_cache()) == 1
+        assert len(in_app_get_lookup_cache()) == 5
+        assert in_app_from_mdfile("survey", locale="fr")[2] is Form
+
+
+def test_cached_output_by_locale(app, client):
+    _setup(app)
+
+    @app.route("/", methods=["GET"])
+    @on_get_form("survey", read_only=True, cache_output=True)
+    def show():
+        return {}
+
+    assert b'id="name"' in client.get("/").data
+    assert b'id="nom"' in client.get("/?lang=fr").data
+    assert b'id="name"' in client.get("/").data
@@ -0,0 +1,100 @@
+import datetime
+import decimal
+
+import pytest
+
+from flask_mdform import from_mdstr
+from flask_mdform.records import get_columns, iter_records_html, stream_records
+from flask_mdform.testsuite import data_test
+
+_, _, Form = from_mdstr(
+    """
+Name* = ___
+Amount = #.#[::0.5:1]
+Day = d/m/y
+Mail = @
+Color = {(Red), Blue}
+Tags = [] A [] B [] C
+""",
+    "RecordsForm",
+)
+
+
+class Row:
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+
+RECORDS = [
+    dict(name="<b>Ann</b>", amount="1.25", day="2020-12-23", tags=["A", "C"]),
+    Row(
+        name="Bob",
+        amount=decimal.Decimal("3"),
+        day=datetime.date(2021, 1, 2),
+        mail="bob@example.com",
+        color="Blue",
+    ),
+]
+
+
+def test_columns_are_cached():
+    assert [column.name for column in get_columns(Form)] == [
+        "name",
+        "amount",
+        "day",
+        "mail",
+        "color",
+        "tags",
+    ]
+    first, second = get_columns(Form), get_columns(Form)
+    assert first[0] is second[0]
+
+    with pytest.raises(ValueError):
+        get_columns(Form, ["name", "unknown"])
+
+
+def test_table():
+    html = "".join(iter_records_html(Form, RECORDS, names=["name", "amount", "tags"]))
+    assert html == (
+        '<table class="mdform-records"><thead><tr>'
+        "<th>Name</th><th>Amount</th><th>Tags</th></tr></thead><tbody>"
+        "<tr><td>&lt;b&gt;Ann&lt;/b&gt;</td><td>1.2</td><td>A, C</td></tr>"
+        "<tr><td>Bob</td><td>3.0</td><td></td></tr>"
+        "</tbody></table>"
+    )
+
+
+def test_cards():
+    chunks = list(iter_records_html(Form, RECORDS, layout="cards", chunk_size=1))
+    assert len(chunks) == 4
+    assert chunks[2] == (
+        '<div class="card"><dl>'
+        "<dt>Name</dt><dd>Bob</dd>"
+        "<dt>Amount</dt><dd>3.0</dd>"
+        "<dt>Day</dt><dd>2021-01-02</dd>"
+        "<dt>Mail</dt><dd><a href='mailto:bob@example.com'>bob@example.com</a></dd>"
+        "<dt>Color</dt><dd>Blue</dd>"
+        "<dt>Tags</dt><dd></dd>"
+        "</dl></div>"
+    )
+
+    with pytest.raises(ValueError):
+        iter_records_html(Form, RECORDS, layout="grid")
+
+
+def test_stream_records(app, client):
+    @app.route("/records")
+    def records():
+        return stream_records("index", data_test.DATA.values(), names=["name"])
+
+    ret = client.get("/records")
+    assert ret.is_streamed
+    assert "<td>Peter Capusotto</td>" in ret.data.decode("utf-8")
+
+
+def test_time_format():
+    _, _, TimeForm = from_mdstr("At = hh:mm", "TimeRecordsForm")
+    records = [dict(at=datetime.time(9, 30)), dict(at="09:30:00"), dict(at="soon")]
+    html = "".join(iter_records_html(TimeForm, records))
+    assert html.count("<td>09:30</td>") == 2
+    assert "<td>soon</td>" in html
@@ -0,0 +1,54 @@
+import json
+
+from flask_mdform import from_mdstr
+from flask_mdform.schema import json_schema, json_schema_bytes
+
+SCHEMA_FIELDS = """
+Name* = ___[30]
+Age = ###[18:99]
+Amount* = #.#[0:10]
+Day = d/m/y
+Time = hh:mm
+Email* = @
+Color = {Red, (Blue)}
+Tags* = [] a [] b
+Avatar = ...[jpg, png; images]
+"""
+
+
+def test_json_schema():
+    _, _, Form = from_mdstr(SCHEMA_FIELDS, "SchemaForm")
+    schema = json_schema(Form)
+
+    assert schema["title"] == "SchemaForm"
+    assert schema["required"] == ["name", "amount", "email", "tags", "avatar"]
+    assert not schema["additionalProperties"]
+
+    props = schema["properties"]
+    assert props["name"] == {
+        "type": "string",
+        "title": "Name",
+        "maxLength": 30,
+        "minLength": 1,
+    }
+    assert props["age"] == {
+        "type": ["integer", "null"],
+        "title": "Age",
+        "minimum": 18,
+        "maximum": 99,
+    }
+    assert props["amount"]["minimum"] == 0
+    assert props["amount"]["maximum"] == 10
+    assert props["day"]["format"] == "date"
+    assert props["email"]["format"] == "email"
+    assert props["color"]["enum"] == ["Red", "Blue", None]
+    assert props["tags"]["items"]["enum"] == ["a", "b"]
+    assert props["tags"]["minItems"] == 1
+    assert props["avatar"]["x-allowed-extensions"] == ["jpg", "png"]
+    assert props["avatar"]["x-max-size"] == 5 * 1024 * 1024
+
+    # Computed once per class.
+    assert json_schema(Form) is schema
+    content, etag = json_schema_bytes(Form)
+    assert json.loads(content) == schema
+    assert json_schema_bytes(Form)[1] == etag
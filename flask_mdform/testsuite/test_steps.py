@@ -0,0 +1,222 @@
+import io
+import pathlib
+import re
+
+import pytest
+from flask import jsonify
+from wtforms.validators import ValidationError
+
+from flask_mdform import from_mdfile
+from flask_mdform.loaders import SQLiteLoader
+from flask_mdform.steps import (
+    STATE_FIELD,
+    from_mdstr_steps,
+    in_app_steps_from_mdfile,
+    render_mdform_steps,
+    split_mdstr,
+)
+from flask_mdform.testsuite import data_test
+
+MDSTR = """Title: Steps
+
+first = ___
+
+[page]
+
+second = ___
+[page: Last one]
+third* = ___
+"""
+
+
+def _state(ret):
+    return re.search(
+        f'name="{STATE_FIELD}" value="([^"]+)"', ret.data.decode("utf-8")
+    ).group(1)
+
+
+def test_split_mdstr():
+    chunks = split_mdstr(MDSTR)
+    assert [title for title, _ in chunks] == [None, None, "Last one"]
+    assert "[page" not in "".join(chunk for _, chunk in chunks)
+
+
+def test_from_mdstr_steps():
+    steps = from_mdstr_steps(MDSTR, "StepForm")
+
+    assert steps.meta == {"title": ["Steps"]}
+    assert len(steps) == 3
+    assert [step.title for step in steps] == [None, None, "Last one"]
+    assert [list(step.form_cls._mdform_def) for step in steps] == [
+        ["first"],
+        ["second"],
+        ["third"],
+    ]
+    assert list(steps.form_cls._mdform_def) == ["first", "second", "third"]
+
+    assert steps[0].form_cls.submit.args == ("Next",)
+    assert steps[2].form_cls.submit.args == ("Submit",)
+    assert not hasattr(steps[0].form_cls, "back")
+    assert hasattr(steps[1].form_cls, "back")
+
+    assert "{{ form.first }}" in steps[0].tmpl
+    assert "{{ form.second }}" not in steps[0].tmpl
+    assert STATE_FIELD in steps[0].tmpl
+
+
+def test_render_mdform_steps(app, client):
+    @app.route("/", methods=["GET", "POST"])
+    def index():
+        return render_mdform_steps(
+            "steps",
+            on_submit=lambda form: jsonify(form.to_plain_dict()),
+            flash_form_errors=False,
+        )
+
+    ret = client.get("/")
+    assert b"form.name" not in ret.data
+    assert b'id="name"' in ret.data
+    assert b'id="day"' not in ret.data
+
+    # A submission without a valid state starts over.
+    ret = client.post("/", data={"name": "Peter", STATE_FIELD: "tampered"})
+    assert b'id="name"' in ret.data
+    assert b'value="Peter"' not in ret.data
+
+    data = data_test.DATA["peter@capusotto.com"]
+    state = _state(client.get("/"))
+
+    # Invalid step, render the same step again.
+    ret = client.post("/", data={"name": data["name"], STATE_FIELD: state})
+    assert b'id="email"' in ret.data
+    assert b'id="day"' not in ret.data
+
+    ret = client.post(
+        "/",
+        data={"name": data["name"], "email": data["email"], STATE_FIELD: state},
+    )
+    assert b'id="day"' in ret.data
+    assert b'id="name"' not in ret.data
+
+    # Back keeps the submitted values.
+    ret = client.post("/", data={"back": "Back", STATE_FIELD: _state(ret)})
+    assert b'id="name"' in ret.data
+    assert f'value="{data["email"]}"'.encode("utf-8") in ret.data
+
+    ret = client.post(
+        "/",
+        data={"name": data["name"], "email": data["email"], STATE_FIELD: _state(ret)},
+    )
+    ret = client.post(
+        "/",
+        data={
+            "day": data["day"],
+            "time": data["time"],
+            "skipme": data["skipme"],
+            STATE_FIELD: _state(ret),
+        },
+    )
+
+    # Same as the single-page form.
+    with app.test_request_context():
+        _, _, Form = from_mdfile(
+            pathlib.Path(app.root_path, app.template_folder, "md", "index.md")
+        )
+        expected = Form.from_plain_dict(data).to_plain_dict()
+    assert ret.json == expected
+
+
+def _sqlite_app(app, source, **kwargs):
+    loader = SQLiteLoader(":memory:")
+    loader.set_source("survey", source)
+    app.config["MDFORM_LOADER"] = loader
+
+    submitted = []
+
+    @app.route("/", methods=["GET", "POST"])
+    def index():
+        def on_submit(form):
+            submitted.append(form.to_plain_dict())
+            return "done"
+
+        return render_mdform_steps(
+            "survey", on_submit=on_submit, flash_form_errors=False, **kwargs
+        )
+
+    return submitted
+
+
+def test_steps_file_fields_require_upload_func(app, client):
+    _sqlite_app(app, "name = ___\n[page]\ndoc = ...")
+
+    with pytest.raises(ValueError):
+        client.get("/")
+
+
+def test_steps_state_expires(app, client):
+    _sqlite_app(app, "first = ___\n[page]\nsecond = ___", max_age=-1)
+
+    ret = client.post("/", data={"first": "x", STATE_FIELD: _state(client.get("/"))})
+    assert b'id="first"' in ret.data
+    assert b'id="second"' not in ret.data
+
+
+def test_steps_validate_merged_form(app, client):
+    submitted = _sqlite_app(app, "first = ___\n[page]\nsecond = ___")
+
+    def validate_second(form, field):
+        if form.first.data == field.data:
+            raise ValidationError("Must differ from first.")
+
+    with app.test_request_context():
+        Form = in_app_steps_from_mdfile("survey").form_cls
+        type.__setattr__(Form, "validate_second", validate_second)
+
+    def submit(second):
+        ret = client.post(
+            "/", data={"first": "x", STATE_FIELD: _state(client.get("/"))}
+        )
+        return client.post("/", data={"second": second, STATE_FIELD: _state(ret)})
+
+    ret = submit("x")
+    assert b'id="second"' in ret.data
+    assert submitted == []
+
+    assert submit("y").data == b"done"
+    assert submitted == [{"first": "x", "second": "y"}]
+
+
+def test_steps_collapse_across_steps(app, client):
+    submitted = _sqlite_app(
+        app,
+        "more = {Yes[o], No}\n[page]\n[collapse:more]\ndetails* = ___\n[endcollapse]",
+    )
+
+    def submit(more):
+        ret = client.post(
+            "/", data={"more": more, STATE_FIELD: _state(client.get("/"))}
+        )
+        return client.post("/", data={STATE_FIELD: _state(ret)})
+
+    assert b'id="details"' in submit("Yes").data
+    assert submitted == []
+
+    assert submit("No").data == b"done"
+    assert submitted == [{"more": "No", "details": None}]
+
+
+def test_steps_upload_files(app, client):
+    submitted = _sqlite_app(
+        app,
+        "name = ___\n[page]\ndoc* = ...",
+        upload_func=lambda data: f"/files/{data.filename}",
+    )
+
+    ret = client.post("/", data={"name": "x", STATE_FIELD: _state(client.get("/"))})
+    ret = client.post(
+        "/",
+        data={"doc": (io.BytesIO(b"content"), "doc.txt"), STATE_FIELD: _state(ret)},
+        content_type="multipart/form-data",
+    )
+    assert ret.data == b"done"
+    assert submitted == [{"name": "x", "doc": "/files/doc.txt"}]